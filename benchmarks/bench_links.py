@@ -0,0 +1,97 @@
+"""Compare link detection against the previous LINK_RE regex.
+
+Run from the repository root:
+
+    python benchmarks/bench_links.py
+
+``benchmarks()`` feeds the same inputs to ``benchmarks/suite.py``.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+
+import common  # noqa: F401  (sets up sys.path and dummy credentials)
+from utils.links import contains_link
+
+LEGACY_LINK_RE = re.compile(
+    r"(?:https?://\S+|tg://\S+|t\.me/\S+|telegram\.me/\S+|(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,})",
+    re.IGNORECASE,
+)
+
+
+def legacy_contains_link(text: str) -> bool:
+    return bool(LEGACY_LINK_RE.search(text or ""))
+
+
+REALISTIC = [
+    "hey everyone, what's up?",
+    "gm! anyone online tonight",
+    "check this out https://example.com/page?id=42",
+    "join t.me/somechannel for more",
+    "lol 😂😂 that was great",
+    "meeting at 5:30, don't be late",
+    "my email is someone@example.org",
+    "Price went up 2.5% today...",
+    "ok",
+    "Can an admin please pin the rules? Thanks in advance.",
+    "новости дня без ссылок",
+    "see docs at docs.python.org/3/library/re.html",
+    "tg://resolve?domain=durov",
+    "version 1.2.3 released",
+]
+
+ADVERSARIAL = {
+    "dotted": "a." * 2000,
+    "letters": "a" * 4000,
+    "hyphens": "a-" * 2000,
+    "digit_tld": "a1." * 1333 + "1",
+    "dashes": "-" * 4000,
+}
+
+
+def throughput(func, texts: list[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            func(text)
+    return rounds * len(texts) / (time.perf_counter() - start)
+
+
+def worst_latency(func, text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmarks() -> dict:
+    def realistic() -> None:
+        for text in REALISTIC:
+            contains_link(text)
+
+    cases = {"realistic_batch": realistic}
+    for name, text in ADVERSARIAL.items():
+        cases[f"adversarial_{name}"] = lambda text=text: contains_link(text)
+    return cases
+
+
+def main() -> None:
+    for text in REALISTIC + list(ADVERSARIAL.values()):
+        assert contains_link(text) == legacy_contains_link(text), text
+
+    print(f"{'case':<14}{'legacy':>16}{'current':>16}")
+    legacy = throughput(legacy_contains_link, REALISTIC, 2000)
+    current = throughput(contains_link, REALISTIC, 2000)
+    print(f"{'realistic':<14}{legacy:>12,.0f}/s {current:>12,.0f}/s")
+    for name, text in ADVERSARIAL.items():
+        legacy = worst_latency(legacy_contains_link, text) * 1000
+        current = worst_latency(contains_link, text) * 1000
+        print(f"{name:<14}{legacy:>13.3f}ms {current:>13.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
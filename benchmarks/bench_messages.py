@@ -0,0 +1,37 @@
+"""Message and keyboard construction used on every warning and panel render."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import common  # noqa: F401  (sets up sys.path and dummy credentials)
+from handlers.filters import build_warning
+from handlers.panels import build_settings_panel, build_start_panel, get_help_keyboard
+from utils import db
+
+CHAT_ID = -1001234567890
+USER = SimpleNamespace(id=42, username=None, first_name="Bench")
+
+
+def benchmarks() -> dict:
+    # The panel reads settings through the cache; seed it so no query is made
+    db._settings_cache.set(CHAT_ID, db.ChatSettings(CHAT_ID, {
+        "biofilter": "1",
+        "linkfilter": "1",
+        "editmode": "0",
+        "autodelete_interval": "30",
+    }))
+
+    async def settings_panel() -> None:
+        await build_settings_panel(CHAT_ID)
+
+    async def start_panel() -> None:
+        await build_start_panel(True, is_owner=True, include_back=True)
+
+    return {
+        "build_warning": lambda: build_warning(1, USER, "You are not allowed to share links in this group."),
+        "build_warning_final": lambda: build_warning(3, USER, "Flooding.", is_final=True),
+        "help_keyboard": lambda: get_help_keyboard("cb_start"),
+        "settings_panel": settings_panel,
+        "start_panel": start_panel,
+    }
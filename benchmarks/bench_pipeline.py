@@ -0,0 +1,84 @@
+"""Group-message moderation decisions with a stubbed client.
+
+Storage is the in-memory backend and caches are seeded so the pipeline
+takes its steady-state path.
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import common  # noqa: F401  (sets up sys.path and dummy credentials)
+from pyrogram.enums import ChatType
+
+from handlers import filters as group_filters
+from utils import db, perms
+from utils.storage.memory import MemoryStorage
+from utils.wordfilter import WordAutomaton
+
+IDLE_CHAT = -1001000000001
+BUSY_CHAT = -1001000000002
+ADMIN_ID = 1000
+MEMBER_ID = 2000
+BANNED_TERMS = [f"spamword{i}" for i in range(500)] + ["buy followers", "free crypto"]
+
+
+class StubClient:
+    async def get_chat(self, user_id: int) -> SimpleNamespace:
+        return SimpleNamespace(bio="just a regular person")
+
+    async def restrict_chat_member(self, *args, **kwargs) -> None:
+        return None
+
+
+class StubMessage:
+    def __init__(self, chat_id: int, user_id: int, text: str) -> None:
+        self.id = 1
+        self.chat = SimpleNamespace(id=chat_id, type=ChatType.SUPERGROUP)
+        self.from_user = SimpleNamespace(id=user_id, is_bot=False, username=None, first_name="Bench")
+        self.text = text
+        self.caption = None
+        self.entities = None
+        self.caption_entities = None
+
+    async def delete(self) -> None:
+        return None
+
+    async def reply_text(self, *args, **kwargs) -> None:
+        return None
+
+
+def _seed_caches() -> None:
+    db._store = MemoryStorage()
+    db._settings_cache.set(IDLE_CHAT, db.ChatSettings(IDLE_CHAT, {}))
+    db._settings_cache.set(BUSY_CHAT, db.ChatSettings(BUSY_CHAT, {
+        "linkfilter": "1",
+        "biofilter": "1",
+    }))
+    for chat_id in (IDLE_CHAT, BUSY_CHAT):
+        db._approved_cache[chat_id] = db.ApprovedSet([])
+        perms._admin_cache.set(chat_id, {ADMIN_ID})
+    db._banned_cache.set(IDLE_CHAT, None)
+    db._banned_cache.set(BUSY_CHAT, WordAutomaton(BANNED_TERMS))
+    group_filters._user_bio_cache.set(MEMBER_ID, "just a regular person")
+
+
+def benchmarks() -> dict:
+    _seed_caches()
+    client = StubClient()
+    pipeline = group_filters.group_pipeline
+    context = group_filters.MessageContext
+    chatter = "did anyone watch the match last night? that final goal was unreal"
+
+    def case(chat_id: int, user_id: int, text: str):
+        async def run() -> None:
+            await pipeline.run(context(client, StubMessage(chat_id, user_id, text)))
+        return run
+
+    return {
+        "idle_chat": case(IDLE_CHAT, MEMBER_ID, chatter),
+        "clean_member": case(BUSY_CHAT, MEMBER_ID, chatter),
+        "admin_link": case(BUSY_CHAT, ADMIN_ID, "rules at example.com/rules"),
+        "link_violation": case(BUSY_CHAT, MEMBER_ID, "join t.me/spamchannel now"),
+        "banned_word_violation": case(BUSY_CHAT, MEMBER_ID, "get free crypto here"),
+    }
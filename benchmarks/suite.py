@@ -0,0 +1,110 @@
+"""Run every benchmark, save a JSON baseline and flag regressions against one.
+
+Run from the repository root:
+
+    python benchmarks/suite.py --save benchmarks/baseline.json
+    python benchmarks/suite.py --check benchmarks/baseline.json --threshold 15
+
+``--check`` exits with status 1 when any benchmark got slower than the
+baseline by more than the threshold percentage, and with status 2 when the
+baseline file does not exist. Baselines are only comparable on the same
+machine and Python version, so none is committed: record one with ``--save``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+import common
+import bench_links
+import bench_messages
+import bench_pipeline
+
+SUITES = {
+    "links": bench_links,
+    "messages": bench_messages,
+    "pipeline": bench_pipeline,
+}
+DEFAULT_THRESHOLD = 15.0  # percent
+
+
+def run_all(pattern: str | None, loop: asyncio.AbstractEventLoop, repeat: int) -> dict[str, float]:
+    results: dict[str, float] = {}
+    for suite, module in SUITES.items():
+        for name, func in module.benchmarks().items():
+            key = f"{suite}.{name}"
+            if pattern and pattern not in key:
+                continue
+            results[key] = ns = common.time_call(func, loop, repeat=repeat)
+            print(f"{key:<40}{common.format_ns(ns):>14}")
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    regressions = []
+    print(f"\n{'benchmark':<40}{'baseline':>14}{'current':>14}{'change':>10}")
+    for key, ns in results.items():
+        before = baseline.get(key)
+        if before is None:
+            print(f"{key:<40}{'—':>14}{common.format_ns(ns):>14}{'new':>10}")
+            continue
+        change = (ns - before) / before * 100
+        flag = "  ⚠️" if change > threshold else ""
+        print(f"{key:<40}{common.format_ns(before):>14}{common.format_ns(ns):>14}{change:>+9.1f}%{flag}")
+        if change > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    parser.add_argument("--check", metavar="FILE", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown in percent")
+    parser.add_argument("--repeat", type=int, default=common.REPEAT, help="timed batches per benchmark; best is kept")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+    # Checked before the run, which takes a while; baselines are per machine and not committed
+    if args.check and not os.path.isfile(args.check):
+        parser.error(
+            f"no baseline at {args.check}; record one on this machine first with --save {args.check}"
+        )
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        results = run_all(args.pattern, loop, args.repeat)
+    finally:
+        loop.close()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results_ns": results,
+            }, fh, indent=2, sort_keys=True)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.check:
+        with open(args.check, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        if baseline.get("python") != platform.python_version():
+            print(f"\nNote: baseline was recorded on Python {baseline.get('python')}")
+        regressions = compare(results, baseline["results_ns"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:g}%")
+            return 1
+        print(f"\nNo regressions above {args.threshold:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import os
 from dotenv import load_dotenv
@@ -11,12 +12,24 @@ API_ID = int(os.getenv("API_ID", "0"))
 API_HASH = os.getenv("API_HASH", "")
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB = os.getenv("MONGO_DB", "oxygen")
+# mongodb://, mongodb+srv://, sqlite:///path/to/file.db or memory://
+STORAGE_URI = os.getenv("STORAGE_URI", MONGO_URI)
 OWNER_ID = int(os.getenv("OWNER_ID", "0"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_GROUP_ID = int(os.getenv("LOG_GROUP_ID", "0"))
 SUPPORT_CHAT_URL = os.getenv("SUPPORT_CHAT_URL", "https://t.me/botsyard")
 DEVELOPER_URL = os.getenv("DEVELOPER_URL", "https://t.me/oxeign")
 PANEL_IMAGE_URL = os.getenv("PANEL_IMAGE_URL", "https://files.catbox.moe/uvqeln.jpg")
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 keeps /metrics off
+SLOW_HANDLER_MS = int(os.getenv("SLOW_HANDLER_MS", "500"))  # 0 disables slow-call logging
+# Public HTTPS URL Telegram posts updates to; empty keeps web.py a plain health server
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", os.getenv("PORT", "10000")))
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "0")) or os.cpu_count() or 1
+# Telegram echoes this in every delivery; derived from the token unless set
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or hashlib.sha256(BOT_TOKEN.encode()).hexdigest()[:32]
 
 _missing = [name for name, val in {"BOT_TOKEN": BOT_TOKEN, "API_ID": API_ID, "API_HASH": API_HASH}.items() if not val]
 if _missing:
@@ -26,5 +39,10 @@ if _missing:
         f"Missing required environment variables: {missing}. Copy .env.example and set them."
     )
 
-if not MONGO_URI.startswith(("mongodb://", "mongodb+srv://")):
-    raise RuntimeError("Invalid MONGO_URI. Must begin with mongodb:// or mongodb+srv://")
+if not STORAGE_URI.startswith(("mongodb://", "mongodb+srv://", "sqlite://", "memory://")):
+    raise RuntimeError(
+        "Invalid STORAGE_URI. Must begin with mongodb://, mongodb+srv://, sqlite:// or memory://"
+    )
+
+if WEBHOOK_URL and not WEBHOOK_URL.startswith("https://"):
+    raise RuntimeError("Invalid WEBHOOK_URL. Telegram only delivers to https:// URLs")
@@ -9,6 +9,7 @@ from . import (
     broadcast,
     general,
     panels,
+    diagnostics,
 )
 
 MODULES = [
@@ -18,6 +19,7 @@ MODULES = [
     broadcast,
     general,
     panels,
+    diagnostics,
 ]
 
 
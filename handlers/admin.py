@@ -1,17 +1,129 @@
 import logging
+import re
+from html import escape
 from pyrogram import Client, filters
-from pyrogram.types import Message, ChatPermissions
-from pyrogram.enums import ParseMode, ChatType, ChatMemberStatus
+from pyrogram.types import (
+    Message, ChatPermissions, ChatMemberUpdated, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton,
+)
+from pyrogram.enums import ParseMode, ChatType, MessageMediaType
 
+from utils.callbacks import router
 from utils.errors import catch_errors
 from utils.db import (
-    approve_user, unapprove_user, get_approved,
+    approve_user, unapprove_user, approve_users, unapprove_users, get_approved_page, count_approved,
     increment_warning, reset_warning, set_setting,
     set_bio_filter, toggle_approval_mode, set_approval_mode,
+    add_banned_words, remove_banned_words, get_banned_words, count_banned_words,
+    WARN_LIMIT, BANNED_WORDS_LIMIT, APPROVED_PAGE_SIZE,
 )
+from utils.messages import safe_edit_message
+from utils.perms import get_chat_admins, apply_member_update, is_admin
+from utils.antiflood import FLOOD_DEFAULT_WINDOW, FLOOD_WINDOW_MAX
 
 logger = logging.getLogger(__name__)
 
+TERM_SEPARATORS = re.compile(r"[,\n]")
+MAX_TERM_LENGTH = 64
+
+# Bulk /approve and /unapprove: ids in the command or in a replied-to text file
+USER_ID_PATTERN = re.compile(r"(?<![\d-])\d{1,19}(?!\d)")
+MAX_BULK_IDS = 10_000
+MAX_IMPORT_BYTES = 512 * 1024
+# Argument that reads a replied-to document of any type as an id list
+BULK_FILE_ARG = "file"
+# /approved page buttons: approved:<n|p>:<bound id>
+APPROVED_PAGE_DATA = re.compile(r"approved:([np]):(\d+)")
+
+
+def _parse_terms(message: Message) -> list[str]:
+    """Terms after the command, separated by commas or new lines."""
+    parts = (message.text or "").split(None, 1)
+    if len(parts) < 2:
+        return []
+    return [t.strip() for t in TERM_SEPARATORS.split(parts[1]) if 0 < len(t.strip()) <= MAX_TERM_LENGTH]
+
+
+def _parse_user_ids(text: str) -> list[int]:
+    """Distinct positive user ids in ``text``, in first-seen order."""
+    ids = dict.fromkeys(int(m) for m in USER_ID_PATTERN.findall(text))
+    return [uid for uid in ids if 0 < uid < 2 ** 63][:MAX_BULK_IDS]
+
+
+async def _bulk_user_ids(client: Client, message: Message) -> list[int] | None:
+    """
+    Ids listed after the command, or read from a replied-to text file (any
+    replied-to document with ``/approve file``). None for the single-user
+    reply form: no arguments, or arguments without ids, on a reply to anything else.
+    """
+    parts = (message.text or "").split(None, 1)
+    reply = message.reply_to_message
+    explicit = len(parts) == 2 and parts[1].strip().lower() == BULK_FILE_ARG
+    if len(parts) == 2 and not explicit:
+        ids = _parse_user_ids(parts[1])
+        return ids if ids or not reply else None
+
+    if not reply or reply.media != MessageMediaType.DOCUMENT:
+        if explicit:
+            await message.reply_text("📌 Reply to a text file of user ids.")
+            return []
+        return None
+    if reply.document is None:
+        # Webhook updates carry only the media type
+        reply = await client.get_messages(message.chat.id, reply.id)
+    if not explicit and reply.document.mime_type != "text/plain":
+        # A member's PDF or photo sent as a file: act on the member
+        return None
+    if reply.document.file_size and reply.document.file_size > MAX_IMPORT_BYTES:
+        await message.reply_text(f"❗ The file is too large (max {MAX_IMPORT_BYTES // 1024} KB).")
+        return []
+    data = await client.download_media(reply, in_memory=True)
+    return _parse_user_ids(bytes(data.getbuffer()).decode("utf-8", "ignore"))
+
+
+def _approved_page_view(ids: list[int], total: int, has_prev: bool, has_next: bool):
+    text = f"<b>Approved Users</b> ({total} total)\n" + "\n".join(f"• <code>{uid}</code>" for uid in ids)
+    row = []
+    if has_prev:
+        row.append(InlineKeyboardButton("◀️ Prev", callback_data=f"approved:p:{ids[0]}"))
+    if has_next:
+        row.append(InlineKeyboardButton("Next ▶️", callback_data=f"approved:n:{ids[-1]}"))
+    return text, InlineKeyboardMarkup([row]) if row else None
+
+
+async def _load_approved_page(chat_id: int, direction: str = "n", bound: int = 0):
+    """One page plus whether pages exist before and after it; ``None`` if nobody is approved."""
+    if direction == "p":
+        ids = await get_approved_page(chat_id, bound, descending=True, limit=APPROVED_PAGE_SIZE + 1)
+        has_prev, ids, has_next = len(ids) > APPROVED_PAGE_SIZE, ids[:APPROVED_PAGE_SIZE][::-1], True
+    else:
+        ids = await get_approved_page(chat_id, bound, limit=APPROVED_PAGE_SIZE + 1)
+        has_prev, has_next, ids = bound > 0, len(ids) > APPROVED_PAGE_SIZE, ids[:APPROVED_PAGE_SIZE]
+    if not ids and bound:
+        # The page emptied since the buttons were drawn; start over
+        return await _load_approved_page(chat_id)
+    if not ids:
+        return None
+    return _approved_page_view(ids, await count_approved(chat_id), has_prev, has_next)
+
+
+@router.prefix("approved:")
+@catch_errors
+async def approved_page_cb(client: Client, query: CallbackQuery):
+    match = APPROVED_PAGE_DATA.fullmatch(query.data)
+    if match is None:
+        await query.answer("⚠️ Unknown action", show_alert=True)
+        return
+    if not await is_admin(client, query.message, query.from_user.id):
+        await query.answer("Admins only", show_alert=True)
+        return
+    page = await _load_approved_page(query.message.chat.id, match[1], int(match[2]))
+    await query.answer()
+    if page is None:
+        await safe_edit_message(query.message, text="No approved users.")
+        return
+    text, keyboard = page
+    await safe_edit_message(query.message, text=text, reply_markup=keyboard, parse_mode=ParseMode.HTML)
+
 
 def register(app: Client) -> None:
     logger.info("✅ Registered: admin.py")
@@ -23,16 +135,22 @@ def register(app: Client) -> None:
             return False
 
         try:
-            member = await client.get_chat_member(message.chat.id, message.from_user.id)
+            admins = await get_chat_admins(client, message.chat.id)
         except Exception as e:
-            logger.warning("Failed to fetch member: %s", e)
+            logger.warning("Failed to fetch admins: %s", e)
             return False
 
-        if member.status not in {ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER}:
+        if not message.from_user or message.from_user.id not in admins:
             await message.reply_text("🔒 You must be an admin to use this.")
             return False
         return True
 
+    # Keep the cached admin roster in sync with promotions and demotions
+    @app.on_chat_member_updated()
+    @catch_errors
+    async def track_admin_changes(_, update: ChatMemberUpdated):
+        apply_member_update(update)
+
     # Central admin action executor
     async def _admin_action(message: Message, action: str) -> None:
         if not await _require_admin_group(app, message):
@@ -108,12 +226,11 @@ def register(app: Client) -> None:
             return
 
         count = await increment_warning(message.chat.id, user.id)
-        if count >= 3:
+        if count >= WARN_LIMIT:
             await app.restrict_chat_member(message.chat.id, user.id, ChatPermissions())
-            await reset_warning(message.chat.id, user.id)
-            await message.reply_text(f"🔇 {user.mention} muted (3 warnings)")
+            await message.reply_text(f"🔇 {user.mention} muted ({WARN_LIMIT} warnings)")
         else:
-            await message.reply_text(f"⚠ Warned {user.mention} ({count}/3)")
+            await message.reply_text(f"⚠ Warned {user.mention} ({count}/{WARN_LIMIT})")
 
     @app.on_message(filters.command(["resetwarn", "rmwarn"]) & filters.group)
     @catch_errors
@@ -170,15 +287,88 @@ def register(app: Client) -> None:
         except ValueError:
             await message.reply_text("❗ Provide a valid number of seconds.")
 
+    @app.on_message(filters.command("antiflood") & filters.group)
+    @catch_errors
+    async def antiflood_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        args = message.command[1:]
+        if args and args[0].lower() in {"off", "disable", "0"}:
+            await set_setting(message.chat.id, "flood_limit", "0")
+            await message.reply_text("🌊 Anti-flood DISABLED ❌")
+            return
+        try:
+            limit = int(args[0])
+            window = int(args[1]) if len(args) > 1 else FLOOD_DEFAULT_WINDOW
+        except (IndexError, ValueError):
+            await message.reply_text("Usage: /antiflood <messages> [seconds] | off")
+            return
+        if not 2 <= limit <= 100 or not 1 <= window <= FLOOD_WINDOW_MAX:
+            await message.reply_text(f"❗ Use 2-100 messages within 1-{FLOOD_WINDOW_MAX} seconds.")
+            return
+        await set_setting(message.chat.id, "flood_window", str(window))
+        await set_setting(message.chat.id, "flood_limit", str(limit))
+        await message.reply_text(f"🌊 Anti-flood ENABLED ✅ ({limit} messages / {window}s)")
+
+    # Banned words
+    @app.on_message(filters.command("banword") & filters.group)
+    @catch_errors
+    async def banword_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        terms = _parse_terms(message)
+        if not terms:
+            await message.reply_text("Usage: /banword word, another phrase")
+            return
+        if await count_banned_words(message.chat.id) + len(terms) > BANNED_WORDS_LIMIT:
+            await message.reply_text(f"❗ A chat can ban at most {BANNED_WORDS_LIMIT} words.")
+            return
+        added = await add_banned_words(message.chat.id, terms)
+        await message.reply_text(f"🚫 Banned {added} new word(s)")
+
+    @app.on_message(filters.command("unbanword") & filters.group)
+    @catch_errors
+    async def unbanword_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        terms = _parse_terms(message)
+        if not terms:
+            await message.reply_text("Usage: /unbanword word, another phrase")
+            return
+        removed = await remove_banned_words(message.chat.id, terms)
+        await message.reply_text(f"♻️ Removed {removed} word(s)")
+
+    @app.on_message(filters.command("bannedwords") & filters.group)
+    @catch_errors
+    async def bannedwords_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        words = await get_banned_words(message.chat.id)
+        if not words:
+            await message.reply_text("No banned words.")
+            return
+        text = "<b>Banned Words:</b>\n" + ", ".join(f"<code>{escape(w)}</code>" for w in words)
+        if len(text) > 4000:
+            text = text[:4000].rsplit(",", 1)[0] + f"\n… {len(words)} total"
+        await message.reply_text(text, parse_mode=ParseMode.HTML)
+
     # Approval system
     @app.on_message(filters.command("approve") & filters.group)
     @catch_errors
     async def approve_cmd(_, message: Message):
         if not await _require_admin_group(app, message):
             return
+        ids = await _bulk_user_ids(app, message)
+        if ids is not None:
+            if not ids:
+                await message.reply_text("📌 No user ids found.")
+                return
+            added = await approve_users(message.chat.id, ids)
+            await message.reply_text(f"✅ Approved {added} users ({len(ids) - added} already approved).")
+            return
         user = message.reply_to_message.from_user if message.reply_to_message else None
         if not user:
-            await message.reply_text("📌 Reply to a user's message.")
+            await message.reply_text("📌 Reply to a user's message, list user ids or reply to a text file of ids.")
             return
         await approve_user(message.chat.id, user.id)
         await message.reply_text(f"✅ Approved {user.mention}")
@@ -188,9 +378,17 @@ def register(app: Client) -> None:
     async def unapprove_cmd(_, message: Message):
         if not await _require_admin_group(app, message):
             return
+        ids = await _bulk_user_ids(app, message)
+        if ids is not None:
+            if not ids:
+                await message.reply_text("📌 No user ids found.")
+                return
+            removed = await unapprove_users(message.chat.id, ids)
+            await message.reply_text(f"❌ Unapproved {removed} users ({len(ids) - removed} were not approved).")
+            return
         user = message.reply_to_message.from_user if message.reply_to_message else None
         if not user:
-            await message.reply_text("📌 Reply to a user's message.")
+            await message.reply_text("📌 Reply to a user's message, list user ids or reply to a text file of ids.")
             return
         await unapprove_user(message.chat.id, user.id)
         await message.reply_text(f"❌ Unapproved {user.mention}")
@@ -200,12 +398,12 @@ def register(app: Client) -> None:
     async def approved_cmd(_, message: Message):
         if not await _require_admin_group(app, message):
             return
-        users = await get_approved(message.chat.id)
-        if not users:
+        page = await _load_approved_page(message.chat.id)
+        if page is None:
             await message.reply_text("No approved users.")
-        else:
-            text = "<b>Approved Users:</b>\n" + "\n".join(f"• <code>{uid}</code>" for uid in users)
-            await message.reply_text(text, parse_mode=ParseMode.HTML)
+            return
+        text, keyboard = page
+        await message.reply_text(text, reply_markup=keyboard, parse_mode=ParseMode.HTML)
 
     @app.on_message(filters.command("approval") & filters.group)
     @catch_errors
@@ -1,5 +1,8 @@
 import asyncio
 import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
 from pyrogram import Client, filters
 from pyrogram.enums import ParseMode
 from pyrogram.types import Message
@@ -10,13 +13,175 @@ from pyrogram.errors import (
 
 from config import OWNER_ID
 from utils.db import (
-    get_broadcast_groups,
-    get_broadcast_users,
+    iter_broadcast_targets,
+    count_broadcast_targets,
+    prune_broadcast_targets,
 )
 from utils.errors import catch_errors
+from utils.messages import safe_edit_message
 
 logger = logging.getLogger(__name__)
 
+BROADCAST_WORKERS = 16  # concurrent senders
+BROADCAST_RATE = 25  # messages per second, below Telegram's ~30/s bot limit
+BROADCAST_BURST = 5  # tokens that may be spent at once
+MAX_RETRIES = 3
+BACKOFF_BASE = 1  # seconds, doubled on every retry
+BACKOFF_MAX = 30
+PROGRESS_INTERVAL = 5  # seconds between progress edits
+PRUNE_BATCH_SIZE = 500  # dead chats removed per bulk write
+
+PERMANENT_ERRORS = (ChatWriteForbidden, UserKicked, PeerIdInvalid, UserIsBlocked)
+
+
+class TokenBucket:
+    """Global send budget shared by all broadcast workers."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens to every worker for ``seconds``."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                elapsed = max(now - self._updated, 0.0)
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastRun:
+    """Fan a payload out to many chats with a bounded pool of senders."""
+
+    def __init__(
+        self,
+        send: Callable[[int], Awaitable[object]],
+        *,
+        prune: Callable[[list[int]], Awaitable[int]] | None = None,
+        total: int = 0,
+        workers: int = BROADCAST_WORKERS,
+        rate: float = BROADCAST_RATE,
+    ) -> None:
+        self.send = send
+        self.prune = prune
+        self.total = total
+        self.workers = workers
+        self.bucket = TokenBucket(rate, BROADCAST_BURST)
+        self.sent = 0
+        self.failed = 0
+        self.pruned = 0
+        self.started = time.monotonic()
+        self._dead: list[int] = []
+
+    @property
+    def done(self) -> int:
+        return self.sent + self.failed
+
+    def eta(self) -> float | None:
+        elapsed = time.monotonic() - self.started
+        if not self.total or not self.done or elapsed <= 0:
+            return None
+        return max(self.total - self.done, 0) / (self.done / elapsed)
+
+    async def _deliver(self, chat_id: int) -> str:
+        """Send to one chat and return ``"sent"``, ``"dead"`` or ``"failed"``."""
+        for attempt in range(MAX_RETRIES + 1):
+            await self.bucket.acquire()
+            try:
+                await self.send(chat_id)
+                logger.debug("[BROADCAST] Sent to %s", chat_id)
+                return "sent"
+            except FloodWait as e:
+                logger.warning("⏳ FloodWait for %s: %s sec, pausing all senders", chat_id, e.value)
+                self.bucket.pause(e.value)
+            except PERMANENT_ERRORS as e:
+                logger.warning("⛔ Cannot send to %s: %s", chat_id, type(e).__name__)
+                return "dead"
+            except Exception as e:
+                if attempt == MAX_RETRIES:
+                    logger.error("❌ Giving up on %s: %s", chat_id, str(e))
+                    return "failed"
+                await asyncio.sleep(min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX))
+        logger.error("❌ Retries exhausted for %s", chat_id)
+        return "failed"
+
+    async def _flush_dead(self) -> None:
+        batch, self._dead = self._dead, []
+        if not batch or self.prune is None:
+            return
+        try:
+            self.pruned += await self.prune(batch)
+        except Exception as e:
+            logger.error("❌ Failed to prune %d dead chats: %s", len(batch), str(e))
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            chat_id = await queue.get()
+            if chat_id is None:
+                return
+            result = await self._deliver(chat_id)
+            if result == "sent":
+                self.sent += 1
+                continue
+            self.failed += 1
+            if result == "dead":
+                self._dead.append(chat_id)
+                if len(self._dead) >= PRUNE_BATCH_SIZE:
+                    await self._flush_dead()
+
+    async def run(self, targets: AsyncIterator[int]) -> None:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.workers)]
+        try:
+            async for chat_id in targets:
+                await queue.put(chat_id)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await self._flush_dead()
+
+
+def _format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "…"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {secs:02d}s"
+
+
+def _progress_text(run: BroadcastRun) -> str:
+    return (
+        f"📢 <b>Broadcasting…</b>\n"
+        f"Sent: <b>{run.sent}</b>\nFailed: <b>{run.failed}</b>\n"
+        f"Progress: <b>{run.done}/{run.total}</b>\nETA: <b>{_format_eta(run.eta())}</b>"
+    )
+
+
+async def _report_progress(status: Message, run: BroadcastRun) -> None:
+    while True:
+        await asyncio.sleep(PROGRESS_INTERVAL)
+        await safe_edit_message(status, text=_progress_text(run), parse_mode=ParseMode.HTML)
+
 
 def register(app: Client) -> None:
     logger.info("✅ Registered: broadcast.py")
@@ -32,57 +197,44 @@ def register(app: Client) -> None:
 
         # Support `/broadcast text` or reply-to-message
         if message.reply_to_message:
-            payload_msg = message.reply_to_message
+            # Refetch once: webhook updates carry only the media type, and copy() needs the file
+            payload_msg = await client.get_messages(message.chat.id, message.reply_to_message.id)
         elif len(message.command) >= 2:
             text = message.text.split(None, 1)[1]
         else:
             await message.reply_text("❗ Usage:\nReply to a message or use `/broadcast <text>`")
             return
 
-        groups = await get_broadcast_groups()
-        users = await get_broadcast_users()
-        targets = set(groups + users)
-        logger.debug(
-            "[BROADCAST] Sending to %d chats (%d groups, %d users)",
-            len(targets), len(groups), len(users)
-        )
-        sent, failed = 0, 0
+        async def send(chat_id: int):
+            if payload_msg:
+                return await payload_msg.copy(chat_id)
+            return await client.send_message(chat_id, text, parse_mode=ParseMode.HTML)
 
-        for chat_id in targets:
-            try:
-                if payload_msg:
-                    await payload_msg.copy(chat_id)
-                else:
-                    await client.send_message(chat_id, text, parse_mode=ParseMode.HTML)
-                sent += 1
-                logger.debug("[BROADCAST] Sent to %s", chat_id)
+        total = await count_broadcast_targets()
+        logger.debug("[BROADCAST] Sending to about %d chats", total)
 
-            except FloodWait as e:
-                logger.warning("⏳ FloodWait for %s: %s sec", chat_id, e.value)
-                await asyncio.sleep(e.value)
-                try:
-                    if payload_msg:
-                        await payload_msg.copy(chat_id)
-                    else:
-                        await client.send_message(chat_id, text, parse_mode=ParseMode.HTML)
-                    sent += 1
-                except Exception as e2:
-                    logger.error("❌ Retry failed for %s: %s", chat_id, str(e2))
-                    failed += 1
-
-            except (ChatWriteForbidden, UserKicked, PeerIdInvalid, UserIsBlocked) as e:
-                logger.warning("⛔ Cannot send to %s: %s", chat_id, type(e).__name__)
-                failed += 1
-
-            except Exception as e:
-                logger.error("❌ Unexpected error with %s: %s", chat_id, str(e))
-                failed += 1
+        run = BroadcastRun(send, prune=prune_broadcast_targets, total=total)
+        status = await message.reply_text(_progress_text(run), parse_mode=ParseMode.HTML)
+        reporter = asyncio.create_task(_report_progress(status, run))
+        try:
+            await run.run(iter_broadcast_targets())
+        finally:
+            reporter.cancel()
 
-            await asyncio.sleep(0.1)
+        elapsed = time.monotonic() - run.started
+        logger.info(
+            "[BROADCAST] Done: %d sent, %d failed, %d pruned in %.1fs",
+            run.sent, run.failed, run.pruned, elapsed,
+        )
 
         # Report summary
-        await message.reply_text(
-            f"✅ <b>Broadcast complete</b>\n"
-            f"Sent: <b>{sent}</b>\nFailed: <b>{failed}</b>",
-            parse_mode=ParseMode.HTML
+        await safe_edit_message(
+            status,
+            text=(
+                f"✅ <b>Broadcast complete</b>\n"
+                f"Sent: <b>{run.sent}</b>\nFailed: <b>{run.failed}</b>\n"
+                f"Pruned: <b>{run.pruned}</b>\n"
+                f"Time: <b>{_format_eta(elapsed)}</b>"
+            ),
+            parse_mode=ParseMode.HTML,
         )
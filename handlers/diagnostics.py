@@ -0,0 +1,101 @@
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+from html import escape
+
+from pyrogram import Client, filters
+from pyrogram.enums import ParseMode
+from pyrogram.types import Message
+
+from config import OWNER_ID
+from utils.db import storage_health
+from utils.errors import catch_errors, handler_latency_stats
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DEFAULT_SECONDS = 10
+PROFILE_MAX_SECONDS = 120
+PROFILE_TOP = 15  # functions listed in the report
+MAX_REPORT_CHARS = 3500  # leaves room for markup under Telegram's 4096 limit
+# Selector waits are the loop idling, not work worth listing
+IDLE_MARKERS = ("select.epoll", "select.kqueue", "select.poll", "select.select")
+
+# Only one profiler may be attached to the event loop at a time
+_profile_lock = asyncio.Lock()
+
+
+def _format_profile(profiler: cProfile.Profile, top: int = PROFILE_TOP) -> str:
+    stats = pstats.Stats(profiler)
+    busy = [item for item in stats.stats.items() if not any(m in item[0][2] for m in IDLE_MARKERS)]
+    rows = sorted(busy, key=lambda item: item[1][2], reverse=True)[:top]
+    lines = [f"{'self ms':>8}{'cum ms':>9}{'calls':>8}  function"]
+    for (filename, lineno, name), (_, calls, tottime, cumtime, _) in rows:
+        where = f"{filename.rsplit('/', 1)[-1]}:{lineno}" if lineno else filename
+        lines.append(f"{tottime * 1000:>8.1f}{cumtime * 1000:>9.1f}{calls:>8}  {name} ({where})")
+    return "\n".join(lines)
+
+
+def _format_latency() -> str:
+    rows = [f"{'handler':<24}{'calls':>8}{'p50 ms':>9}{'p99 ms':>9}"]
+    for row in handler_latency_stats():
+        rows.append(f"{row['handler'][:23]:<24}{row['calls']:>8}{row['p50_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+    health = storage_health()
+    rows.append(
+        f"\nstorage: {health['state']}, {health['trips']} trips, "
+        f"{health['rejected']} rejected, {health['queued_writes']} queued writes"
+    )
+    return "\n".join(rows)
+
+
+def register(app: Client) -> None:
+    logger.info("✅ Registered: diagnostics.py")
+
+    # 🔬 Profile the live event loop for N seconds (owner only)
+    @app.on_message(filters.command("profile") & filters.user(OWNER_ID))
+    @catch_errors
+    async def profile_cmd(client: Client, message: Message) -> None:
+        try:
+            seconds = int(message.command[1]) if len(message.command) > 1 else PROFILE_DEFAULT_SECONDS
+        except ValueError:
+            await message.reply_text("❗ Usage: /profile [seconds]")
+            return
+        seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+
+        if _profile_lock.locked():
+            await message.reply_text("⏳ A profile is already running.")
+            return
+
+        async with _profile_lock:
+            logger.info("[DIAG] Profiling for %ss, requested by %s", seconds, message.from_user.id)
+            status = await message.reply_text(f"🔬 Profiling for {seconds}s…")
+            # Handlers all run on the loop thread, so profiling it while this
+            # coroutine sleeps captures everything else the bot does meanwhile.
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+
+        report = _format_profile(profiler)
+        if len(report) > MAX_REPORT_CHARS:
+            await status.edit_text(f"🔬 <b>Top functions over {seconds}s</b> (by self time)", parse_mode=ParseMode.HTML)
+            buf = io.BytesIO(report.encode("utf-8"))
+            buf.name = "profile.txt"
+            await message.reply_document(buf)
+            return
+        await status.edit_text(
+            f"🔬 <b>Top functions over {seconds}s</b> (by self time)\n<pre>{escape(report)}</pre>",
+            parse_mode=ParseMode.HTML,
+        )
+
+    # ⏱️ Rolling handler latency percentiles (owner only)
+    @app.on_message(filters.command("latency") & filters.user(OWNER_ID))
+    @catch_errors
+    async def latency_cmd(client: Client, message: Message) -> None:
+        await message.reply_text(
+            "⏱️ <b>Handler latency</b> (recent calls)\n<pre>" + escape(_format_latency()) + "</pre>",
+            parse_mode=ParseMode.HTML,
+        )
@@ -1,40 +1,111 @@
 import asyncio
 import logging
-import re
-import time
 from contextlib import suppress
+from typing import Callable
 
 from pyrogram import Client, filters
-from pyrogram.enums import ParseMode
+from pyrogram.enums import ParseMode, MessageEntityType
 from pyrogram.types import Message, ChatPermissions
 
+from utils.antiflood import FloodDetector, FLOOD_DEFAULT_WINDOW
+from utils.cache import TTLCache
 from utils.errors import catch_errors
+from utils.links import contains_link
 from utils.db import (
     get_setting,
     get_bio_filter,
+    get_chat_settings,
     increment_warning,
-    reset_warning,
+    WARN_LIMIT,
     is_approved,
-    get_approval_mode,
+    cached_is_approved,
+    get_banned_automaton,
+    ChatSettings,
 )
-from utils.perms import is_admin
+from utils.perms import is_admin, cached_is_admin
+from utils.metrics import REGISTRY, track_cache
+from utils.pipeline import Pipeline, any_true
+from utils.wordfilter import WordAutomaton
+from utils.scheduler import DeleteScheduler
 
 logger = logging.getLogger(__name__)
 
-LINK_RE = re.compile(
-    r"(?:https?://\S+|tg://\S+|t\.me/\S+|telegram\.me/\S+|(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,})",
-    re.IGNORECASE,
-)
+LINK_ENTITY_TYPES = {MessageEntityType.URL, MessageEntityType.TEXT_LINK}
 
 # Cache user bios to avoid excessive get_chat calls
-_user_bio_cache: dict[int, tuple[str, float]] = {}
 BIO_CACHE_TTL = 15 * 60  # 15 minutes
+BIO_CACHE_SIZE = 50_000  # users
+_user_bio_cache = TTLCache(maxsize=BIO_CACHE_SIZE, ttl=BIO_CACHE_TTL, keep_stale=True)
+track_cache("user_bios", _user_bio_cache.stats)
 
-_bio_violation_cache: dict[tuple[int, int], float] = {}
 BIO_VIOLATION_TTL = 20  # seconds - set low for easier debug
-
-def contains_link(text: str) -> bool:
-    return bool(LINK_RE.search(text or ""))
+BIO_VIOLATION_SIZE = 10_000  # (chat, user) pairs
+_bio_violation_cache = TTLCache(maxsize=BIO_VIOLATION_SIZE, ttl=BIO_VIOLATION_TTL)
+
+_flood_detector = FloodDetector()
+
+# Created by register() once the client exists
+delete_scheduler: DeleteScheduler | None = None
+# Chats whose saved auto-deletes the scheduler restores; webhook workers set it before register()
+delete_owner: Callable[[int], bool] = lambda chat_id: True
+
+_scheduled_deletes = REGISTRY.gauge("scheduled_deletes", "Messages waiting to be auto-deleted.")
+
+
+@REGISTRY.collector
+def _collect_scheduler_depth() -> None:
+    _scheduled_deletes.set(delete_scheduler.depth if delete_scheduler else 0)
+
+# Every non-service group message runs through these stages, cheapest first:
+# 0 = message attributes, 1 = in-memory state, 2 = text scans,
+# 3 = Telegram API calls, 4 = side effects that never stop the run.
+group_pipeline = Pipeline("group_message")
+
+
+class MessageContext:
+    """State shared by the stages handling one group message."""
+
+    __slots__ = ("client", "message", "user", "chat_id", "settings", "automaton", "_exempt")
+
+    def __init__(self, client: Client, message: Message) -> None:
+        self.client = client
+        self.message = message
+        self.user = message.from_user
+        self.chat_id = message.chat.id
+        self.settings: ChatSettings | None = None
+        self.automaton: WordAutomaton | None = None
+        self._exempt: asyncio.Future | None = None
+
+    def exempt(self) -> asyncio.Future:
+        """
+        Future telling whether the sender skips every filter (admin or approved).
+        Started on first use and shared by every later stage.
+        """
+        if self._exempt is None:
+            uid = self.user.id
+            admin = cached_is_admin(self.chat_id, uid)
+            approved = cached_is_approved(self.chat_id, uid)
+            if admin or approved or (admin is False and approved is False):
+                self._exempt = asyncio.get_running_loop().create_future()
+                self._exempt.set_result(bool(admin or approved))
+            else:
+                checks = []
+                if admin is None:
+                    checks.append(is_admin(self.client, self.message, uid))
+                if approved is None:
+                    checks.append(is_approved(self.chat_id, uid, probed=True))
+                self._exempt = asyncio.ensure_future(any_true(*checks))
+        return self._exempt
+
+    async def is_exempt(self) -> bool:
+        return await self.exempt()
+
+def message_has_link(message: Message) -> bool:
+    """Trust the link entities Telegram already parsed, then scan the text."""
+    entities = message.entities or message.caption_entities or ()
+    if any(entity.type in LINK_ENTITY_TYPES for entity in entities):
+        return True
+    return contains_link(message.text or message.caption)
 
 async def suppress_delete(message: Message):
     with suppress(Exception):
@@ -45,7 +116,7 @@ def build_warning(count: int, user, reason: str, is_final: bool = False):
     msg = (
         f"🔇 <b>Final Warning for {name}</b>\n\n{reason}\nYou have been <b>muted</b>."
         if is_final
-        else f"⚠️ <b>Warning {count}/3 for {name}</b>\n\n{reason}\nFix this before you're muted."
+        else f"⚠️ <b>Warning {count}/{WARN_LIMIT} for {name}</b>\n\n{reason}\nFix this before you're muted."
     )
     return msg, None
 
@@ -53,7 +124,7 @@ async def handle_violation(client: Client, message: Message, user, chat_id: int,
     logger.debug("[FILTER] Violation by %s in %s: %s", user.id, chat_id, reason)
     await suppress_delete(message)
     count = await increment_warning(chat_id, user.id)
-    if count >= 3:
+    if count >= WARN_LIMIT:
         try:
             await client.restrict_chat_member(
                 chat_id,
@@ -62,36 +133,30 @@ async def handle_violation(client: Client, message: Message, user, chat_id: int,
             )
         except Exception as e:
             logger.warning("Mute failed: %s", e)
-        await reset_warning(chat_id, user.id)
-    msg, _ = build_warning(count, user, reason, is_final=(count >= 3))
+    msg, _ = build_warning(count, user, reason, is_final=(count >= WARN_LIMIT))
     try:
         await message.reply_text(msg, parse_mode=ParseMode.HTML, quote=True)
     except Exception as e:
         logger.warning("Failed to send violation reply: %s", e)
 
 async def get_user_bio(client: Client, user) -> str:
-    now = time.monotonic()
-    cached = _user_bio_cache.get(user.id)
-    if cached and now - cached[1] < BIO_CACHE_TTL:
-        return cached[0]
+    async def fetch_bio() -> str:
+        chat = await client.get_chat(user.id)
+        return getattr(chat, "bio", "") or ""
 
     try:
-        chat = await client.get_chat(user.id)
-        bio = getattr(chat, "bio", "") or ""
-        _user_bio_cache[user.id] = (bio, now)
-        return bio
+        return await _user_bio_cache.get_or_load(user.id, fetch_bio)
     except Exception as e:
         logger.warning("Failed to fetch bio for %s: %s", user.id, e)
-        return cached[0] if cached else ""
+        # Keep checking against the last known bio rather than none at all
+        return _user_bio_cache.stale(user.id, "")
 
 async def bio_link_violation(client: Client, message: Message, user, chat_id: int) -> bool:
     if not await get_bio_filter(chat_id):
         logger.debug("Bio link filter OFF for chat %s", chat_id)
         return False
 
-    now = time.monotonic()
-    last = _bio_violation_cache.get((chat_id, user.id), 0)
-    if now - last < BIO_VIOLATION_TTL:
+    if _bio_violation_cache.get((chat_id, user.id)):
         logger.debug("Bio violation check throttled for %s/%s", chat_id, user.id)
         return False
 
@@ -110,78 +175,133 @@ async def bio_link_violation(client: Client, message: Message, user, chat_id: in
             chat_id,
             "Your bio contains a link, which is not allowed.",
         )
-        _bio_violation_cache[(chat_id, user.id)] = now
+        _bio_violation_cache.set((chat_id, user.id), True)
         return True
     else:
         logger.debug("User %s bio clean in %s", user.id, chat_id)
         return False
 
-def register(app: Client) -> None:
-    logger.info("✅ Registered: filters.py")
-
-    edited_messages: set[tuple[int, int]] = set()
+async def schedule_auto_delete(chat_id: int, msg_id: int, fallback: int | None = None):
+    try:
+        delay = int(await get_setting(chat_id, "autodelete_interval", "0") or 0)
+    except (TypeError, ValueError):
+        delay = 0
+    if delay <= 0:
+        delay = fallback or 0
+    if delay > 0:
+        delete_scheduler.schedule(chat_id, msg_id, delay)
+
+@group_pipeline.stage("sender", cost=0)
+async def skip_bots(ctx: MessageContext) -> bool:
+    # Covers the bot's own messages as well
+    return not ctx.user or ctx.user.is_bot
+
+@group_pipeline.stage("inactive", cost=1)
+async def skip_unfiltered_chats(ctx: MessageContext) -> bool:
+    """Stop before any admin/approval lookup when the chat has no filter on."""
+    settings = ctx.settings = await get_chat_settings(ctx.chat_id)
+    ctx.automaton = await get_banned_automaton(ctx.chat_id)
+    return not (
+        settings.number("flood_limit") > 0
+        or settings.enabled("approval_mode")
+        or settings.enabled("linkfilter")
+        or settings.enabled("biofilter")
+        or settings.number("autodelete_interval") > 0
+        or ctx.automaton is not None
+    )
 
-    async def delete_later(chat_id: int, msg_id: int, delay: int) -> None:
-        await asyncio.sleep(delay)
-        try:
-            await app.delete_messages(chat_id, msg_id)
-        except Exception as e:
-            logger.warning("Failed to delete message %s/%s: %s", chat_id, msg_id, e)
-        finally:
-            edited_messages.discard((chat_id, msg_id))
+@group_pipeline.stage("flood", cost=1)
+async def check_flood(ctx: MessageContext) -> bool:
+    limit = ctx.settings.number("flood_limit")
+    if limit <= 0:
+        return False
+    window = ctx.settings.number("flood_window") or FLOOD_DEFAULT_WINDOW
+    # Exemption is only looked up for the rare message that crosses the limit
+    if not _flood_detector.hit(ctx.chat_id, ctx.user.id, limit, window) or await ctx.is_exempt():
+        return False
+    logger.debug("[FILTER] Flood by %s in %s", ctx.user.id, ctx.chat_id)
+    await handle_violation(
+        ctx.client,
+        ctx.message,
+        ctx.user,
+        ctx.chat_id,
+        "You are sending messages too fast.",
+    )
+    return True
 
-    async def schedule_auto_delete(chat_id: int, msg_id: int, fallback: int | None = None):
-        try:
-            delay = int(await get_setting(chat_id, "autodelete_interval", "0") or 0)
-        except (TypeError, ValueError):
-            delay = 0
-        if delay <= 0:
-            delay = fallback or 0
-        if delay > 0:
-            asyncio.create_task(delete_later(chat_id, msg_id, delay))
+@group_pipeline.stage("approval", cost=1)
+async def check_approval(ctx: MessageContext) -> bool:
+    if not ctx.settings.enabled("approval_mode") or await ctx.is_exempt():
+        return False
+    await suppress_delete(ctx.message)
+    await ctx.message.reply_text("❌ You are not approved to speak here.", quote=True)
+    return True
 
-    @app.on_message(filters.group & ~filters.service, group=1)
-    @catch_errors
-    async def moderate_message(client: Client, message: Message) -> None:
-        if not message.from_user or message.from_user.is_bot:
-            return
-        if (await client.get_me()).id == message.from_user.id:
-            return
+@group_pipeline.stage("links", cost=2)
+async def check_links(ctx: MessageContext) -> bool:
+    if not ctx.settings.enabled("linkfilter"):
+        return False
+    if not message_has_link(ctx.message) or await ctx.is_exempt():
+        return False
+    logger.debug("[FILTER] Link removed in %s from %s", ctx.chat_id, ctx.user.id)
+    await handle_violation(
+        ctx.client,
+        ctx.message,
+        ctx.user,
+        ctx.chat_id,
+        "You are not allowed to share links in this group.",
+    )
+    return True
 
-        chat_id = message.chat.id
-        user = message.from_user
+@group_pipeline.stage("banned_words", cost=2)
+async def check_banned_words(ctx: MessageContext) -> bool:
+    term = ctx.automaton.search(ctx.message.text or ctx.message.caption) if ctx.automaton else None
+    if not term or await ctx.is_exempt():
+        return False
+    logger.debug("[FILTER] Banned word %r removed in %s from %s", term, ctx.chat_id, ctx.user.id)
+    await handle_violation(
+        ctx.client,
+        ctx.message,
+        ctx.user,
+        ctx.chat_id,
+        "Your message contains a word that is banned in this group.",
+    )
+    return True
 
-        is_admin_user = await is_admin(client, message, user.id)
-        is_approved_user = await is_approved(chat_id, user.id)
-        needs_filtering = not is_admin_user and not is_approved_user
+@group_pipeline.stage("bio", cost=3)
+async def check_bio(ctx: MessageContext) -> bool:
+    if not ctx.settings.enabled("biofilter") or _bio_violation_cache.peek((ctx.chat_id, ctx.user.id)):
+        return False
+    exempt = ctx.exempt()
+    if not exempt.done():
+        # Fetch the bio while the exemption is resolved; drop it if exempt
+        bio = asyncio.ensure_future(get_user_bio(ctx.client, ctx.user))
+        await asyncio.wait({exempt, bio}, return_when=asyncio.FIRST_COMPLETED)
+        if exempt.done() and exempt.result():
+            bio.cancel()
+            return False
+    if await exempt:
+        return False
+    return await bio_link_violation(ctx.client, ctx.message, ctx.user, ctx.chat_id)
 
-        if needs_filtering and await bio_link_violation(client, message, user, chat_id):
-            return
+@group_pipeline.stage("autodelete", cost=4)
+async def queue_auto_delete(ctx: MessageContext) -> bool:
+    delay = ctx.settings.number("autodelete_interval")
+    if delay > 0 and not await ctx.is_exempt():
+        delete_scheduler.schedule(ctx.chat_id, ctx.message.id, delay)
+    return False
 
-        if needs_filtering and await get_approval_mode(chat_id):
-            await suppress_delete(message)
-            await message.reply_text("❌ You are not approved to speak here.", quote=True)
-            return
+def register(app: Client) -> None:
+    global delete_scheduler
+    logger.info("✅ Registered: filters.py")
 
-        content = message.text or message.caption or ""
-        if (
-            content
-            and needs_filtering
-            and str(await get_setting(chat_id, "linkfilter", "0")) == "1"
-            and contains_link(content)
-        ):
-            logger.debug("[FILTER] Link removed in %s from %s", chat_id, user.id)
-            await handle_violation(
-                client,
-                message,
-                user,
-                chat_id,
-                "You are not allowed to share links in this group.",
-            )
-            return
+    delete_scheduler = DeleteScheduler(app, owns=delete_owner)
+    delete_scheduler.start()
 
-        if needs_filtering:
-            await schedule_auto_delete(chat_id, message.id)
+    @app.on_message(filters.group & ~filters.service, group=1)
+    @catch_errors
+    async def moderate_message(client: Client, message: Message) -> None:
+        await group_pipeline.run(MessageContext(client, message))
 
     @app.on_edited_message(filters.group & ~filters.service, group=1)
     @catch_errors
@@ -190,16 +310,12 @@ def register(app: Client) -> None:
             return
 
         chat_id = message.chat.id
-        user = message.from_user
-        if await is_admin(client, message, user.id) or await is_approved(chat_id, user.id):
-            return
-
         if str(await get_setting(chat_id, "editmode", "0")) != "1":
             return
+        if await MessageContext(client, message).is_exempt():
+            return
 
-        key = (chat_id, message.id)
-        if key not in edited_messages:
-            edited_messages.add(key)
+        if not delete_scheduler.is_pending(chat_id, message.id):
             await schedule_auto_delete(chat_id, message.id, fallback=0)
 
     @app.on_message(filters.new_chat_members & filters.group, group=1)
@@ -1,11 +1,13 @@
 import logging
+from html import escape
 from pyrogram import Client, filters
 from pyrogram.types import Message
 from pyrogram.enums import ParseMode, ChatType
 
 from utils.errors import catch_errors
 from handlers.panels import send_start  # ✅ Panel entry
-from config import LOG_GROUP_ID
+from handlers.filters import group_pipeline
+from config import LOG_GROUP_ID, OWNER_ID
 
 logger = logging.getLogger(__name__)
 
@@ -56,22 +58,23 @@ def register(app: Client) -> None:
         await message.reply_text("🏓 Pong!")
 
     # ✅ DM fallback (non-command)
-    @app.on_message(filters.private & ~filters.command(["start", "help", "menu", "panel", "id", "ping"]))
+    @app.on_message(filters.private & ~filters.command(["start", "help", "menu", "panel", "id", "ping", "stats", "profile", "latency"]))
     @catch_errors
     async def dm_fallback(client: Client, message: Message) -> None:
         logger.info("[DM FALLBACK] %s: %s", message.from_user.id, message.text)
         # Do not reply to unknown private messages to avoid spamming users
         return
 
-    # ✅ Group fallback (non-command, non-service)
-    @app.on_message(filters.group & ~filters.command(["start", "help", "menu", "panel", "id", "ping"]) & ~filters.service)
+    # 📊 Where group-message handling spends its time (owner only)
+    @app.on_message(filters.command("stats") & filters.user(OWNER_ID))
     @catch_errors
-    async def group_fallback(client: Client, message: Message) -> None:
-        logger.debug(
-            "[GROUP FALLBACK] chat=%s user=%s text=%s",
-            message.chat.id,
-            message.from_user.id if message.from_user else "?",
-            message.text,
+    async def stats_cmd(client: Client, message: Message) -> None:
+        rows = [f"{'stage':<13}{'runs':>9}{'stops':>8}{'avg µs':>9}"]
+        for row in group_pipeline.stats():
+            rows.append(f"{row['stage']:<13}{row['runs']:>9}{row['stops']:>8}{row['avg_us']:>9.1f}")
+        await message.reply_text(
+            "📊 <b>Group pipeline</b>\n<pre>" + escape("\n".join(rows)) + "</pre>",
+            parse_mode=ParseMode.HTML,
         )
 
     # 📌 Track when the bot is added to a group so broadcast works reliably
@@ -4,17 +4,15 @@ from pyrogram.enums import ParseMode
 from pyrogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 
 from config import SUPPORT_CHAT_URL, DEVELOPER_URL
+from utils.callbacks import router
 from utils.errors import catch_errors
-from utils.db import (
-    set_bio_filter, get_bio_filter,
-    get_setting, set_setting
-)
+from utils.db import ChatSettings, toggle_setting
 from utils.messages import safe_edit_message
 from utils.perms import is_admin
 from handlers.panels import (
+    HELP_CAPTION,
     send_start,
     get_help_keyboard,
-    build_settings_panel,
     render_settings_panel,
 )
 
@@ -42,6 +40,16 @@ HELP_SECTIONS = {
         "Deletes edited messages by normal users.\n"
         "Use <code>/editfilter on|off</code>."
     ),
+    "help_antiflood": (
+        "🌊 <b>AntiFlood</b>\n"
+        "Warns and eventually mutes users who send too many messages too fast.\n"
+        "Use <code>/antiflood &lt;messages&gt; [seconds]</code> or <code>/antiflood off</code>."
+    ),
+    "help_banwords": (
+        "🚫 <b>BannedWords</b>\n"
+        "Deletes non-admin messages containing a banned word or phrase.\n"
+        "Use <code>/banword a, b</code>, <code>/unbanword a</code> and <code>/bannedwords</code>."
+    ),
     "help_admin": (
         "👮 <b>Admin Commands</b>\n"
         "/ban, /unban - Ban or unban users\n"
@@ -56,116 +64,94 @@ HELP_SECTIONS = {
 }
 
 
-def register(app: Client) -> None:
-    logger.info("✅ Registered: logging_handler.py")
+# Built once; every help page shares them
+SUPPORT_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔗 Join Support", url=SUPPORT_CHAT_URL)],
+    [InlineKeyboardButton("🔙 Back", callback_data="cb_help_start")]
+])
+DEVELOPER_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("✉️ Message Developer", url=DEVELOPER_URL)],
+    [InlineKeyboardButton("🔙 Back", callback_data="cb_help_start")]
+])
+# callback data -> (caption, keyboard) of pages that never change
+STATIC_PAGES = {
+    "cb_help_start": (HELP_CAPTION, get_help_keyboard("cb_start")),
+    "cb_help_panel": (HELP_CAPTION, get_help_keyboard("cb_start")),
+    "help_support": ("🆘 <b>Need help?</b>", SUPPORT_KEYBOARD),
+    "help_developer": ("👨‍💻 <b>Developer Info</b>", DEVELOPER_KEYBOARD),
+    **{data: (caption, get_help_keyboard("cb_help_start")) for data, caption in HELP_SECTIONS.items()},
+}
+
 
-    @app.on_callback_query(group=1)
-    @catch_errors
-    async def handle_callback(client: Client, query: CallbackQuery):
-        data = query.data
-        user_id = query.from_user.id
-        chat_id = query.message.chat.id if query.message else "N/A"
-
-        logger.debug(f"[CALLBACK] From user {user_id} in chat {chat_id} → data: {data}")
-
-        if data in {"cb_start", "cb_back_panel"}:
-            await query.answer()
-            await send_start(
-                client,
-                query.message,
-                include_back=(data == "cb_back_panel"),
-                log_panel=False,
-            )
-
-        elif data == "open_settings":
-            await query.answer()
-            await render_settings_panel(client, query.message)
-            if not await is_admin(client, query.message, user_id):
-                await query.answer("Read-only view", show_alert=False)
-
-        elif data.startswith("toggle_"):
-            if await is_admin(client, query.message, user_id):
-                await query.answer("Toggled ✅")
-                await _handle_toggle(data, query.message.chat.id)
-                await render_settings_panel(client, query.message)
-            else:
-                await query.answer("Admins only", show_alert=True)
-
-        elif data in {"cb_help_start", "cb_help_panel"}:
-            await query.answer()
-            await safe_edit_message(
-                query.message,
-                caption="📘 <b>Command Help</b>\n\nUse the buttons below to learn more.",
-                reply_markup=get_help_keyboard("cb_start"),
-                parse_mode=ParseMode.HTML,
-            )
-
-        elif data == "help_admin":
-            await query.answer()
-            await safe_edit_message(
-                query.message,
-                caption=HELP_SECTIONS.get("help_admin", ""),
-                reply_markup=get_help_keyboard("cb_help_start"),
-                parse_mode=ParseMode.HTML,
-            )
-
-        elif data in HELP_SECTIONS:
-            await query.answer()
-            await safe_edit_message(
-                query.message,
-                caption=HELP_SECTIONS[data],
-                reply_markup=get_help_keyboard("cb_help_start"),
-                parse_mode=ParseMode.HTML,
-            )
-
-        elif data == "help_support":
-            await query.answer()
-            await safe_edit_message(
-                query.message,
-                caption="🆘 <b>Need help?</b>",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🔗 Join Support", url=SUPPORT_CHAT_URL)],
-                    [InlineKeyboardButton("🔙 Back", callback_data="cb_help_start")]
-                ]),
-                parse_mode=ParseMode.HTML,
-            )
-
-        elif data == "help_developer":
-            await query.answer()
-            await safe_edit_message(
-                query.message,
-                caption="👨‍💻 <b>Developer Info</b>",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("✉️ Message Developer", url=DEVELOPER_URL)],
-                    [InlineKeyboardButton("🔙 Back", callback_data="cb_help_start")]
-                ]),
-                parse_mode=ParseMode.HTML,
-            )
-
-        else:
-            logger.warning(f"⚠️ Unknown callback data received: {data}")
-            await query.answer("⚠️ Unknown action", show_alert=True)
+@router.exact("cb_start", "cb_back_panel")
+@catch_errors
+async def start_cb(client: Client, query: CallbackQuery):
+    await query.answer()
+    await send_start(
+        client,
+        query.message,
+        include_back=(query.data == "cb_back_panel"),
+        log_panel=False,
+    )
 
 
+@router.exact("open_settings")
+@catch_errors
+async def open_settings_cb(client: Client, query: CallbackQuery):
+    if await is_admin(client, query.message, query.from_user.id):
+        await query.answer()
+    else:
+        await query.answer("Read-only view", show_alert=False)
+    await render_settings_panel(client, query.message)
+
+
+@router.prefix("toggle_")
+@catch_errors
+async def toggle_cb(client: Client, query: CallbackQuery):
+    if not await is_admin(client, query.message, query.from_user.id):
+        await query.answer("Admins only", show_alert=True)
+        return
+    settings = await _handle_toggle(query.data, query.message.chat.id)
+    if settings is None:
+        await query.answer("⚠️ Unknown action", show_alert=True)
+        return
+    await query.answer("Toggled ✅")
+    await render_settings_panel(client, query.message, settings)
+
+
+@router.exact(*STATIC_PAGES)
+@catch_errors
+async def static_page_cb(client: Client, query: CallbackQuery):
+    caption, keyboard = STATIC_PAGES[query.data]
+    await query.answer()
+    await safe_edit_message(
+        query.message,
+        caption=caption,
+        reply_markup=keyboard,
+        parse_mode=ParseMode.HTML,
+    )
 
 
-# ⚙️ Toggle settings and update DB
-async def _handle_toggle(data: str, chat_id: int):
-    if data == "toggle_biolink":
-        current = await get_bio_filter(chat_id)
-        await set_bio_filter(chat_id, not current)
+def register(app: Client) -> None:
+    logger.info("✅ Registered: logging_handler.py")
+    # One handler for every button; routes are registered where they are defined
+    router.install(app, group=1)
 
-    elif data == "toggle_linkfilter":
-        current = str(await get_setting(chat_id, "linkfilter", "0")) == "1"
-        await set_setting(chat_id, "linkfilter", "0" if current else "1")
 
-    elif data == "toggle_editfilter":
-        current = str(await get_setting(chat_id, "editmode", "0")) == "1"
-        await set_setting(chat_id, "editmode", "0" if current else "1")
+# ⚙️ Toggle settings and update DB
+# callback data -> (setting key, value stored when switched on)
+TOGGLES = {
+    "toggle_biolink": ("biofilter", "1"),
+    "toggle_linkfilter": ("linkfilter", "1"),
+    "toggle_editfilter": ("editmode", "1"),
+    "toggle_autodelete": ("autodelete_interval", "30"),
+}
 
-    elif data == "toggle_autodelete":
-        delay = int(await get_setting(chat_id, "autodelete_interval", "0") or 0)
-        await set_setting(chat_id, "autodelete_interval", "0" if delay else "30")
 
-    else:
+async def _handle_toggle(data: str, chat_id: int) -> ChatSettings | None:
+    """Flip one setting in a single write; returns the chat's updated settings."""
+    toggle = TOGGLES.get(data)
+    if toggle is None:
         logger.warning(f"🛑 Unrecognized toggle key: {data}")
+        return None
+    return await toggle_setting(chat_id, *toggle)
@@ -1,5 +1,6 @@
 import os
 import logging
+from functools import lru_cache
 from html import escape
 from pyrogram import Client, filters
 from pyrogram.enums import ParseMode, ChatType
@@ -7,8 +8,8 @@ from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton,
 
 from utils.perms import is_admin
 from utils.db import (
-    get_setting,
-    get_bio_filter,
+    ChatSettings,
+    get_chat_settings,
     add_group,
     add_user,
     add_broadcast_group,
@@ -28,7 +29,7 @@ def mention_html(user_id: int, name: str) -> str:
 
 
 # 🔘 Start Panel (DM)
-async def build_start_panel(is_admin: bool = False, *, is_owner: bool = False, include_back: bool = False) -> InlineKeyboardMarkup:
+def _start_panel(is_owner: bool, include_back: bool) -> InlineKeyboardMarkup:
     buttons = [[InlineKeyboardButton("📘 Commands", callback_data="cb_help_start")]]
     # Show settings button to everyone so non-admins can view the panel too
     buttons.insert(0, [InlineKeyboardButton("⚙️ Settings", callback_data="open_settings")])
@@ -39,14 +40,25 @@ async def build_start_panel(is_admin: bool = False, *, is_owner: bool = False, i
     return InlineKeyboardMarkup(buttons)
 
 
+# Every variant built once; markups are only read when sent
+START_PANELS = {
+    (is_owner, include_back): _start_panel(is_owner, include_back)
+    for is_owner in (False, True)
+    for include_back in (False, True)
+}
+
+
+async def build_start_panel(is_admin: bool = False, *, is_owner: bool = False, include_back: bool = False) -> InlineKeyboardMarkup:
+    return START_PANELS[bool(is_owner), bool(include_back)]
+
+
 # ⚙️ Settings Panel (Group)
-async def build_settings_panel(chat_id: int) -> InlineKeyboardMarkup:
-    bio = await get_bio_filter(chat_id)
-    link = str(await get_setting(chat_id, "linkfilter", "0")) == "1"
-    edit = str(await get_setting(chat_id, "editmode", "0")) == "1"
-    delay = int(await get_setting(chat_id, "autodelete_interval", "0") or 0)
+SETTINGS_CAPTION = "⚙️ <b>Group Settings</b>"
 
-    buttons = [
+
+@lru_cache(maxsize=256)
+def _settings_keyboard(bio: bool, link: bool, edit: bool, delay: int) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup([
         [InlineKeyboardButton(f"🌐 BioLink {'✅' if bio else '❌'}", callback_data="toggle_biolink")],
         [InlineKeyboardButton(f"🔗 LinkFilter {'✅' if link else '❌'}", callback_data="toggle_linkfilter")],
         [InlineKeyboardButton(f"✏️ EditFilter {'✅' if edit else '❌'}", callback_data="toggle_editfilter")],
@@ -55,8 +67,19 @@ async def build_settings_panel(chat_id: int) -> InlineKeyboardMarkup:
             callback_data="toggle_autodelete"
         )],
         [InlineKeyboardButton("🔙 Back", callback_data="cb_start")],
-    ]
-    return InlineKeyboardMarkup(buttons)
+    ])
+
+
+async def build_settings_panel(chat_id: int, settings: ChatSettings | None = None) -> InlineKeyboardMarkup:
+    # Pass the document a toggle returned to render without reading it again
+    if settings is None:
+        settings = await get_chat_settings(chat_id)
+    return _settings_keyboard(
+        settings.enabled("biofilter"),
+        settings.enabled("linkfilter"),
+        settings.enabled("editmode"),
+        settings.number("autodelete_interval"),
+    )
 
 
 # 📩 Welcome / Panel Sender
@@ -121,12 +144,17 @@ async def send_control_panel(client: Client, message: Message) -> None:
 
 
 # ❓ Help Menu Keyboard
-def get_help_keyboard(back_cb: str) -> InlineKeyboardMarkup:
+HELP_CAPTION = "📘 <b>Command Help</b>\n\nUse the buttons below to learn more."
+
+
+def _help_keyboard(back_cb: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup([
         [InlineKeyboardButton("🛡️ BioMode", callback_data="help_biomode")],
         [InlineKeyboardButton("🧹 AutoDelete", callback_data="help_autodelete")],
         [InlineKeyboardButton("🔗 LinkFilter", callback_data="help_linkfilter")],
         [InlineKeyboardButton("✏️ EditMode", callback_data="help_editmode")],
+        [InlineKeyboardButton("🚫 BannedWords", callback_data="help_banwords")],
+        [InlineKeyboardButton("🌊 AntiFlood", callback_data="help_antiflood")],
         [InlineKeyboardButton("👮 Admin", callback_data="help_admin")],
         [InlineKeyboardButton("📢 Broadcast", callback_data="help_broadcast")],
         [
@@ -137,13 +165,21 @@ def get_help_keyboard(back_cb: str) -> InlineKeyboardMarkup:
     ])
 
 
+HELP_KEYBOARDS = {back_cb: _help_keyboard(back_cb) for back_cb in ("cb_start", "cb_help_start")}
+
+
+def get_help_keyboard(back_cb: str) -> InlineKeyboardMarkup:
+    keyboard = HELP_KEYBOARDS.get(back_cb)
+    return keyboard if keyboard is not None else _help_keyboard(back_cb)
+
+
 # 🔁 Render group settings panel for a message or callback
-async def render_settings_panel(client: Client, message: Message) -> None:
+async def render_settings_panel(client: Client, message: Message, settings: ChatSettings | None = None) -> None:
     chat_id = message.chat.id
-    markup = await build_settings_panel(chat_id)
+    markup = await build_settings_panel(chat_id, settings)
     await safe_edit_message(
         message,
-        caption="⚙️ <b>Group Settings</b>",
+        caption=SETTINGS_CAPTION,
         reply_markup=markup,
         parse_mode=ParseMode.HTML,
     )
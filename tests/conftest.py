@@ -0,0 +1,10 @@
+"""Make the repository importable and fill in dummy credentials for ``config``."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+for _name, _value in {"BOT_TOKEN": "0:test", "API_ID": "1", "API_HASH": "test"}.items():
+    os.environ.setdefault(_name, _value)
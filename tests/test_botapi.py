@@ -0,0 +1,80 @@
+"""Bot API JSON → Pyrogram conversion used by webhook workers."""
+
+from pyrogram.enums import ChatMemberStatus, ChatType, MessageEntityType, MessageMediaType, MessageServiceType
+from pyrogram.handlers import CallbackQueryHandler, ChatMemberUpdatedHandler, EditedMessageHandler, MessageHandler
+
+from utils.botapi import parse_update, update_chat_id
+
+CHAT = {"id": -1001, "type": "supergroup", "title": "Test group"}
+USER = {"id": 42, "is_bot": False, "first_name": "Ann", "username": "ann"}
+
+
+def message(**extra):
+    return {"message_id": 7, "date": 1700000000, "chat": CHAT, "from": USER, **extra}
+
+
+def test_text_message_with_entities_and_reply():
+    update = {
+        "update_id": 1,
+        "message": message(
+            text="see https://x.io",
+            entities=[{"type": "url", "offset": 4, "length": 12}],
+            reply_to_message=message(message_id=3, text="hi"),
+        ),
+    }
+    msg, handler_type = parse_update(None, update)
+    assert handler_type is MessageHandler
+    assert msg.id == 7
+    assert msg.chat.id == -1001 and msg.chat.type is ChatType.SUPERGROUP
+    assert msg.from_user.id == 42 and msg.from_user.username == "ann"
+    assert msg.text == "see https://x.io"
+    assert msg.entities[0].type is MessageEntityType.URL
+    assert (msg.entities[0].offset, msg.entities[0].length) == (4, 12)
+    assert msg.reply_to_message_id == 3 and msg.reply_to_message.text == "hi"
+    assert msg.date.timestamp() == 1700000000
+
+
+def test_media_caption_and_service_messages():
+    msg, _ = parse_update(None, {"message": message(photo=[{"file_id": "a"}], caption="pic")})
+    assert msg.media is MessageMediaType.PHOTO and msg.caption == "pic" and msg.text is None
+
+    joined, _ = parse_update(None, {"message": message(new_chat_members=[USER, {"id": 43, "first_name": "Bo"}])})
+    assert joined.service is MessageServiceType.NEW_CHAT_MEMBERS
+    assert [user.id for user in joined.new_chat_members] == [42, 43]
+
+
+def test_edited_message_and_callback_query():
+    _, handler_type = parse_update(None, {"edited_message": message(text="x", edit_date=1700000100)})
+    assert handler_type is EditedMessageHandler
+
+    query, handler_type = parse_update(None, {
+        "callback_query": {"id": "99", "from": USER, "chat_instance": "c", "data": "toggle_linkfilter",
+                           "message": message(text="panel")},
+    })
+    assert handler_type is CallbackQueryHandler
+    assert query.data == "toggle_linkfilter" and query.message.chat.id == -1001
+
+
+def test_chat_member_updated():
+    member, handler_type = parse_update(None, {
+        "chat_member": {
+            "chat": CHAT, "from": USER, "date": 1700000000,
+            "old_chat_member": {"status": "member", "user": USER},
+            "new_chat_member": {"status": "kicked", "user": USER, "until_date": 0},
+        },
+    })
+    assert handler_type is ChatMemberUpdatedHandler
+    assert member.old_chat_member.status is ChatMemberStatus.MEMBER
+    assert member.new_chat_member.status is ChatMemberStatus.BANNED
+
+
+def test_unsupported_update_is_skipped():
+    assert parse_update(None, {"update_id": 1, "poll": {"id": "1"}}) is None
+
+
+def test_update_chat_id():
+    assert update_chat_id({"update_id": 1, "message": message()}) == -1001
+    assert update_chat_id({"callback_query": {"id": "1", "from": USER, "message": message()}}) == -1001
+    # Without a message the sender decides the shard
+    assert update_chat_id({"callback_query": {"id": "1", "from": USER, "inline_message_id": "x"}}) == 42
+    assert update_chat_id({"update_id": 1}) is None
@@ -0,0 +1,126 @@
+"""Circuit breaker state machine: closed → open → half-open → closed."""
+
+import asyncio
+
+import pytest
+
+from utils.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+COOLDOWN = 0.05
+
+
+def breaker(**kwargs):
+    options = {"failures": 2, "cooldown": COOLDOWN, "is_failure": lambda exc: isinstance(exc, ConnectionError)}
+    return CircuitBreaker("test", **{**options, **kwargs})
+
+
+async def ok():
+    return "ok"
+
+
+async def down():
+    raise ConnectionError("unreachable")
+
+
+async def bad_request():
+    raise ValueError("rejected")
+
+
+async def fail(b, func=down, exc=ConnectionError):
+    with pytest.raises(exc):
+        await b.call(func)
+
+
+def test_trips_after_failures_and_rejects_calls():
+    async def run():
+        b = breaker()
+        await fail(b)
+        assert b.state == CLOSED
+        await fail(b)
+        assert b.state == OPEN and b.trips == 1
+        await fail(b, ok, CircuitOpenError)
+        assert b.rejected == 1
+
+    asyncio.run(run())
+
+
+def test_probe_closes_and_runs_callbacks():
+    async def run():
+        closed = []
+        b = breaker()
+        b.on_close(lambda: closed.append(b.state))
+        await fail(b)
+        await fail(b)
+        await asyncio.sleep(COOLDOWN)
+
+        gate = asyncio.Event()
+
+        async def slow_ok():
+            await gate.wait()
+            return "ok"
+
+        probe = asyncio.ensure_future(b.call(slow_ok))
+        await asyncio.sleep(0)
+        assert b.state == HALF_OPEN
+        # Only one probe at a time
+        await fail(b, ok, CircuitOpenError)
+        gate.set()
+        assert await probe == "ok"
+        assert b.state == CLOSED and closed == [CLOSED]
+
+    asyncio.run(run())
+
+
+def test_failed_probe_reopens():
+    async def run():
+        b = breaker()
+        await fail(b)
+        await fail(b)
+        await asyncio.sleep(COOLDOWN)
+        await fail(b)
+        assert b.state == OPEN and b.trips == 2
+        await fail(b, ok, CircuitOpenError)
+
+    asyncio.run(run())
+
+
+def test_rejected_requests_do_not_trip():
+    async def run():
+        b = breaker()
+        for _ in range(5):
+            await fail(b, bad_request, ValueError)
+        assert b.state == CLOSED
+        assert await b.call(ok) == "ok"
+
+    asyncio.run(run())
+
+
+def test_timeouts_trip_even_if_not_transient():
+    async def run():
+        b = breaker(timeout=0.01, is_failure=lambda exc: False)
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        await fail(b, hang, asyncio.TimeoutError)
+        await fail(b, hang, asyncio.TimeoutError)
+        assert b.state == OPEN
+
+    asyncio.run(run())
+
+
+def test_slow_calls_count_but_not_for_scans():
+    async def run():
+        b = breaker(slow_call=0.01)
+
+        async def slow():
+            await asyncio.sleep(0.02)
+
+        await b.call_scan(slow)
+        await b.call_scan(slow)
+        assert b.state == CLOSED
+        await b.call(slow)
+        await b.call(slow)
+        assert b.state == OPEN
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+"""TTLCache expiry, stale serving and in-flight load coalescing."""
+
+import asyncio
+import time
+
+from utils.cache import TTLCache
+
+
+def test_expired_entries_are_dropped_unless_kept_stale():
+    plain = TTLCache(maxsize=10, ttl=60)
+    kept = TTLCache(maxsize=10, ttl=60, keep_stale=True)
+    for cache in (plain, kept):
+        cache.set("k", "v", ttl=0)
+        assert cache.get("k") is None
+    assert plain.stale("k") is None
+    assert kept.stale("k") == "v"
+    assert "k" not in kept
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_concurrent_misses_share_one_load():
+    calls = []
+
+    async def loader():
+        calls.append(time.monotonic())
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        cache = TTLCache(maxsize=10, ttl=60)
+        results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(5)))
+        assert results == ["value"] * 5
+        assert len(calls) == 1 and cache.coalesced == 4
+        assert cache.get("k") == "value"
+
+    asyncio.run(run())
+
+
+def test_loads_in_flight_during_invalidation_are_not_stored():
+    async def run():
+        for drop in ("invalidate", "clear"):
+            cache = TTLCache(maxsize=10, ttl=60)
+            gate = asyncio.Event()
+
+            async def outdated():
+                await gate.wait()
+                return "outdated"
+
+            async def fresh():
+                return "fresh"
+
+            pending = asyncio.ensure_future(cache.get_or_load("k", outdated))
+            await asyncio.sleep(0)
+            cache.invalidate("k") if drop == "invalidate" else cache.clear()
+            # A later miss starts its own load instead of joining the outdated one
+            assert await cache.get_or_load("k", fresh) == "fresh"
+            gate.set()
+            assert await pending == "outdated"
+            assert cache.get("k") == "fresh", drop
+
+    asyncio.run(run())
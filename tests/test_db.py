@@ -0,0 +1,109 @@
+"""utils.db while storage fails: stale reads, queued writes and their replay."""
+
+import asyncio
+
+import pytest
+
+from utils import db
+from utils.breaker import CLOSED, OPEN, CircuitBreaker
+from utils.storage.memory import MemoryStorage
+
+COOLDOWN = 0.05
+
+
+class FlakyStorage(MemoryStorage):
+    """Memory storage that raises a transient error while ``down``."""
+
+    transient_errors = (ConnectionError,)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.down = False
+        self.applied: list[tuple[str, str]] = []
+
+    def _check(self) -> None:
+        if self.down:
+            raise ConnectionError("storage down")
+
+    async def load_settings(self, chat_id):
+        self._check()
+        return await super().load_settings(chat_id)
+
+    async def set_setting(self, chat_id, key, value, origin):
+        self._check()
+        self.applied.append((key, value))
+        await super().set_setting(chat_id, key, value, origin)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FlakyStorage()
+    breaker = CircuitBreaker("storage", failures=2, cooldown=COOLDOWN, is_failure=store.is_transient)
+    breaker.on_close(db._schedule_replay)
+    monkeypatch.setattr(db, "_store", store)
+    monkeypatch.setattr(db, "_breaker", breaker)
+    monkeypatch.setattr(db, "_replay_task", None)
+    db._replay.clear()
+    db._invalidate_all()
+    yield store
+    db._replay.clear()
+    db._invalidate_all()
+
+
+async def trip(store):
+    store.down = True
+    for chat_id in (101, 102):
+        db._settings_cache.invalidate(chat_id)
+        await db.get_chat_settings(chat_id)
+    assert db._breaker.state == OPEN
+
+
+def test_stale_settings_are_served_while_storage_is_down(store):
+    async def run():
+        await db.set_setting(1, "linkfilter", "1")
+        assert (await db.get_chat_settings(1)).enabled("linkfilter")
+        # Expire the snapshot, then lose storage
+        db._settings_cache.set(1, db._settings_cache.stale(1), ttl=0)
+        store.down = True
+        assert (await db.get_chat_settings(1)).enabled("linkfilter")
+        await trip(store)
+        assert (await db.get_chat_settings(1)).enabled("linkfilter")
+        # Never loaded: no settings rather than an error
+        assert (await db.get_chat_settings(2)).values == {}
+
+    asyncio.run(run())
+
+
+def test_writes_queue_while_open_and_replay_in_order(store):
+    async def run():
+        await db.get_chat_settings(1)
+        await trip(store)
+        await db.set_setting(1, "a", "1")
+        await db.set_setting(1, "b", "2")
+        await db.set_setting(1, "a", "3")
+        assert store.applied == [] and len(db._replay) == 3
+        # The snapshot already reflects the queued writes
+        assert (await db.get_chat_settings(1)).values == {"a": "3", "b": "2"}
+
+        store.down = False
+        await asyncio.sleep(COOLDOWN)
+        # The probe closes the breaker, which starts the replay
+        db._settings_cache.invalidate(1)
+        await db.get_chat_settings(1)
+        assert db._breaker.state == CLOSED
+        await db._replay_task
+        assert store.applied == [("a", "1"), ("b", "2"), ("a", "3")]
+        assert not db._replay
+        assert await store.load_settings(1) == {"a": "3", "b": "2"}
+
+    asyncio.run(run())
+
+
+def test_writes_failing_in_flight_are_raised_not_queued(store):
+    async def run():
+        store.down = True
+        with pytest.raises(ConnectionError):
+            await db.set_setting(1, "a", "1")
+        assert not db._replay
+
+    asyncio.run(run())
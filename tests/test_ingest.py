@@ -0,0 +1,109 @@
+"""Webhook front end, chat sharding and ordered dispatch in workers."""
+
+import asyncio
+import json
+import random
+import sys
+from types import SimpleNamespace
+
+from pyrogram.handlers import MessageHandler
+
+from utils.http import request
+from utils.ingest import SECRET_HEADER, WebhookFrontend, consume_updates, shard_for
+
+SECRET = "s3cret"
+WORKERS = 2
+# Stub worker: appends every update line it receives to out-<index>.jsonl
+STUB_WORKER = "import sys; out = open(sys.argv[1], 'w')\nfor line in sys.stdin: out.write(line); out.flush()"
+
+
+def update(chat_id, seq):
+    return {
+        "update_id": seq,
+        "message": {
+            "message_id": seq,
+            "date": 1700000000,
+            "chat": {"id": chat_id, "type": "supergroup"},
+            "from": {"id": 1, "first_name": "U"},
+            "text": str(seq),
+        },
+    }
+
+
+def test_shard_for_is_stable_and_in_range():
+    chats = [-1001234567890, -1009876543210, -42, 7, 2**40 + 3]
+    for workers in (1, 2, 3, 8):
+        first = [shard_for(chat_id, workers) for chat_id in chats]
+        assert first == [shard_for(chat_id, workers) for chat_id in chats]
+        assert all(0 <= shard < workers for shard in first)
+    assert shard_for(None, 4) == 0
+    # Consecutive chats spread over every worker
+    assert {shard_for(-1001000000000 - i, 4) for i in range(4)} == {0, 1, 2, 3}
+
+
+def test_consume_updates_keeps_order_per_chat():
+    seen: dict[int, list[int]] = {}
+    in_flight = {"now": 0, "max": 0}
+
+    async def record(_, message):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(random.uniform(0, 0.01))
+        seen.setdefault(message.chat.id, []).append(message.id)
+        in_flight["now"] -= 1
+
+    client = SimpleNamespace(dispatcher=SimpleNamespace(groups={0: [MessageHandler(record)]}))
+
+    async def run():
+        reader = asyncio.StreamReader()
+        for seq in range(30):
+            for chat_id in (-1, -2, -3):
+                reader.feed_data(json.dumps(update(chat_id, seq)).encode() + b"\n")
+        reader.feed_data(b"not json\n")
+        reader.feed_eof()
+        await consume_updates(client, reader)
+
+    random.seed(1)
+    asyncio.run(run())
+    assert seen == {chat_id: list(range(30)) for chat_id in (-1, -2, -3)}
+    # Different chats were handled concurrently
+    assert in_flight["max"] > 1
+
+
+def test_frontend_routes_updates_to_chat_shards(tmp_path):
+    outputs = [tmp_path / f"out-{i}.jsonl" for i in range(WORKERS)]
+
+    async def run():
+        frontend = WebhookFrontend(
+            "127.0.0.1", 0, "/hook", SECRET, WORKERS,
+            lambda index: [sys.executable, "-c", STUB_WORKER, str(outputs[index])],
+        )
+        await frontend.start()
+        port = frontend.server.port
+        try:
+            for _ in range(100):
+                if (await request("127.0.0.1", port, path="/health")).status == 200:
+                    break
+                await asyncio.sleep(0.05)
+            else:
+                raise AssertionError("workers did not start")
+
+            post = {"method": "POST", "path": "/hook"}
+            headers = {SECRET_HEADER: SECRET}
+            assert (await request("127.0.0.1", port, **post, body=b"{}", headers={SECRET_HEADER: "x"})).status == 403
+            assert (await request("127.0.0.1", port, **post, body=b"[1]", headers=headers)).status == 400
+            assert (await request("127.0.0.1", port, path="/hook")).status == 405
+            for seq in range(10):
+                for chat_id in (-1001, -1002):
+                    body = json.dumps(update(chat_id, seq), indent=1).encode()
+                    assert (await request("127.0.0.1", port, **post, body=body, headers=headers)).status == 200
+        finally:
+            await frontend.stop()
+
+    asyncio.run(run())
+    for index, path in enumerate(outputs):
+        received = [json.loads(line)["message"] for line in path.read_text().splitlines()]
+        expected = [chat_id for chat_id in (-1001, -1002) if shard_for(chat_id, WORKERS) == index]
+        assert {msg["chat"]["id"] for msg in received} == set(expected)
+        for chat_id in expected:
+            assert [msg["message_id"] for msg in received if msg["chat"]["id"] == chat_id] == list(range(10))
@@ -0,0 +1,80 @@
+"""Behaviour every storage backend must share, run against memory and SQLite."""
+
+import asyncio
+
+import pytest
+
+from utils.storage import open_storage
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def uri(request, tmp_path):
+    return "memory://" if request.param == "memory" else f"sqlite:///{tmp_path / 'bot.db'}"
+
+
+def with_store(uri, scenario):
+    async def run():
+        store = open_storage(uri, "test")
+        await store.connect()
+        try:
+            await scenario(store)
+        finally:
+            await store.close()
+
+    asyncio.run(run())
+
+
+def test_settings_set_and_toggle(uri):
+    async def scenario(store):
+        assert await store.load_settings(1) == {}
+        await store.set_setting(1, "flood_limit", "5", "me")
+        assert await store.toggle_setting(1, "linkfilter", "1", "me") == {"flood_limit": "5", "linkfilter": "1"}
+        assert (await store.toggle_setting(1, "linkfilter", "1", "me"))["linkfilter"] == "0"
+        assert await store.load_settings(2) == {}
+
+    with_store(uri, scenario)
+
+
+def test_approvals(uri):
+    async def scenario(store):
+        assert await store.approve_many(1, [5, 3, 9]) == 3
+        assert await store.approve_many(1, [3, 4]) == 1
+        await store.approve(1, 7)
+        assert sorted(await store.load_approved(1)) == [3, 4, 5, 7, 9]
+        assert await store.approved_page(1, 3, 2) == [4, 5]
+        assert await store.approved_page(1, 7, 2, descending=True) == [5, 4]
+        assert await store.unapprove_many(1, [4, 8]) == 1
+        await store.unapprove(1, 9)
+        assert await store.count_approved(1) == 3
+        assert await store.load_approved(2) == []
+
+    with_store(uri, scenario)
+
+
+def test_warnings_count_up_and_reset(uri):
+    async def scenario(store):
+        assert [await store.increment_warning(1, 5, 3, 3600) for _ in range(2)] == [1, 2]
+        assert await store.increment_warning(1, 6, 3, 3600) == 1
+        await store.reset_warning(1, 5)
+        assert await store.increment_warning(1, 5, 3, 3600) == 1
+
+    with_store(uri, scenario)
+
+
+def test_scheduled_deletes(uri):
+    async def scenario(store):
+        await store.add_scheduled_deletes([(1, 10, 100.0), (1, 11, 101.0), (2, 20, 102.0)])
+        await store.remove_scheduled_deletes(1, [10])
+        assert sorted(await store.scheduled_deletes()) == [(1, 11, 101.0), (2, 20, 102.0)]
+
+    with_store(uri, scenario)
+
+
+def test_changed_chats_report_origin(uri):
+    async def scenario(store):
+        await store.bump_version(1, "a")
+        await store.bump_version(1, "b")
+        rows = await store.changed_chats(0)
+        assert [(chat_id, version, origin) for chat_id, version, origin, _ in rows] == [(1, 2, "b")]
+
+    with_store(uri, scenario)
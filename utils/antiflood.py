@@ -0,0 +1,57 @@
+"""In-memory sliding-window flood detection."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+
+FLOOD_DEFAULT_WINDOW = 10  # seconds when a chat sets only a message count
+FLOOD_WINDOW_MAX = 120  # seconds; longest window a chat may configure
+FLOOD_SWEEP_INTERVAL = 60  # seconds between idle-entry sweeps
+
+
+class FloodDetector:
+    """
+    Ring buffer of recent message times per (chat, user).
+    A user floods once ``limit`` messages fall inside ``window`` seconds.
+    Nothing here touches the database.
+    """
+
+    def __init__(self, sweep_interval: float = FLOOD_SWEEP_INTERVAL) -> None:
+        self.sweep_interval = sweep_interval
+        self._recent: dict[tuple[int, int], deque[float]] = {}
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def hit(self, chat_id: int, user_id: int, limit: int, window: float, now: float | None = None) -> bool:
+        """Record a message and return True if it pushes the user over the limit."""
+        now = time.monotonic() if now is None else now
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+        key = (chat_id, user_id)
+        recent = self._recent.get(key)
+        if recent is None or recent.maxlen != limit:
+            recent = deque(recent or (), maxlen=limit)
+            self._recent[key] = recent
+        recent.append(now)
+
+        if len(recent) == limit and now - recent[0] <= window:
+            # Start counting afresh so one burst escalates once
+            recent.clear()
+            return True
+        return False
+
+    def sweep(self, now: float | None = None) -> int:
+        """Evict users idle for longer than any window; returns how many were dropped."""
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        idle = [key for key, recent in self._recent.items() if not recent or now - recent[-1] > FLOOD_WINDOW_MAX]
+        for key in idle:
+            del self._recent[key]
+        return len(idle)
+
+
+__all__ = ["FloodDetector", "FLOOD_DEFAULT_WINDOW", "FLOOD_WINDOW_MAX"]
@@ -0,0 +1,225 @@
+"""Build Pyrogram objects from Bot API webhook updates.
+
+Webhook deliveries arrive as Bot API JSON while every handler is written
+against Pyrogram types. Only what the handlers and filters read is carried
+over: media is reduced to its type, and messages that need their full
+content (e.g. to copy them) must be fetched again by id.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pyrogram import Client, types
+from pyrogram.enums import ChatMemberStatus, ChatType, MessageEntityType, MessageMediaType, MessageServiceType
+from pyrogram.handlers import (
+    CallbackQueryHandler,
+    ChatMemberUpdatedHandler,
+    EditedMessageHandler,
+    MessageHandler,
+)
+from pyrogram.handlers.handler import Handler
+from pyrogram.types.messages_and_media.message import Str
+from pyrogram.utils import timestamp_to_datetime
+
+# Update kinds to request from Telegram with setWebhook
+ALLOWED_UPDATES = ("message", "edited_message", "callback_query", "chat_member", "my_chat_member")
+
+CHAT_TYPES = {
+    "private": ChatType.PRIVATE,
+    "group": ChatType.GROUP,
+    "supergroup": ChatType.SUPERGROUP,
+    "channel": ChatType.CHANNEL,
+}
+
+MEMBER_STATUSES = {
+    "creator": ChatMemberStatus.OWNER,
+    "administrator": ChatMemberStatus.ADMINISTRATOR,
+    "member": ChatMemberStatus.MEMBER,
+    "restricted": ChatMemberStatus.RESTRICTED,
+    "left": ChatMemberStatus.LEFT,
+    "kicked": ChatMemberStatus.BANNED,
+}
+
+MEDIA_KEYS = {
+    "photo": MessageMediaType.PHOTO,
+    "video": MessageMediaType.VIDEO,
+    "animation": MessageMediaType.ANIMATION,
+    "document": MessageMediaType.DOCUMENT,
+    "audio": MessageMediaType.AUDIO,
+    "voice": MessageMediaType.VOICE,
+    "video_note": MessageMediaType.VIDEO_NOTE,
+    "sticker": MessageMediaType.STICKER,
+    "contact": MessageMediaType.CONTACT,
+    "location": MessageMediaType.LOCATION,
+    "venue": MessageMediaType.VENUE,
+    "poll": MessageMediaType.POLL,
+    "dice": MessageMediaType.DICE,
+    "game": MessageMediaType.GAME,
+}
+
+SERVICE_KEYS = {
+    "new_chat_members": MessageServiceType.NEW_CHAT_MEMBERS,
+    "left_chat_member": MessageServiceType.LEFT_CHAT_MEMBERS,
+    "new_chat_title": MessageServiceType.NEW_CHAT_TITLE,
+    "new_chat_photo": MessageServiceType.NEW_CHAT_PHOTO,
+    "delete_chat_photo": MessageServiceType.DELETE_CHAT_PHOTO,
+    "group_chat_created": MessageServiceType.GROUP_CHAT_CREATED,
+    "supergroup_chat_created": MessageServiceType.GROUP_CHAT_CREATED,
+    "channel_chat_created": MessageServiceType.CHANNEL_CHAT_CREATED,
+    "migrate_to_chat_id": MessageServiceType.MIGRATE_TO_CHAT_ID,
+    "migrate_from_chat_id": MessageServiceType.MIGRATE_FROM_CHAT_ID,
+    "pinned_message": MessageServiceType.PINNED_MESSAGE,
+    "video_chat_scheduled": MessageServiceType.VIDEO_CHAT_SCHEDULED,
+    "video_chat_started": MessageServiceType.VIDEO_CHAT_STARTED,
+    "video_chat_ended": MessageServiceType.VIDEO_CHAT_ENDED,
+    "video_chat_participants_invited": MessageServiceType.VIDEO_CHAT_MEMBERS_INVITED,
+    "web_app_data": MessageServiceType.WEB_APP_DATA,
+}
+
+
+def parse_user(client: Client, data: dict[str, Any] | None) -> types.User | None:
+    if not data:
+        return None
+    return types.User(
+        client=client,
+        id=data["id"],
+        is_bot=data.get("is_bot"),
+        is_premium=data.get("is_premium"),
+        first_name=data.get("first_name"),
+        last_name=data.get("last_name"),
+        username=data.get("username"),
+        language_code=data.get("language_code"),
+    )
+
+
+def parse_chat(client: Client, data: dict[str, Any] | None) -> types.Chat | None:
+    if not data:
+        return None
+    return types.Chat(
+        client=client,
+        id=data["id"],
+        type=CHAT_TYPES.get(data.get("type"), ChatType.PRIVATE),
+        title=data.get("title"),
+        username=data.get("username"),
+        first_name=data.get("first_name"),
+        last_name=data.get("last_name"),
+    )
+
+
+def parse_entities(client: Client, data: list[dict[str, Any]] | None) -> list[types.MessageEntity] | None:
+    # Offsets are UTF-16 code units in both APIs
+    if not data:
+        return None
+    return [
+        types.MessageEntity(
+            client=client,
+            type=getattr(MessageEntityType, entity["type"].upper(), MessageEntityType.UNKNOWN),
+            offset=entity["offset"],
+            length=entity["length"],
+            url=entity.get("url"),
+            user=parse_user(client, entity.get("user")),
+            language=entity.get("language"),
+            custom_emoji_id=entity.get("custom_emoji_id"),
+        )
+        for entity in data
+    ]
+
+
+def parse_message(client: Client, data: dict[str, Any] | None) -> types.Message | None:
+    if not data:
+        return None
+    entities = parse_entities(client, data.get("entities"))
+    caption_entities = parse_entities(client, data.get("caption_entities"))
+    reply = data.get("reply_to_message")
+    new_members = data.get("new_chat_members")
+    return types.Message(
+        client=client,
+        id=data["message_id"],
+        from_user=parse_user(client, data.get("from")),
+        sender_chat=parse_chat(client, data.get("sender_chat")),
+        date=timestamp_to_datetime(data.get("date")),
+        edit_date=timestamp_to_datetime(data.get("edit_date")),
+        chat=parse_chat(client, data.get("chat")),
+        text=Str(data["text"]).init(entities) if "text" in data else None,
+        entities=entities,
+        caption=Str(data["caption"]).init(caption_entities) if "caption" in data else None,
+        caption_entities=caption_entities,
+        media=next((kind for key, kind in MEDIA_KEYS.items() if key in data), None),
+        service=next((kind for key, kind in SERVICE_KEYS.items() if key in data), None),
+        media_group_id=data.get("media_group_id"),
+        reply_to_message_id=reply["message_id"] if reply else None,
+        reply_to_message=parse_message(client, reply),
+        new_chat_members=[parse_user(client, user) for user in new_members] if new_members else None,
+        left_chat_member=parse_user(client, data.get("left_chat_member")),
+        via_bot=parse_user(client, data.get("via_bot")),
+    )
+
+
+def parse_callback_query(client: Client, data: dict[str, Any]) -> types.CallbackQuery:
+    return types.CallbackQuery(
+        client=client,
+        id=data["id"],
+        from_user=parse_user(client, data["from"]),
+        chat_instance=data.get("chat_instance"),
+        message=parse_message(client, data.get("message")),
+        inline_message_id=data.get("inline_message_id"),
+        data=data.get("data"),
+        game_short_name=data.get("game_short_name"),
+    )
+
+
+def parse_chat_member(client: Client, data: dict[str, Any] | None) -> types.ChatMember | None:
+    if not data:
+        return None
+    return types.ChatMember(
+        client=client,
+        status=MEMBER_STATUSES.get(data.get("status"), ChatMemberStatus.MEMBER),
+        user=parse_user(client, data.get("user")),
+        custom_title=data.get("custom_title"),
+        until_date=timestamp_to_datetime(data.get("until_date")),
+    )
+
+
+def parse_chat_member_updated(client: Client, data: dict[str, Any]) -> types.ChatMemberUpdated:
+    return types.ChatMemberUpdated(
+        client=client,
+        chat=parse_chat(client, data["chat"]),
+        from_user=parse_user(client, data.get("from")),
+        date=timestamp_to_datetime(data.get("date")),
+        old_chat_member=parse_chat_member(client, data.get("old_chat_member")),
+        new_chat_member=parse_chat_member(client, data.get("new_chat_member")),
+    )
+
+
+def parse_update(client: Client, update: dict[str, Any]) -> tuple[Any, type[Handler]] | None:
+    """Return the Pyrogram object and the handler type that receives it, or None if unsupported."""
+    if "message" in update:
+        return parse_message(client, update["message"]), MessageHandler
+    if "edited_message" in update:
+        return parse_message(client, update["edited_message"]), EditedMessageHandler
+    if "callback_query" in update:
+        return parse_callback_query(client, update["callback_query"]), CallbackQueryHandler
+    for key in ("chat_member", "my_chat_member"):
+        if key in update:
+            return parse_chat_member_updated(client, update[key]), ChatMemberUpdatedHandler
+    return None
+
+
+def update_chat_id(update: dict[str, Any]) -> int | None:
+    """Chat an update belongs to, falling back to the sender for chat-less updates."""
+    for key, payload in update.items():
+        if not isinstance(payload, dict):
+            continue
+        if key == "callback_query":
+            payload = payload.get("message") or payload
+        chat = payload.get("chat")
+        if chat:
+            return chat["id"]
+        sender = payload.get("from")
+        if sender:
+            return sender["id"]
+    return None
+
+
+__all__ = ["ALLOWED_UPDATES", "parse_update", "update_chat_id"]
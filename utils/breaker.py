@@ -0,0 +1,145 @@
+"""Circuit breaker that stops calls to a failing or slow dependency."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+BREAKER_WINDOW = 20  # most recent calls considered when deciding to trip
+BREAKER_FAILURES = 5  # failed or slow calls within the window that trip it
+BREAKER_SLOW_CALL = 0.5  # seconds after which a successful call still counts against it
+BREAKER_TIMEOUT = 2.0  # seconds before a call is abandoned and counted as failed
+BREAKER_SCAN_TIMEOUT = 60.0  # same for scans, whose duration grows with the data read
+BREAKER_COOLDOWN = 15.0  # seconds open before a single probe call is let through
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the dependency while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed: calls pass through and their outcome is recorded.
+    Open: calls fail immediately with ``CircuitOpenError``.
+    Half-open: after the cooldown one probe call decides whether to close again.
+    Timeouts always count as failures; other errors only if ``is_failure``
+    accepts them, so a rejected request does not fail every later call.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: int = BREAKER_WINDOW,
+        failures: int = BREAKER_FAILURES,
+        slow_call: float = BREAKER_SLOW_CALL,
+        timeout: float = BREAKER_TIMEOUT,
+        scan_timeout: float = BREAKER_SCAN_TIMEOUT,
+        cooldown: float = BREAKER_COOLDOWN,
+        is_failure: Callable[[BaseException], bool] = lambda exc: True,
+    ) -> None:
+        self.name = name
+        self.failures = failures
+        self.slow_call = slow_call
+        self.timeout = timeout
+        self.scan_timeout = scan_timeout
+        self.cooldown = cooldown
+        self.is_failure = is_failure
+        self.state = CLOSED
+        self.rejected = 0
+        self.trips = 0
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True = failed or slow
+        self._opened_at = 0.0
+        self._probing = False
+        self._on_close: list[Callable[[], None]] = []
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def on_close(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` whenever the breaker closes after being open."""
+        self._on_close.append(callback)
+
+    def _admit(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def _trip(self) -> None:
+        if self.state != OPEN:
+            self.trips += 1
+            logger.warning("⚡ Circuit %s opened; failing fast for %.0fs", self.name, self.cooldown)
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._outcomes.clear()
+        logger.info("✅ Circuit %s closed", self.name)
+        for callback in self._on_close:
+            callback()
+
+    def _record(self, bad: bool, probe: bool) -> None:
+        if probe:
+            self._probing = False
+            if bad:
+                self._trip()
+            else:
+                self._close()
+            return
+        self._outcomes.append(bad)
+        if self.state == CLOSED and sum(self._outcomes) >= self.failures:
+            self._trip()
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        return await self._call(func, args, self.timeout, self.slow_call)
+
+    async def call_scan(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """
+        Like ``call`` for reads and batches sized by the data (a whole chat's
+        approvals, every registered chat): a long timeout, and slowness alone
+        never counts against the dependency.
+        """
+        return await self._call(func, args, self.scan_timeout, None)
+
+    async def _call(
+        self, func: Callable[..., Awaitable[Any]], args: tuple, timeout: float, slow_call: float | None
+    ) -> Any:
+        if not self._admit():
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} is unavailable")
+        probe = self.state == HALF_OPEN
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(func(*args), timeout)
+        except asyncio.CancelledError:
+            # Cancellation of the caller says nothing about the dependency
+            if probe:
+                self._probing = False
+            raise
+        except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError) or self.is_failure(exc):
+                self._record(True, probe)
+            elif probe:
+                # Neither does a rejected request; the next call probes instead
+                self._probing = False
+            raise
+        self._record(slow_call is not None and time.monotonic() - start > slow_call, probe)
+        return result
+
+
+__all__ = ["CircuitBreaker", "CircuitOpenError", "CLOSED", "HALF_OPEN", "OPEN"]
@@ -0,0 +1,120 @@
+"""Bounded in-memory caches shared by handlers and helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU cache with per-entry expiry and a max-entries budget.
+    Concurrent misses for the same key share a single loader call.
+    With ``keep_stale`` expired entries stay until evicted or replaced, so
+    callers can fall back to them when reloading fails.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, keep_stale: bool = False) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.keep_stale = keep_stale
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if not self.keep_stale:
+                del self._data[key]
+        self.misses += 1
+        return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry without touching LRU order or counters."""
+        entry = self._data.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return default
+        return entry[0]
+
+    def stale(self, key: Hashable, default: Any = None) -> Any:
+        """Return an entry even if it has expired; needs ``keep_stale``."""
+        entry = self._data.get(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop ``key``; a load already in flight for it returns but is not stored."""
+        self._data.pop(key, None)
+        # Later misses start a fresh load instead of joining the outdated one
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry; loads already in flight return but are not stored."""
+        self._data.clear()
+        self._inflight.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value or await ``loader`` once for all waiting callers."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        if self._inflight.get(key) is asyncio.current_task():
+            self.set(key, value)
+        return value
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "size": len(self._data),
+        }
+
+
+__all__ = ["TTLCache"]
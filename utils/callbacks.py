@@ -0,0 +1,108 @@
+"""Callback query routing by exact data or data prefix.
+
+Handler modules register their buttons on the shared ``router`` at import;
+``router.install(app)`` then adds one Pyrogram handler that looks each tap
+up in a dictionary instead of walking a chain of comparisons. Repeated taps
+by the same user on the same message within ``DEBOUNCE_WINDOW`` are
+answered and dropped before any handler runs.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Awaitable, Callable
+
+from pyrogram import Client
+from pyrogram.handlers import CallbackQueryHandler
+from pyrogram.types import CallbackQuery
+
+from utils.cache import TTLCache
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_WINDOW = 1.0  # seconds a (user, message) pair ignores further taps
+DEBOUNCE_SIZE = 10_000  # recent taps remembered
+# Prefixes end at the first of these characters, so a lookup is one dict probe each
+PREFIX_SEPARATORS = ":_"
+
+Route = Callable[[Client, CallbackQuery], Awaitable[None]]
+
+_debounced = REGISTRY.counter("callback_debounced_total", "Button taps dropped as repeats.")
+_unknown = REGISTRY.counter("callback_unknown_total", "Button taps with no registered route.")
+
+
+class CallbackRouter:
+    def __init__(self, debounce: float = DEBOUNCE_WINDOW) -> None:
+        self._exact: dict[str, Route] = {}
+        self._prefixes: dict[str, Route] = {}
+        self._recent = TTLCache(maxsize=DEBOUNCE_SIZE, ttl=debounce) if debounce else None
+
+    def exact(self, *data: str) -> Callable[[Route], Route]:
+        """Route taps whose data equals one of ``data``."""
+
+        def decorator(func: Route) -> Route:
+            for value in data:
+                self._exact[value] = func
+            return func
+
+        return decorator
+
+    def prefix(self, prefix: str) -> Callable[[Route], Route]:
+        """Route taps whose data starts with ``prefix``, which must end in a separator."""
+        if not prefix or prefix[-1] not in PREFIX_SEPARATORS or any(c in PREFIX_SEPARATORS for c in prefix[:-1]):
+            raise ValueError(f"Callback prefix must end at its first separator ({PREFIX_SEPARATORS!r}): {prefix!r}")
+
+        def decorator(func: Route) -> Route:
+            self._prefixes[prefix] = func
+            return func
+
+        return decorator
+
+    def resolve(self, data: str) -> Route | None:
+        route = self._exact.get(data)
+        if route is not None:
+            return route
+        for separator in PREFIX_SEPARATORS:
+            end = data.find(separator)
+            if end != -1:
+                route = self._prefixes.get(data[:end + 1])
+                if route is not None:
+                    return route
+        return None
+
+    def _repeated(self, query: CallbackQuery) -> bool:
+        if self._recent is None:
+            return False
+        message = query.message
+        where = (message.chat.id, message.id) if message else query.inline_message_id
+        key = (query.from_user.id, where)
+        if self._recent.get(key) is not None:
+            return True
+        self._recent.set(key, True)
+        return False
+
+    async def dispatch(self, client: Client, query: CallbackQuery) -> None:
+        if self._repeated(query):
+            _debounced.inc()
+            # Still answered, or the client keeps showing a spinner
+            await query.answer()
+            return
+        route = self.resolve(query.data or "")
+        if route is None:
+            _unknown.inc()
+            logger.warning(f"⚠️ Unknown callback data received: {query.data}")
+            await query.answer("⚠️ Unknown action", show_alert=True)
+            return
+        logger.debug(f"[CALLBACK] From user {query.from_user.id} → data: {query.data}")
+        await route(client, query)
+
+    def install(self, app: Client, group: int = 0) -> None:
+        """Add the single handler that feeds every callback query to the router."""
+        app.add_handler(CallbackQueryHandler(self.dispatch), group)
+
+
+# Shared by every handler module
+router = CallbackRouter()
+
+__all__ = ["CallbackRouter", "router", "DEBOUNCE_WINDOW"]
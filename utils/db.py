@@ -1,32 +1,273 @@
-"""Database helpers using Motor (async MongoDB)."""
-
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo import ReturnDocument
-
-_client: AsyncIOMotorClient | None = None
-_db: AsyncIOMotorDatabase | None = None
+"""Database helpers on top of the configured storage backend."""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from utils.breaker import CLOSED, CircuitBreaker, CircuitOpenError
+from utils.cache import TTLCache
+from utils.metrics import REGISTRY, timed, track_cache
+from utils.storage import ChangesLost, Storage, flipped, open_storage
+from utils.wordfilter import WordAutomaton, normalize_term
+
+logger = logging.getLogger(__name__)
+
+_store: Storage | None = None
+
+# Per-chat settings documents kept in memory so the moderation path does not
+# read ``chat_settings`` once per message. Writes from other processes
+# invalidate them (see CROSS-PROCESS INVALIDATION), so the TTL is a backstop.
+SETTINGS_CACHE_TTL = 60 * 60  # seconds
+SETTINGS_CACHE_SIZE = 10_000  # chats
+
+# Broadcast targets fetched per cursor round-trip.
+BROADCAST_BATCH_SIZE = 1000
+
+# Warnings reset once this many are reached and decay when left untouched.
+WARN_LIMIT = 3
+WARN_DECAY = 7 * 24 * 60 * 60  # seconds
+
+# Banned-word automatons are rebuilt only after the chat's list changes.
+BANNED_WORDS_LIMIT = 5000  # terms per chat
+BANNED_CACHE_TTL = 60 * 60  # seconds
+BANNED_CACHE_SIZE = 10_000  # chats
+
+# Approved user ids kept in memory across all chats (8 bytes each).
+APPROVED_CACHE_BUDGET = 2_000_000
+# Bulk approvals are written this many ids per batch; listings page this many.
+APPROVE_BATCH_SIZE = 1000
+APPROVED_PAGE_SIZE = 50
+
+# Writes made while storage is unreachable wait here, oldest first.
+REPLAY_QUEUE_SIZE = 10_000
+# Storage methods that change state relative to it, so applying one twice
+# double-counts; a replay that fails in flight is never sent again
+NOT_IDEMPOTENT = frozenset({"increment_warning", "toggle_setting"})
+
+# Without change streams, recently bumped chat versions are polled instead.
+VERSION_POLL_INTERVAL = 2.0  # seconds
+VERSION_POLL_OVERLAP = 10.0  # seconds of history re-read to catch late commits
+
+_db_op = timed(
+    REGISTRY.histogram("db_op_seconds", "Latency of database helpers.", ["op"]),
+    REGISTRY.counter("db_op_errors_total", "Database helpers that raised.", ["op"]),
+)
+_breaker_state = REGISTRY.gauge("storage_breaker_open", "1 while the storage circuit is open or probing.")
+_breaker_rejected = REGISTRY.counter("storage_breaker_rejected_total", "Storage calls refused by the open circuit.")
+_replay_depth = REGISTRY.gauge("storage_replay_queue", "Writes waiting for storage to recover.")
+_replay_dropped = REGISTRY.counter("storage_replay_dropped_total", "Queued writes dropped because the queue was full.")
+_invalidations = REGISTRY.counter(
+    "cache_invalidations_total", "Chats dropped from local caches after another process changed them.", ["source"]
+)
 
 
 # ------------------ CORE ------------------ #
-def get_db() -> AsyncIOMotorDatabase:
-    """Return the active MongoDB database."""
-    if _db is None:
+def get_storage() -> Storage:
+    """Return the active storage backend."""
+    if _store is None:
         raise RuntimeError("Database has not been initialised")
-    return _db
+    return _store
+
+
+# Every storage call goes through one breaker. While it is open the
+# moderation path reads the last-known snapshots and writes are queued.
+# Only errors meaning storage is unreachable or busy count against it.
+_breaker = CircuitBreaker("storage", is_failure=lambda exc: _store.is_transient(exc))
+_replay: deque[tuple[Callable[..., Awaitable[Any]], tuple]] = deque()
+_replay_task: asyncio.Task | None = None
+# Warning counts handed out while increments sit in the replay queue
+_offline_warnings: dict[tuple[int, int], int] = {}
+# Rejections already added to the exported counter
+_rejected_reported = 0
+_QUEUED = object()
+
+
+def _unavailable(exc: BaseException) -> bool:
+    """True for failures that mean "storage is down", not "request was bad"."""
+    if isinstance(exc, (CircuitOpenError, asyncio.TimeoutError)):
+        return True
+    return _store is not None and _store.is_transient(exc)
+
+
+async def _guarded(method: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """Call storage through the breaker; failures reach the caller."""
+    return await _breaker.call(method, *args)
+
+
+async def _scan(method: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """``_guarded`` for calls whose cost grows with the data, which may take long."""
+    return await _breaker.call_scan(method, *args)
+
+
+async def _write(method: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """
+    Apply a write now, or queue it for replay and return ``_QUEUED``.
+    Only writes that never reached storage are queued: those the open breaker
+    refused and those issued while earlier ones still wait, so they keep their
+    order. A write that failed in flight may have been applied; its error
+    reaches the caller instead.
+    """
+    if not _replay:
+        try:
+            return await _breaker.call(method, *args)
+        except CircuitOpenError:
+            pass
+    if len(_replay) >= REPLAY_QUEUE_SIZE:
+        _replay.popleft()
+        _replay_dropped.inc()
+    _replay.append((method, args))
+    logger.debug("Queued %s for replay (%d waiting)", method.__name__, len(_replay))
+    if _breaker.state == CLOSED:
+        _schedule_replay()
+    return _QUEUED
+
+
+def _schedule_replay() -> None:
+    global _replay_task
+    if _replay and (_replay_task is None or _replay_task.done()):
+        _replay_task = asyncio.ensure_future(_replay_writes())
+
+
+async def _replay_writes() -> None:
+    replayed = 0
+    while _replay:
+        method, args = _replay[0]
+        try:
+            await _breaker.call(method, *args)
+        except Exception as exc:  # noqa: BLE001
+            if isinstance(exc, CircuitOpenError) or (_unavailable(exc) and method.__name__ not in NOT_IDEMPOTENT):
+                # Picked up again when the breaker next closes
+                logger.warning("Replay paused with %d writes waiting: %s", len(_replay), exc)
+                return
+            if _unavailable(exc):
+                logger.warning("⚠️ Not retrying queued %s, it may already have been applied: %s", method.__name__, exc)
+            else:
+                logger.error("❌ Dropping queued %s: %s", method.__name__, exc)
+        _replay.popleft()
+        replayed += 1
+    _offline_warnings.clear()
+    logger.info("🔁 Replayed %d queued writes", replayed)
+
+
+_breaker.on_close(_schedule_replay)
+
+
+@REGISTRY.collector
+def _collect_storage_health() -> None:
+    global _rejected_reported
+    _breaker_state.set(0 if _breaker.state == CLOSED else 1)
+    _breaker_rejected.inc(_breaker.rejected - _rejected_reported)
+    _rejected_reported = _breaker.rejected
+    _replay_depth.set(len(_replay))
+
+
+def storage_health() -> dict[str, Any]:
+    """Breaker state and replay backlog, for diagnostics."""
+    return {
+        "state": _breaker.state,
+        "trips": _breaker.trips,
+        "rejected": _breaker.rejected,
+        "queued_writes": len(_replay),
+    }
 
 
 # ------------------ SETTINGS: linkfilter, editmode, etc ------------------ #
+class ChatSettings:
+    """Snapshot of the chat's settings document."""
+
+    __slots__ = ("chat_id", "values")
+
+    def __init__(self, chat_id: int, values: dict[str, str]) -> None:
+        self.chat_id = chat_id
+        self.values = values
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        return self.values.get(key, default)
+
+    def enabled(self, key: str) -> bool:
+        return str(self.values.get(key, "0")).lower() in {"1", "true", "on", "yes"}
+
+    def number(self, key: str) -> int:
+        try:
+            return int(self.values.get(key) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+
+_settings_cache = TTLCache(maxsize=SETTINGS_CACHE_SIZE, ttl=SETTINGS_CACHE_TTL, keep_stale=True)
+track_cache("settings", _settings_cache.stats)
+
+
+@_db_op
+async def _load_settings(chat_id: int) -> ChatSettings:
+    values = await _guarded(_store.load_settings, chat_id)
+    # Storage is back but has not caught up with writes still queued for replay
+    for method, args in _replay:
+        if method == _store.set_setting and args[0] == chat_id:
+            values[args[1]] = args[2]
+        elif method == _store.toggle_setting and args[0] == chat_id:
+            values[args[1]] = flipped(values.get(args[1]), args[2])
+    return ChatSettings(chat_id, values)
+
+
+async def get_chat_settings(chat_id: int) -> ChatSettings:
+    """
+    Return the cached settings snapshot for a chat, loading it in one query.
+    Falls back to the last-known snapshot (or no settings) if storage is down.
+    """
+    try:
+        return await _settings_cache.get_or_load(chat_id, lambda: _load_settings(chat_id))
+    except Exception as exc:  # noqa: BLE001
+        if not _unavailable(exc):
+            raise
+        return _settings_cache.stale(chat_id) or ChatSettings(chat_id, {})
+
+
+def settings_cache_stats() -> dict[str, int]:
+    """Return hit/miss/eviction counters of the settings cache."""
+    return _settings_cache.stats()
+
+
 async def get_setting(chat_id: int, key: str, default: str | None = None) -> str | None:
-    doc = await _db.kv_settings.find_one({"chat_id": chat_id, "key": key})
-    return doc.get("value") if doc else default
+    return (await get_chat_settings(chat_id)).get(key, default)
 
 
+@_db_op
 async def set_setting(chat_id: int, key: str, value: str) -> None:
-    await _db.kv_settings.update_one(
-        {"chat_id": chat_id, "key": key},
-        {"$set": {"value": value}},
-        upsert=True,
-    )
+    # The write bumps the chat's version itself
+    result = await _write(_store.set_setting, chat_id, key, value, INSTANCE_ID)
+    snapshot = _settings_cache.stale(chat_id)
+    # Also discards a load that read the document before this write
+    _settings_cache.invalidate(chat_id)
+    if result is _QUEUED and snapshot is not None:
+        # Storage is behind; keep serving the snapshot with the queued value
+        snapshot.values[key] = value
+        _settings_cache.set(chat_id, snapshot)
+
+
+@_db_op
+async def toggle_setting(chat_id: int, key: str, on_value: str = "1") -> ChatSettings:
+    """
+    Flip ``key`` between ``"0"`` and ``on_value`` in one atomic write and
+    return the chat's settings as they are afterwards, ready to render.
+    """
+    values = await _write(_store.toggle_setting, chat_id, key, on_value, INSTANCE_ID)
+    if values is _QUEUED:
+        # Replayed against storage in order, so flipping the snapshot agrees
+        settings = _settings_cache.stale(chat_id) or ChatSettings(chat_id, {})
+        settings.values[key] = flipped(settings.values.get(key), on_value)
+    else:
+        settings = ChatSettings(chat_id, values)
+    # Also discards a load that read the document before the toggle
+    _settings_cache.invalidate(chat_id)
+    _settings_cache.set(chat_id, settings)
+    return settings
 
 
 # ------------------ BIO FILTER ------------------ #
@@ -43,25 +284,182 @@ async def set_bio_filter(chat_id: int, enabled: bool) -> None:
 
 
 # ------------------ APPROVAL SYSTEM ------------------ #
+class ApprovedSet:
+    """Approved user ids of one chat as a sorted ``array('q')``."""
+
+    __slots__ = ("ids",)
+
+    def __init__(self, ids=()) -> None:
+        self.ids = array("q", sorted(set(ids)))
+
+    def __contains__(self, user_id: int) -> bool:
+        i = bisect_left(self.ids, user_id)
+        return i < len(self.ids) and self.ids[i] == user_id
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, user_id: int) -> bool:
+        i = bisect_left(self.ids, user_id)
+        if i < len(self.ids) and self.ids[i] == user_id:
+            return False
+        self.ids.insert(i, user_id)
+        return True
+
+    def discard(self, user_id: int) -> bool:
+        i = bisect_left(self.ids, user_id)
+        if i < len(self.ids) and self.ids[i] == user_id:
+            del self.ids[i]
+            return True
+        return False
+
+
+_approved_cache: "OrderedDict[int, ApprovedSet]" = OrderedDict()
+_approved_loads: dict[int, asyncio.Task] = {}
+_approved_stats = {"hits": 0, "misses": 0, "evictions": 0, "ids": 0}
+
+
+@_db_op
+async def _load_approved(chat_id: int) -> ApprovedSet:
+    index = ApprovedSet(await _scan(_store.load_approved, chat_id))
+    _approved_cache[chat_id] = index
+    _approved_stats["ids"] += len(index)
+    # Evict the coldest chats until the id budget fits again
+    while _approved_stats["ids"] > APPROVED_CACHE_BUDGET and len(_approved_cache) > 1:
+        _, cold = _approved_cache.popitem(last=False)
+        _approved_stats["ids"] -= len(cold)
+        _approved_stats["evictions"] += 1
+    return index
+
+
+async def _get_approved_set(chat_id: int, probed: bool = False) -> ApprovedSet:
+    index = _approved_cache.get(chat_id)
+    if index is not None:
+        _approved_cache.move_to_end(chat_id)
+        if not probed:
+            _approved_stats["hits"] += 1
+        return index
+
+    if not probed:
+        _approved_stats["misses"] += 1
+    task = _approved_loads.get(chat_id)
+    if task is None:
+        task = asyncio.ensure_future(_load_approved(chat_id))
+        _approved_loads[chat_id] = task
+        task.add_done_callback(lambda _: _approved_loads.pop(chat_id, None))
+    try:
+        return await asyncio.shield(task)
+    except Exception as exc:  # noqa: BLE001
+        if not _unavailable(exc):
+            raise
+        # Nobody counts as approved until the chat can be loaded
+        return ApprovedSet()
+
+
+def cached_is_approved(chat_id: int, user_id: int) -> bool | None:
+    """Answer from the in-memory index only; None when the chat is not loaded."""
+    index = _approved_cache.get(chat_id)
+    if index is None:
+        _approved_stats["misses"] += 1
+        return None
+    _approved_stats["hits"] += 1
+    _approved_cache.move_to_end(chat_id)
+    return user_id in index
+
+
+def approved_cache_stats() -> dict[str, int]:
+    """Return hit/miss/eviction counters of the approved-user index."""
+    return {**_approved_stats, "chats": len(_approved_cache)}
+
+
+track_cache("approved", approved_cache_stats)
+
+
+def _patch_approved(chat_id: int, user_id: int, approved: bool) -> None:
+    index = _approved_cache.get(chat_id)
+    if index is not None:
+        if approved and index.add(user_id):
+            _approved_stats["ids"] += 1
+        elif not approved and index.discard(user_id):
+            _approved_stats["ids"] -= 1
+    task = _approved_loads.get(chat_id)
+    if task is not None:
+        # The load may have read storage before this write; patch what it caches
+        task.add_done_callback(lambda _: _patch_approved(chat_id, user_id, approved))
+
+
+@_db_op
 async def approve_user(chat_id: int, user_id: int) -> None:
-    await _db.approved_users.update_one(
-        {"chat_id": chat_id, "user_id": user_id},
-        {"$set": {"approved": True}},
-        upsert=True,
-    )
+    await _write(_store.approve, chat_id, user_id)
+    _patch_approved(chat_id, user_id, True)
+    await _touch(chat_id)
 
 
+@_db_op
 async def unapprove_user(chat_id: int, user_id: int) -> None:
-    await _db.approved_users.delete_one({"chat_id": chat_id, "user_id": user_id})
+    await _write(_store.unapprove, chat_id, user_id)
+    _patch_approved(chat_id, user_id, False)
+    await _touch(chat_id)
+
+
+async def is_approved(chat_id: int, user_id: int, probed: bool = False) -> bool:
+    """``probed`` marks a follow-up to a ``cached_is_approved`` miss, already counted."""
+    return user_id in await _get_approved_set(chat_id, probed)
+
 
+def _reset_approved(chat_id: int) -> None:
+    """Forget the chat's index, including one being loaded from older rows."""
+    _drop_approved(chat_id)
+    task = _approved_loads.get(chat_id)
+    if task is not None:
+        task.add_done_callback(lambda _: _drop_approved(chat_id))
 
-async def is_approved(chat_id: int, user_id: int) -> bool:
-    return await _db.approved_users.find_one({"chat_id": chat_id, "user_id": user_id}) is not None
 
+def _drop_approved(chat_id: int) -> None:
+    index = _approved_cache.pop(chat_id, None)
+    if index is not None:
+        _approved_stats["ids"] -= len(index)
 
-async def get_approved(chat_id: int) -> list[int]:
-    cursor = _db.approved_users.find({"chat_id": chat_id})
-    return [doc["user_id"] async for doc in cursor]
+
+@_db_op
+async def approve_users(chat_id: int, user_ids: list[int]) -> int:
+    """Approve many users in batched writes; returns how many were newly approved."""
+    added = 0
+    for i in range(0, len(user_ids), APPROVE_BATCH_SIZE):
+        added += await _scan(_store.approve_many, chat_id, user_ids[i:i + APPROVE_BATCH_SIZE])
+    if added:
+        # Reloaded on the next check rather than patched id by id
+        _reset_approved(chat_id)
+        await _touch(chat_id)
+    return added
+
+
+@_db_op
+async def unapprove_users(chat_id: int, user_ids: list[int]) -> int:
+    """Unapprove many users in batched writes; returns how many were approved."""
+    removed = 0
+    for i in range(0, len(user_ids), APPROVE_BATCH_SIZE):
+        removed += await _scan(_store.unapprove_many, chat_id, user_ids[i:i + APPROVE_BATCH_SIZE])
+    if removed:
+        _reset_approved(chat_id)
+        await _touch(chat_id)
+    return removed
+
+
+@_db_op
+async def get_approved_page(
+    chat_id: int, bound: int = 0, descending: bool = False, limit: int = APPROVED_PAGE_SIZE
+) -> list[int]:
+    """
+    Up to ``limit`` approved ids after ``bound``, or before it when
+    ``descending`` (returned highest first). Only one page is ever loaded.
+    """
+    return await _guarded(_store.approved_page, chat_id, bound, limit, descending)
+
+
+@_db_op
+async def count_approved(chat_id: int) -> int:
+    return await _scan(_store.count_approved, chat_id)
 
 
 async def set_approval_mode(chat_id: int, enabled: bool) -> None:
@@ -74,92 +472,295 @@ async def get_approval_mode(chat_id: int) -> bool:
 
 
 async def toggle_approval_mode(chat_id: int) -> bool:
-    current = await get_approval_mode(chat_id)
-    await set_approval_mode(chat_id, not current)
-    return not current
+    settings = await toggle_setting(chat_id, "approval_mode")
+    return settings.get("approval_mode") == "1"
 
 
-# ------------------ WARNINGS ------------------ #
-async def increment_warning(chat_id: int, user_id: int) -> int:
-    doc = await _db.warnings.find_one_and_update(
-        {"chat_id": chat_id, "user_id": user_id},
-        {"$inc": {"count": 1}},
-        upsert=True,
-        return_document=ReturnDocument.AFTER,
-    )
-    return doc["count"]
+# ------------------ BANNED WORDS ------------------ #
+_banned_cache = TTLCache(maxsize=BANNED_CACHE_SIZE, ttl=BANNED_CACHE_TTL, keep_stale=True)
+track_cache("banned_words", _banned_cache.stats)
+
 
+@_db_op
+async def get_banned_words(chat_id: int) -> list[str]:
+    return await _scan(_store.banned_words, chat_id)
 
+
+async def _load_banned_automaton(chat_id: int) -> WordAutomaton | None:
+    words = await get_banned_words(chat_id)
+    return WordAutomaton(words) if words else None
+
+
+async def get_banned_automaton(chat_id: int) -> WordAutomaton | None:
+    """Return the compiled banned-word automaton for a chat, or None if the list is empty."""
+    try:
+        return await _banned_cache.get_or_load(chat_id, lambda: _load_banned_automaton(chat_id))
+    except Exception as exc:  # noqa: BLE001
+        if not _unavailable(exc):
+            raise
+        return _banned_cache.stale(chat_id)
+
+
+@_db_op
+async def add_banned_words(chat_id: int, words: list[str]) -> int:
+    """Add terms to a chat's list; returns how many were new."""
+    terms = {t for t in map(normalize_term, words) if t}
+    if not terms:
+        return 0
+    added = await _scan(_store.add_banned_words, chat_id, terms)
+    _banned_cache.pop(chat_id)
+    if added:
+        await _touch(chat_id)
+    return added
+
+
+@_db_op
+async def remove_banned_words(chat_id: int, words: list[str]) -> int:
+    """Remove terms from a chat's list; returns how many were removed."""
+    terms = [t for t in map(normalize_term, words) if t]
+    if not terms:
+        return 0
+    removed = await _scan(_store.remove_banned_words, chat_id, terms)
+    _banned_cache.pop(chat_id)
+    if removed:
+        await _touch(chat_id)
+    return removed
+
+
+@_db_op
+async def count_banned_words(chat_id: int) -> int:
+    return await _guarded(_store.count_banned_words, chat_id)
+
+
+# ------------------ WARNINGS ------------------ #
+@_db_op
+async def increment_warning(chat_id: int, user_id: int, limit: int = WARN_LIMIT) -> int:
+    """
+    Add a warning and return the count it reached.
+    Reaching ``limit`` resets the stored count within the same atomic update.
+    """
+    reached = await _write(_store.increment_warning, chat_id, user_id, limit, WARN_DECAY)
+    if reached is not _QUEUED:
+        return reached
+    # Count locally until the queued increments reach storage
+    key = (chat_id, user_id)
+    reached = _offline_warnings.get(key, 0) + 1
+    _offline_warnings[key] = 0 if reached >= limit else reached
+    return reached
+
+
+@_db_op
 async def reset_warning(chat_id: int, user_id: int) -> None:
-    await _db.warnings.delete_one({"chat_id": chat_id, "user_id": user_id})
+    _offline_warnings.pop((chat_id, user_id), None)
+    await _write(_store.reset_warning, chat_id, user_id)
+
+
+# ------------------ SCHEDULED DELETIONS ------------------ #
+@_db_op
+async def add_scheduled_deletes(entries: list[tuple[int, int, float]]) -> None:
+    """Persist ``(chat_id, message_id, due_at)`` entries in one bulk write."""
+    if not entries:
+        return
+    await _write(_store.add_scheduled_deletes, entries)
+
+
+@_db_op
+async def remove_scheduled_deletes(chat_id: int, message_ids: list[int]) -> None:
+    await _write(_store.remove_scheduled_deletes, chat_id, message_ids)
+
+
+@_db_op
+async def get_scheduled_deletes() -> list[tuple[int, int, float]]:
+    return await _scan(_store.scheduled_deletes)
 
 
 # ------------------ BROADCAST STORAGE ------------------ #
+@_db_op
 async def add_broadcast_user(user_id: int) -> None:
-    await _db.broadcast_users.update_one({"_id": user_id}, {"$set": {}}, upsert=True)
+    await _write(_store.add_chat, "broadcast_users", user_id)
 
 
+@_db_op
 async def add_broadcast_group(chat_id: int) -> None:
-    await _db.broadcast_groups.update_one({"_id": chat_id}, {"$set": {}}, upsert=True)
+    await _write(_store.add_chat, "broadcast_groups", chat_id)
 
 
+@_db_op
 async def remove_broadcast_group(chat_id: int) -> None:
-    await _db.broadcast_groups.delete_one({"_id": chat_id})
+    await _write(_store.remove_chats, "broadcast_groups", [chat_id])
 
 
+@_db_op
 async def get_broadcast_users() -> list[int]:
-    cursor = _db.broadcast_users.find()
-    return [doc["_id"] async for doc in cursor]
+    return await _scan(_store.list_chats, "broadcast_users")
 
 
+@_db_op
 async def get_broadcast_groups() -> list[int]:
-    cursor = _db.broadcast_groups.find()
-    return [doc["_id"] async for doc in cursor]
+    return await _scan(_store.list_chats, "broadcast_groups")
+
+
+async def iter_broadcast_targets(batch_size: int = BROADCAST_BATCH_SIZE) -> AsyncIterator[int]:
+    """
+    Yield every broadcast chat id, groups first, ``batch_size`` ids per round-trip.
+    Group ids are negative and user ids positive, so filtering each
+    collection on the sign of ``_id`` keeps them disjoint without a seen-set.
+    """
+    for registry, negative in (("broadcast_groups", True), ("broadcast_users", False)):
+        async for chat_id in _store.iter_chats(registry, negative, batch_size):
+            yield chat_id
+
+
+@_db_op
+async def prune_broadcast_targets(chat_ids: list[int]) -> int:
+    """Drop chats that can no longer receive broadcasts; returns how many were removed."""
+    groups = [cid for cid in chat_ids if cid < 0]
+    users = [cid for cid in chat_ids if cid > 0]
+    removed = await _scan(_store.remove_chats, "broadcast_groups", groups)
+    return removed + await _scan(_store.remove_chats, "broadcast_users", users)
+
+
+@_db_op
+async def count_broadcast_targets() -> int:
+    """Cheap metadata-based estimate of how many chats a broadcast reaches."""
+    groups = await _guarded(_store.count_chats, "broadcast_groups")
+    return groups + await _guarded(_store.count_chats, "broadcast_users")
 
 
 # ------------------ USER / GROUP LOGGING ------------------ #
+@_db_op
 async def add_user(user_id: int) -> None:
-    await _db.users.update_one({"_id": user_id}, {"$set": {}}, upsert=True)
+    await _write(_store.add_chat, "users", user_id)
 
 
+@_db_op
 async def add_group(chat_id: int) -> None:
-    await _db.groups.update_one({"_id": chat_id}, {"$set": {}}, upsert=True)
+    await _write(_store.add_chat, "groups", chat_id)
 
 
+@_db_op
 async def remove_group(chat_id: int) -> None:
-    await _db.groups.delete_one({"_id": chat_id})
+    await _write(_store.remove_chats, "groups", [chat_id])
 
 
+@_db_op
 async def get_users() -> list[int]:
-    cursor = _db.users.find()
-    return [doc["_id"] async for doc in cursor]
+    return await _scan(_store.list_chats, "users")
 
 
+@_db_op
 async def get_groups() -> list[int]:
-    cursor = _db.groups.find()
-    return [doc["_id"] async for doc in cursor]
+    return await _scan(_store.list_chats, "groups")
+
+
+# ------------------ CROSS-PROCESS INVALIDATION ------------------ #
+# Every change to a chat's settings, approvals or banned words bumps that
+# chat's version in storage. Other processes sharing the storage drop their
+# cached copies when they see the bump: pushed through a change stream where
+# the backend offers one, otherwise found by polling recently bumped chats.
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_sync_task: asyncio.Task | None = None
+# chat_id -> (version, updated_at) already acted on while polling
+_seen_versions: dict[int, tuple[int, float]] = {}
+
+
+async def _touch(chat_id: int) -> None:
+    if _store.shared:
+        await _write(_store.bump_version, chat_id, INSTANCE_ID)
+
+
+def _invalidate_chat(chat_id: int, source: str) -> None:
+    _settings_cache.invalidate(chat_id)
+    _banned_cache.invalidate(chat_id)
+    _reset_approved(chat_id)
+    _invalidations.inc(source=source)
+
+
+def _invalidate_all() -> None:
+    _settings_cache.clear()
+    _banned_cache.clear()
+    for chat_id in list(_approved_cache):
+        _drop_approved(chat_id)
+
+
+async def _follow_change_stream() -> None:
+    token = None
+    # Set when changes may have gone unseen; acted on only once the stream is
+    # open again, so an outage keeps the stale copies callers fall back to
+    missed = False
+    while True:
+        try:
+            async for chat_id, origin, token in _store.watch_changes(token):
+                if chat_id is None:
+                    if missed:
+                        _invalidate_all()
+                        missed = False
+                # Our own writes already patched the local caches
+                elif origin != INSTANCE_ID:
+                    _invalidate_chat(chat_id, "stream")
+        except NotImplementedError:
+            raise
+        except ChangesLost as exc:
+            logger.warning("Change stream cannot resume, reopening from now: %s", exc)
+            token = None
+            missed = True
+            continue
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Change stream interrupted, resuming: %s", exc)
+        # Without a token there is nothing to resume from
+        missed = missed or token is None
+        await asyncio.sleep(VERSION_POLL_INTERVAL)
+
+
+async def _poll_versions() -> None:
+    since = time.time()
+    while True:
+        await asyncio.sleep(VERSION_POLL_INTERVAL)
+        try:
+            rows = await _guarded(_store.changed_chats, since - VERSION_POLL_OVERLAP)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Polling chat versions failed: %s", exc)
+            continue
+        for chat_id, version, origin, updated_at in rows:
+            seen = _seen_versions.get(chat_id)
+            if seen is None or seen[0] != version:
+                _seen_versions[chat_id] = (version, updated_at)
+                # Our own writes already patched the local caches, unless the
+                # version skipped past another process's bump in between
+                own = origin == INSTANCE_ID and (seen is None or version == seen[0] + 1)
+                if not own:
+                    _invalidate_chat(chat_id, "poll")
+            since = max(since, updated_at)
+        horizon = since - VERSION_POLL_OVERLAP
+        for chat_id in [cid for cid, (_, at) in _seen_versions.items() if at <= horizon]:
+            del _seen_versions[chat_id]
+
+
+async def _sync_caches() -> None:
+    try:
+        await _follow_change_stream()
+    except NotImplementedError as exc:
+        logger.info("%s; polling chat versions every %.0fs", exc or "No change streams", VERSION_POLL_INTERVAL)
+    await _poll_versions()
 
 
 # ------------------ LIFECYCLE MANAGEMENT ------------------ #
 async def init_db(uri: str, db_name: str) -> None:
-    """Initialize MongoDB with required collections and indexes."""
-    global _client, _db
-    # Short timeout so startup fails fast if DB is unreachable
-    _client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
-    _db = _client[db_name]
-
-    # Force a connection attempt to provide immediate feedback
-    try:
-        await _client.admin.command("ping")
-    except Exception as exc:  # noqa: BLE001
-        raise RuntimeError(f"Could not connect to MongoDB: {exc}") from exc
-
-    await _db.kv_settings.create_index([("chat_id", 1), ("key", 1)], unique=True)
-    await _db.approved_users.create_index([("chat_id", 1), ("user_id", 1)], unique=True)
-    await _db.warnings.create_index([("chat_id", 1), ("user_id", 1)], unique=True)
+    """Open the storage backend selected by ``uri``, prepare its schema and follow other processes' writes."""
+    global _store, _sync_task
+    store = open_storage(uri, db_name)
+    await store.connect()
+    _store = store
+    if store.shared:
+        _sync_task = asyncio.create_task(_sync_caches())
 
 
 async def close_db() -> None:
-    """Close MongoDB client connection."""
-    if _client:
-        _client.close()
+    """Flush queued writes if storage is reachable, then close it."""
+    if _sync_task is not None:
+        _sync_task.cancel()
+    if _store:
+        if _replay:
+            await _replay_writes()
+        await _store.close()
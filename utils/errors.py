@@ -4,24 +4,83 @@ from __future__ import annotations
 
 import functools
 import logging
+import math
+import time
 import traceback
+from collections import deque
+
+from config import SLOW_HANDLER_MS
+from utils.metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
+LATENCY_WINDOW = 1024  # most recent calls kept per handler for percentiles
+
+_handler_seconds = REGISTRY.histogram("handler_seconds", "Time spent in each update handler.", ["handler"])
+_handler_errors = REGISTRY.counter("handler_errors_total", "Unhandled exceptions per update handler.", ["handler"])
+
+# handler name -> durations (ns) of its latest calls
+_recent_calls: dict[str, deque[int]] = {}
+_call_counts: dict[str, int] = {}
+
+
+def _chat_id(args: tuple) -> int | None:
+    """Find the chat of the update a handler was called with."""
+    for arg in args:
+        chat = getattr(arg, "chat", None) or getattr(getattr(arg, "message", None), "chat", None)
+        if chat is not None:
+            return chat.id
+    return None
+
+
+def _record(name: str, elapsed_ns: int, args: tuple) -> None:
+    recent = _recent_calls.get(name)
+    if recent is None:
+        recent = _recent_calls[name] = deque(maxlen=LATENCY_WINDOW)
+    recent.append(elapsed_ns)
+    _call_counts[name] = _call_counts.get(name, 0) + 1
+    _handler_seconds.observe(elapsed_ns / 1e9, handler=name)
+
+    if SLOW_HANDLER_MS and elapsed_ns >= SLOW_HANDLER_MS * 1_000_000:
+        logger.warning("🐢 Slow handler %s took %.1f ms in chat %s", name, elapsed_ns / 1e6, _chat_id(args))
+
+
+def _percentile(ordered: list[int], q: float) -> int:
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def handler_latency_stats() -> list[dict[str, float | int | str]]:
+    """Return p50/p99 over each handler's recent calls, slowest p99 first."""
+    rows = []
+    for name, recent in _recent_calls.items():
+        ordered = sorted(recent)
+        rows.append({
+            "handler": name,
+            "calls": _call_counts[name],
+            "p50_ms": _percentile(ordered, 0.50) / 1e6,
+            "p99_ms": _percentile(ordered, 0.99) / 1e6,
+        })
+    rows.sort(key=lambda row: row["p99_ms"], reverse=True)
+    return rows
+
 
 def catch_errors(func):
-    """Decorator that logs exceptions raised by async handlers."""
+    """Decorator that logs exceptions raised by async handlers and times each call."""
 
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
         try:
             return await func(*args, **kwargs)
         except Exception as e:  # noqa: BLE001
+            _handler_errors.inc(handler=func.__name__)
             logger.exception("🚨 Unhandled exception in %s: %s", func.__name__, e)
             tb = traceback.format_exc()
             logger.debug("Traceback:\n%s", tb)
+        finally:
+            _record(func.__name__, time.perf_counter_ns() - start, args)
 
     return wrapper
 
 
-__all__ = ["catch_errors"]
+__all__ = ["catch_errors", "handler_latency_stats"]
@@ -0,0 +1,174 @@
+"""Minimal asyncio HTTP/1.1 server for the endpoints the bot serves itself."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_LINES = 100
+MAX_BODY_SIZE = 1024 * 1024  # bytes
+READ_TIMEOUT = 10  # seconds to receive a full request
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+
+@dataclass
+class Response:
+    status: int = 200
+    body: bytes | str = b""
+    content_type: str = "text/plain; charset=utf-8"
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class HTTPServer:
+    """
+    Serves a fixed set of routes on one port, one request per connection.
+    Enough for health checks, metrics scrapes and webhook deliveries without
+    pulling a web framework into the bot process.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._routes: dict[tuple[str, str], Handler] = {}
+        self._server: asyncio.base_events.Server | None = None
+
+    def route(self, path: str, methods: tuple[str, ...] = ("GET",)) -> Callable[[Handler], Handler]:
+        def decorator(func: Handler) -> Handler:
+            for method in methods:
+                self._routes[(method, path)] = func
+            return func
+
+        return decorator
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Port 0 picks a free one; report what was actually bound
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("🌐 HTTP server listening on %s:%s", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Request | Response:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            return Response(400, "bad request line")
+        method, target, _ = request_line
+
+        headers: dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            return Response(400, "too many headers")
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            return Response(400, "bad content-length")
+        if length > MAX_BODY_SIZE:
+            return Response(413, "body too large")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return Request(method.upper(), target.split("?", 1)[0], headers, body)
+
+    async def _dispatch(self, request: Request) -> Response:
+        handler = self._routes.get((request.method, request.path))
+        if handler is not None:
+            return await handler(request)
+        if any(path == request.path for _, path in self._routes):
+            return Response(405, "method not allowed")
+        return Response(404, "not found")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                request = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                return
+
+            if isinstance(request, Response):
+                response = request
+            else:
+                try:
+                    response = await self._dispatch(request)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("🔥 HTTP handler failed for %s: %s", request.path, exc)
+                    response = Response(500, "internal error")
+
+            body = response.body.encode("utf-8") if isinstance(response.body, str) else response.body
+            head = (
+                f"HTTP/1.1 {response.status} {REASONS.get(response.status, '')}\r\n"
+                f"Content-Type: {response.content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def request(
+    host: str,
+    port: int,
+    method: str = "GET",
+    path: str = "/",
+    body: bytes = b"",
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    Send one request and read the whole reply. A stand-in client for driving
+    ``HTTPServer`` locally (tests, smoke checks); not meant for the open web.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}", "Connection: close"]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), READ_TIMEOUT)
+    finally:
+        writer.close()
+
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    reply_headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        reply_headers[name.strip().lower()] = value.strip()
+    return Response(int(status_line.split()[1]), payload, reply_headers.get("content-type", ""))
+
+
+__all__ = ["HTTPServer", "Request", "Response", "request"]
@@ -0,0 +1,219 @@
+"""Webhook ingestion: one HTTP front end feeding N bot worker processes.
+
+The front end accepts Telegram's webhook deliveries and routes each update
+to a worker chosen by its chat id. A chat is therefore always handled by
+the same process, in the order its updates arrive, while different chats
+spread across cores. Workers read updates as JSON lines on stdin and run
+them through the handlers registered on their own Pyrogram client, which
+only sends requests and never receives updates itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+import signal
+import sys
+from typing import Any, Callable
+
+import pyrogram
+from pyrogram import Client
+from pyrogram.handlers.handler import Handler
+
+from utils.botapi import parse_update, update_chat_id
+from utils.http import MAX_BODY_SIZE, HTTPServer, Request, Response
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+WORKER_CONCURRENCY = 256  # updates in flight per worker before it stops reading stdin
+RESTART_DELAY = 5.0  # seconds before an exited worker is started again
+SHUTDOWN_TIMEOUT = 30.0  # seconds workers get to finish in-flight updates
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+_routed = REGISTRY.counter("webhook_updates_total", "Webhook updates routed to a worker.", ["worker"])
+_refused = REGISTRY.counter("webhook_refused_total", "Webhook deliveries answered with an error.", ["reason"])
+_restarts = REGISTRY.counter("webhook_worker_restarts_total", "Worker processes started again after exiting.")
+
+
+def shard_for(chat_id: int | None, workers: int) -> int:
+    """Worker index for a chat; updates without one go to the first worker."""
+    return 0 if chat_id is None else chat_id % workers
+
+
+class WebhookFrontend:
+    """
+    Serves the webhook path plus ``/health`` and keeps one subprocess per
+    shard running. ``command(index)`` returns the argv of worker ``index``.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        path: str,
+        secret: str,
+        workers: int,
+        command: Callable[[int], list[str]],
+    ) -> None:
+        self.server = HTTPServer(host, port)
+        self.secret = secret
+        self.command = command
+        self._procs: list[asyncio.subprocess.Process | None] = [None] * workers
+        self._supervisors: list[asyncio.Task] = []
+        self._stopping = False
+        self.server.route(path, methods=("POST",))(self._receive)
+        self.server.route("/health")(self._health)
+
+    @property
+    def workers(self) -> int:
+        return len(self._procs)
+
+    async def start(self) -> None:
+        self._supervisors = [asyncio.create_task(self._supervise(i)) for i in range(self.workers)]
+        await self.server.start()
+        logger.info("📥 Webhook front end routing to %d workers", self.workers)
+
+    async def stop(self) -> None:
+        """Stop accepting updates, let workers drain their stdin and exit."""
+        self._stopping = True
+        await self.server.stop()
+        for proc in self._procs:
+            if proc is not None and proc.stdin is not None:
+                proc.stdin.close()
+        running = [proc for proc in self._procs if proc is not None]
+        if running:
+            _, late = await asyncio.wait([asyncio.ensure_future(p.wait()) for p in running], timeout=SHUTDOWN_TIMEOUT)
+            if late:
+                logger.warning("Killing %d workers that did not exit in %.0fs", len(late), SHUTDOWN_TIMEOUT)
+                for proc in running:
+                    if proc.returncode is None:
+                        proc.kill()
+        for task in self._supervisors:
+            task.cancel()
+
+    async def _supervise(self, index: int) -> None:
+        while not self._stopping:
+            proc = await asyncio.create_subprocess_exec(*self.command(index), stdin=asyncio.subprocess.PIPE)
+            self._procs[index] = proc
+            code = await proc.wait()
+            self._procs[index] = None
+            if self._stopping:
+                return
+            logger.error("❌ Worker %d exited with code %s; restarting in %.0fs", index, code, RESTART_DELAY)
+            _restarts.inc()
+            await asyncio.sleep(RESTART_DELAY)
+
+    async def _health(self, _: Request) -> Response:
+        if any(proc is None or proc.returncode is not None for proc in self._procs):
+            return Response(503, "DOWN")
+        return Response(200, "OK")
+
+    async def _receive(self, request: Request) -> Response:
+        if request.headers.get(SECRET_HEADER) != self.secret:
+            _refused.inc(reason="secret")
+            return Response(403, "forbidden")
+        try:
+            update = json.loads(request.body)
+        except ValueError:
+            update = None
+        if not isinstance(update, dict):
+            _refused.inc(reason="malformed")
+            return Response(400, "expected a JSON object")
+
+        shard = shard_for(update_chat_id(update), self.workers)
+        proc = self._procs[shard]
+        if proc is None or proc.stdin is None or proc.stdin.is_closing():
+            # Telegram retries non-2xx deliveries, so nothing is lost
+            _refused.inc(reason="worker_down")
+            return Response(503, "worker unavailable")
+        try:
+            # Raw newlines can only be insignificant whitespace in JSON
+            proc.stdin.write(request.body.replace(b"\n", b" ") + b"\n")
+            # Blocks while the worker is saturated, pushing back on Telegram
+            await proc.stdin.drain()
+        except ConnectionError:
+            _refused.inc(reason="worker_down")
+            return Response(503, "worker unavailable")
+        _routed.inc(worker=shard)
+        return Response(200, "")
+
+
+# ------------------ WORKER SIDE ------------------ #
+async def dispatch(client: Client, update: Any, handler_type: type[Handler]) -> None:
+    """Run ``update`` through the client's handler groups like Pyrogram's own dispatcher."""
+    try:
+        for group in client.dispatcher.groups.values():
+            for handler in group:
+                if not isinstance(handler, handler_type):
+                    continue
+                try:
+                    if not await handler.check(client, update):
+                        continue
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("🔥 Filter failed: %s", exc)
+                    continue
+                try:
+                    await handler.callback(client, update)
+                except pyrogram.StopPropagation:
+                    raise
+                except pyrogram.ContinuePropagation:
+                    continue
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("🔥 Handler failed: %s", exc)
+                break
+    except pyrogram.StopPropagation:
+        pass
+
+
+async def _after(previous: asyncio.Task | None, client: Client, update: Any, handler_type: type[Handler]) -> None:
+    if previous is not None:
+        # Keep the chat's order without inheriting its failures
+        await asyncio.wait([previous])
+    await dispatch(client, update, handler_type)
+
+
+def _finished(tails: dict[int | None, asyncio.Task], chat_id: int | None, slots: asyncio.Semaphore, task) -> None:
+    slots.release()
+    if tails.get(chat_id) is task:
+        del tails[chat_id]
+
+
+async def consume_updates(client: Client, reader: asyncio.StreamReader) -> None:
+    """
+    Dispatch JSON-line updates until EOF. Updates of one chat run one after
+    another; different chats run concurrently up to ``WORKER_CONCURRENCY``.
+    """
+    slots = asyncio.Semaphore(WORKER_CONCURRENCY)
+    tails: dict[int | None, asyncio.Task] = {}
+    while line := await reader.readline():
+        try:
+            update = json.loads(line)
+            parsed = parse_update(client, update)
+        except (ValueError, KeyError, TypeError) as exc:
+            logger.warning("Skipping malformed update: %s", exc)
+            continue
+        if parsed is None:
+            continue
+        await slots.acquire()
+        chat_id = update_chat_id(update)
+        task = asyncio.create_task(_after(tails.get(chat_id), client, *parsed))
+        tails[chat_id] = task
+        task.add_done_callback(functools.partial(_finished, tails, chat_id, slots))
+    if tails:
+        await asyncio.wait(list(tails.values()))
+
+
+async def stdin_reader() -> asyncio.StreamReader:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=MAX_BODY_SIZE + 1)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    # The front end decides when to stop by closing stdin
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: None)
+    return reader
+
+
+__all__ = ["WebhookFrontend", "shard_for", "dispatch", "consume_updates", "stdin_reader"]
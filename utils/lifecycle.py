@@ -0,0 +1,133 @@
+"""Startup and shutdown shared by every bot entry point.
+
+Independent startup steps (storage, Telegram login, webhook removal and the
+metrics endpoint) run concurrently; handlers are registered once all of them
+succeeded. Each phase's duration is logged and exported as a gauge.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, TypeVar
+
+from pyrogram import Client, idle
+from pyrogram.enums import ParseMode
+
+from config import API_HASH, API_ID, BOT_TOKEN, METRICS_HOST, METRICS_PORT, MONGO_DB, STORAGE_URI
+from utils.db import close_db, init_db
+from utils.http import HTTPServer
+from utils.metrics import REGISTRY, instrument_client, serve_metrics
+from utils.webhook import delete_webhook
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_phase_seconds = REGISTRY.gauge("startup_phase_seconds", "Duration of each startup phase.", ["phase"])
+
+
+def create_client(name: str = "oxygen_bot", **kwargs) -> Client:
+    """Build the bot client with instrumented API calls."""
+    client = Client(
+        name,
+        api_id=API_ID,
+        api_hash=API_HASH,
+        bot_token=BOT_TOKEN,
+        parse_mode=ParseMode.HTML,
+        **kwargs,
+    )
+    instrument_client(client)
+    return client
+
+
+def _record(name: str, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    _phase_seconds.set(elapsed, phase=name)
+    logger.info("⏱️ %s ready in %.0f ms", name, elapsed * 1000)
+
+
+async def _optional_metrics(client: Client, port: int) -> HTTPServer | None:
+    """The metrics endpoint, or None when its port cannot be bound; never fatal."""
+    try:
+        return await serve_metrics(METRICS_HOST, port, health=lambda: client.is_connected)
+    except OSError as exc:
+        logger.warning("⚠️ Metrics disabled, could not listen on %s:%d: %s", METRICS_HOST, port, exc)
+        return None
+
+
+async def _phase(name: str, step: Awaitable[T]) -> T:
+    started = time.perf_counter()
+    result = await step
+    _record(name, started)
+    return result
+
+
+@asynccontextmanager
+async def running(client: Client, *, polling: bool = True, metrics_port: int = METRICS_PORT) -> AsyncIterator[Client]:
+    """
+    Start storage, the client and optional extras, register handlers, and
+    tear everything down again on exit. ``polling=False`` is for webhook
+    workers, which neither remove the webhook nor receive updates themselves.
+    """
+    # Handler modules are heavy; the webhook front end never needs them
+    from handlers import filters as group_filters, register_all
+
+    started = time.perf_counter()
+    steps = {
+        "storage": init_db(STORAGE_URI, MONGO_DB),
+        "login": client.start(),
+    }
+    if polling:
+        steps["webhook removal"] = delete_webhook(BOT_TOKEN)
+    if metrics_port:
+        steps["metrics"] = _optional_metrics(client, metrics_port)
+
+    results = dict(zip(steps, await asyncio.gather(
+        *(_phase(name, step) for name, step in steps.items()), return_exceptions=True
+    )))
+    metrics_server = results.get("metrics")
+    failed = next((exc for exc in results.values() if isinstance(exc, BaseException)), None)
+    if failed is not None:
+        # Undo whatever did come up before reporting the failure
+        if not isinstance(results["login"], BaseException):
+            await client.stop()
+        if metrics_server is not None and not isinstance(metrics_server, BaseException):
+            await metrics_server.stop()
+        await close_db()
+        raise failed
+
+    phase_started = time.perf_counter()
+    register_all(client)
+    _record("handlers", phase_started)
+    _record("startup", started)
+
+    try:
+        yield client
+    finally:
+        if group_filters.delete_scheduler is not None:
+            # Saves deletions scheduled since the last flush while storage is still open
+            await group_filters.delete_scheduler.stop()
+        await client.stop()
+        if metrics_server is not None:
+            await metrics_server.stop()
+        await close_db()
+
+
+def run(name: str = "oxygen_bot") -> None:
+    """Entry point for polling mode: start, wait for a stop signal, shut down."""
+    client = create_client(name)
+
+    async def main() -> None:
+        logger.info("🚀 Starting OxygenBot (storage: %s)...", STORAGE_URI.split("://", 1)[0])
+        async with running(client):
+            logger.info("🤖 Bot started. Waiting for events...")
+            await idle()
+        logger.info("🛑 Shutdown complete.")
+
+    client.run(main())
+
+
+__all__ = ["create_client", "running", "run"]
@@ -0,0 +1,25 @@
+"""Link detection for message text, captions and bios."""
+
+from __future__ import annotations
+
+import re
+
+# Every alternative has a bounded width, so each start position is decided in
+# constant time and a search is linear in the input length. The old pattern's
+# ``(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}`` matches exactly when some ``.`` has a
+# label character before it and two letters after it, which is what the
+# second branch checks; ``t.me/`` and ``telegram.me/`` links are covered by it.
+_LINK_PROBE = re.compile(r"(?:https?|tg)://\S|[A-Za-z0-9-]\.[A-Za-z]{2}", re.IGNORECASE)
+
+
+def contains_link(text: str | None) -> bool:
+    """Return True if ``text`` contains a URL, a ``tg://`` link or a bare domain."""
+    if not text:
+        return False
+    # Every link form needs a "." or a ":", most chat messages have neither
+    if "." not in text and ":" not in text:
+        return False
+    return _LINK_PROBE.search(text) is not None
+
+
+__all__ = ["contains_link"]
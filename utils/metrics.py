@@ -0,0 +1,291 @@
+"""In-process metrics registry rendered in the Prometheus text format."""
+
+from __future__ import annotations
+
+import functools
+import logging
+import math
+import time
+from typing import Any, Callable, Iterable
+
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+
+from utils.http import HTTPServer, Request, Response
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = "oxygen_"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; observations are in seconds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # Per-bucket counts followed by the +Inf count, then the sum
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        counts = state[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        state[1] += value
+
+    def _samples(self) -> Iterable[str]:
+        for key, (counts, total) in self._values.items():
+            running = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                running += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {running}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {running}"
+
+
+class Registry:
+    """Holds every metric of the process plus callbacks run before each scrape."""
+
+    def __init__(self, prefix: str = METRICS_PREFIX) -> None:
+        self.prefix = prefix
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _get(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        name = self.prefix + name
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets)
+
+    def collector(self, func: Callable[[], None]) -> Callable[[], None]:
+        """Register ``func`` to refresh gauges right before each scrape."""
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Metrics collector %s failed: %s", getattr(collect, "__name__", collect), exc)
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+_cache_hits = REGISTRY.counter("cache_hits_total", "Cache lookups answered from memory.", ["cache"])
+_cache_misses = REGISTRY.counter("cache_misses_total", "Cache lookups that had to load.", ["cache"])
+_cache_evictions = REGISTRY.counter("cache_evictions_total", "Entries evicted to stay within budget.", ["cache"])
+_cache_size = REGISTRY.gauge("cache_entries", "Entries currently cached.", ["cache"])
+_cache_hit_ratio = REGISTRY.gauge("cache_hit_ratio", "Hits divided by lookups since start.", ["cache"])
+
+_tg_seconds = REGISTRY.histogram("telegram_call_seconds", "Latency of outgoing Telegram API calls.", ["method"])
+_tg_errors = REGISTRY.counter("telegram_errors_total", "Telegram API calls that raised.", ["method", "error"])
+_tg_floodwaits = REGISTRY.counter("telegram_floodwait_total", "FloodWait errors raised to the bot.", ["method"])
+_tg_floodwait_seconds = REGISTRY.counter(
+    "telegram_floodwait_seconds_total", "Seconds Telegram asked the bot to wait.", ["method"]
+)
+
+
+def track_cache(name: str, stats: Callable[[], dict[str, int]]) -> None:
+    """Export hit/miss/eviction counters of a cache exposing a ``stats()`` dict."""
+
+    # Totals already exported, so each scrape adds only what is new
+    reported = {"hits": 0, "misses": 0, "evictions": 0}
+    counters = {"hits": _cache_hits, "misses": _cache_misses, "evictions": _cache_evictions}
+
+    def collect() -> None:
+        data = stats()
+        hits, misses = data.get("hits", 0), data.get("misses", 0)
+        for key, counter in counters.items():
+            total = data.get(key, 0)
+            # A cache whose totals went back (cleared stats) adds nothing
+            counter.inc(max(total - reported[key], 0), cache=name)
+            reported[key] = total
+        _cache_size.set(data.get("size", data.get("chats", 0)), cache=name)
+        _cache_hit_ratio.set(hits / (hits + misses) if hits + misses else 0.0, cache=name)
+
+    collect.__name__ = f"cache_{name}"
+    REGISTRY.collector(collect)
+
+
+def timed(histogram: Histogram, errors: Counter | None = None, label: str = "op") -> Callable:
+    """Decorate a coroutine function to observe its latency under its own name."""
+
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__.lstrip("_")
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(**{label: name})
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start, **{label: name})
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_client(client: Client) -> None:
+    """
+    Time every raw API call made through ``client`` by its method name.
+    FloodWaits short enough for Pyrogram to sleep through internally never
+    reach this wrapper; only the ones raised to handlers are counted.
+    """
+    invoke = client.invoke
+
+    @functools.wraps(invoke)
+    async def timed_invoke(query: Any, *args: Any, **kwargs: Any) -> Any:
+        method = type(query).__name__
+        start = time.perf_counter()
+        try:
+            return await invoke(query, *args, **kwargs)
+        except FloodWait as e:
+            _tg_floodwaits.inc(method=method)
+            _tg_floodwait_seconds.inc(e.value, method=method)
+            raise
+        except Exception as e:
+            _tg_errors.inc(method=method, error=type(e).__name__)
+            raise
+        finally:
+            _tg_seconds.observe(time.perf_counter() - start, method=method)
+
+    client.invoke = timed_invoke
+
+
+async def serve_metrics(host: str, port: int, health: Callable[[], bool] | None = None) -> HTTPServer:
+    """Start the ``/metrics`` and ``/health`` endpoints on ``host:port``."""
+    server = HTTPServer(host, port)
+
+    @server.route("/metrics")
+    async def metrics(_: Request) -> Response:
+        return Response(200, REGISTRY.render(), CONTENT_TYPE)
+
+    @server.route("/health")
+    async def health_check(_: Request) -> Response:
+        if health is not None and not health():
+            return Response(503, "DOWN")
+        return Response(200, "OK")
+
+    await server.start()
+    return server
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "REGISTRY",
+    "track_cache",
+    "timed",
+    "instrument_client",
+    "serve_metrics",
+]
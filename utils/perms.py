@@ -3,11 +3,70 @@
 import logging
 from pyrogram import Client
 from config import OWNER_ID
-from pyrogram.types import Message, ChatMember
-from pyrogram.enums import ChatType, ChatMemberStatus
+from pyrogram.types import Message, ChatMemberUpdated
+from pyrogram.enums import ChatType, ChatMemberStatus, ChatMembersFilter
+
+from utils.cache import TTLCache
+from utils.metrics import track_cache
 
 logger = logging.getLogger(__name__)
 
+ADMIN_CACHE_TTL = 10 * 60  # seconds before a roster is fetched again
+ADMIN_CACHE_SIZE = 50_000  # chats
+ADMIN_STATUSES = {ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER}
+
+# chat_id -> set of admin user ids
+_admin_cache = TTLCache(maxsize=ADMIN_CACHE_SIZE, ttl=ADMIN_CACHE_TTL)
+track_cache("admins", _admin_cache.stats)
+
+
+async def _fetch_admins(client: Client, chat_id: int) -> set[int]:
+    admins = {
+        member.user.id
+        async for member in client.get_chat_members(chat_id, filter=ChatMembersFilter.ADMINISTRATORS)
+        if member.user
+    }
+    logger.debug("Loaded %d admins for chat %s", len(admins), chat_id)
+    return admins
+
+
+async def get_chat_admins(client: Client, chat_id: int) -> set[int]:
+    """
+    Return the cached set of admin ids for a chat.
+    The roster is fetched once per TTL; concurrent misses share one request.
+    """
+    return await _admin_cache.get_or_load(chat_id, lambda: _fetch_admins(client, chat_id))
+
+
+def cached_is_admin(chat_id: int, user_id: int) -> bool | None:
+    """Answer from the cached roster only; None when it is not loaded."""
+    if user_id == OWNER_ID:
+        return True
+    admins = _admin_cache.peek(chat_id)
+    return None if admins is None else user_id in admins
+
+
+def apply_member_update(update: ChatMemberUpdated) -> None:
+    """Keep a cached admin roster current from a chat member update."""
+    admins = _admin_cache.peek(update.chat.id)
+    if admins is None:
+        return
+
+    member = update.new_chat_member or update.old_chat_member
+    if not member or not member.user:
+        return
+
+    if update.new_chat_member and update.new_chat_member.status in ADMIN_STATUSES:
+        admins.add(member.user.id)
+    else:
+        admins.discard(member.user.id)
+
+
+def invalidate_admins(chat_id: int) -> None:
+    """Drop the cached roster so the next check refetches it."""
+    _admin_cache.pop(chat_id, None)
+
+
 async def is_admin(client: Client, message: Message, user_id: int | None = None) -> bool:
     """
     Check whether the specified user (or message sender) is an admin in the current chat.
@@ -26,11 +85,7 @@ async def is_admin(client: Client, message: Message, user_id: int | None = None)
         if uid == OWNER_ID:
             return True
 
-        member: ChatMember = await client.get_chat_member(chat_id, uid)
-        return member.status in {
-            ChatMemberStatus.ADMINISTRATOR,
-            ChatMemberStatus.OWNER,
-        }
+        return uid in await get_chat_admins(client, chat_id)
 
     except Exception as exc:  # noqa: BLE001
         logger.warning(
@@ -0,0 +1,85 @@
+"""Ordered, short-circuiting handler pipeline with per-stage counters."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+StageFunc = Callable[[Any], Awaitable[bool]]
+
+
+class Stage:
+    __slots__ = ("name", "cost", "func", "runs", "stops", "total_ns")
+
+    def __init__(self, name: str, cost: int, func: StageFunc) -> None:
+        self.name = name
+        self.cost = cost
+        self.func = func
+        self.runs = 0
+        self.stops = 0
+        self.total_ns = 0
+
+
+class Pipeline:
+    """
+    Stages run cheapest first; the first stage returning True ends the run.
+    Stages of equal cost keep their registration order.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.stages: list[Stage] = []
+
+    def stage(self, name: str, cost: int) -> Callable[[StageFunc], StageFunc]:
+        def decorator(func: StageFunc) -> StageFunc:
+            self.stages.append(Stage(name, cost, func))
+            self.stages.sort(key=lambda s: s.cost)
+            return func
+
+        return decorator
+
+    async def run(self, ctx: Any) -> str | None:
+        """Run the stages against ``ctx``; returns the name of the stage that stopped it."""
+        for stage in self.stages:
+            stage.runs += 1
+            start = time.perf_counter_ns()
+            try:
+                stop = await stage.func(ctx)
+            finally:
+                stage.total_ns += time.perf_counter_ns() - start
+            if stop:
+                stage.stops += 1
+                return stage.name
+        return None
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "stage": s.name,
+                "cost": s.cost,
+                "runs": s.runs,
+                "stops": s.stops,
+                "avg_us": s.total_ns / s.runs / 1000 if s.runs else 0.0,
+            }
+            for s in self.stages
+        ]
+
+
+async def any_true(*checks: Awaitable[bool]) -> bool:
+    """Await checks concurrently; True as soon as one is, cancelling the rest."""
+    if len(checks) == 1:
+        return bool(await checks[0])
+    pending = {asyncio.ensure_future(check) for check in checks}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if any(task.result() for task in done):
+                return True
+        return False
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+__all__ = ["Pipeline", "Stage", "any_true"]
@@ -0,0 +1,170 @@
+"""Persistent auto-delete scheduler that batches deletions per chat."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from collections import defaultdict
+from typing import Callable
+
+from pyrogram import Client
+from pyrogram.errors import BadRequest, FloodWait, Forbidden
+
+from utils.db import (
+    add_scheduled_deletes,
+    remove_scheduled_deletes,
+    get_scheduled_deletes,
+)
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 100  # Telegram accepts at most 100 ids per delete_messages
+FLUSH_INTERVAL = 1.0  # seconds between persisting newly scheduled entries
+BATCH_WINDOW = 0.5  # entries due this soon are folded into the current batch
+RESTORE_RETRY_DELAY = 5.0  # seconds before retrying a failed restore, doubled each time
+RESTORE_RETRY_MAX = 300.0
+DELETE_RETRY_DELAY = 30.0  # seconds before retrying a batch Telegram did not delete
+# Retrying cannot help: the messages are gone or the bot may not delete them
+PERMANENT_ERRORS = (BadRequest, Forbidden)
+
+
+class DeleteScheduler:
+    """
+    One background task that deletes messages once they are due.
+    Pending entries live in a heap and are mirrored to the
+    ``scheduled_deletes`` collection so they survive restarts.
+    """
+
+    def __init__(self, client: Client, owns: Callable[[int], bool] = lambda chat_id: True) -> None:
+        self._client = client
+        # Chats whose saved entries this process restores; sharded workers each own a subset
+        self.owns = owns
+        self._heap: list[tuple[float, int, int]] = []
+        self._pending: set[tuple[int, int]] = set()
+        self._unsaved: dict[tuple[int, int], float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._restore_task: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be deleted."""
+        return len(self._pending)
+
+    def is_pending(self, chat_id: int, message_id: int) -> bool:
+        return (chat_id, message_id) in self._pending
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self._restore_task is None:
+            # Separate so deletions scheduled meanwhile are not held up by an outage
+            self._restore_task = asyncio.create_task(self._restore())
+
+    async def stop(self) -> None:
+        """Cancel the worker and persist anything not yet saved."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._restore_task is not None and not self._restore_task.done():
+            self._restore_task.cancel()
+            self._restore_task = None
+        await self._flush()
+
+    def schedule(self, chat_id: int, message_id: int, delay: float) -> None:
+        key = (chat_id, message_id)
+        if key in self._pending:
+            return
+        due_at = time.time() + delay
+        self._push(chat_id, message_id, due_at)
+        self._unsaved[key] = due_at
+        if self._heap[0][0] == due_at:
+            self._wakeup.set()
+        self.start()
+
+    def _push(self, chat_id: int, message_id: int, due_at: float) -> None:
+        heapq.heappush(self._heap, (due_at, chat_id, message_id))
+        self._pending.add((chat_id, message_id))
+
+    async def _restore(self) -> None:
+        delay = RESTORE_RETRY_DELAY
+        while True:
+            try:
+                entries = await get_scheduled_deletes()
+                break
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to restore scheduled deletions, retrying in %.0fs: %s", delay, exc)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RESTORE_RETRY_MAX)
+        entries = [entry for entry in entries if self.owns(entry[0])]
+        for chat_id, message_id, due_at in entries:
+            if (chat_id, message_id) not in self._pending:
+                self._push(chat_id, message_id, due_at)
+        self._wakeup.set()
+        logger.info("🧹 Restored %d scheduled deletions", len(entries))
+
+    async def _flush(self) -> None:
+        if not self._unsaved:
+            return
+        entries = [(chat_id, msg_id, due_at) for (chat_id, msg_id), due_at in self._unsaved.items()]
+        self._unsaved.clear()
+        try:
+            await add_scheduled_deletes(entries)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to persist %d scheduled deletions: %s", len(entries), exc)
+
+    def _pop_due(self, now: float) -> dict[int, list[int]]:
+        due: dict[int, list[int]] = defaultdict(list)
+        while self._heap and self._heap[0][0] <= now:
+            _, chat_id, message_id = heapq.heappop(self._heap)
+            self._pending.discard((chat_id, message_id))
+            # Entries that fall due before they were saved never reach the DB
+            self._unsaved.pop((chat_id, message_id), None)
+            due[chat_id].append(message_id)
+        return due
+
+    async def _delete(self, chat_id: int, message_ids: list[int]) -> None:
+        for i in range(0, len(message_ids), DELETE_BATCH_SIZE):
+            batch = message_ids[i:i + DELETE_BATCH_SIZE]
+            try:
+                await self._client.delete_messages(chat_id, batch)
+            except PERMANENT_ERRORS as exc:
+                logger.warning("Giving up deleting %d messages in %s: %s", len(batch), chat_id, exc)
+            except Exception as exc:  # noqa: BLE001
+                # Still saved, so a restart retries them as well
+                delay = exc.value if isinstance(exc, FloodWait) else DELETE_RETRY_DELAY
+                logger.warning(
+                    "Failed to delete %d messages in %s, retrying in %ss: %s", len(batch), chat_id, delay, exc
+                )
+                self._requeue(chat_id, batch, time.time() + delay)
+                continue
+            try:
+                await remove_scheduled_deletes(chat_id, batch)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to clear scheduled deletions in %s: %s", chat_id, exc)
+
+    def _requeue(self, chat_id: int, message_ids: list[int], due_at: float) -> None:
+        for message_id in message_ids:
+            if (chat_id, message_id) not in self._pending:
+                self._push(chat_id, message_id, due_at)
+
+    async def _run(self) -> None:
+        while True:
+            due = self._pop_due(time.time() + BATCH_WINDOW)
+            await self._flush()
+            if due:
+                await asyncio.gather(*(self._delete(chat_id, ids) for chat_id, ids in due.items()))
+
+            timeout = FLUSH_INTERVAL
+            if self._heap:
+                timeout = min(timeout, max(self._heap[0][0] - time.time(), 0))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+__all__ = ["DeleteScheduler", "DELETE_BATCH_SIZE"]
@@ -0,0 +1,34 @@
+"""Storage backends for ``utils.db``, selected by the URI scheme.
+
+- ``mongodb://`` / ``mongodb+srv://`` – MongoDB through Motor
+- ``sqlite:///path/to/file.db`` – local SQLite file in WAL mode
+- ``memory://`` – process-local dictionaries, lost on restart
+"""
+
+from __future__ import annotations
+
+from utils.storage.base import CHAT_REGISTRIES, ChangesLost, Storage, flipped
+
+SCHEMES = ("mongodb://", "mongodb+srv://", "sqlite://", "memory://")
+
+
+def open_storage(uri: str, db_name: str) -> Storage:
+    """Build the backend for ``uri``; ``connect()`` must still be awaited."""
+    scheme = uri.split("://", 1)[0].lower()
+    if scheme in ("mongodb", "mongodb+srv"):
+        # Imported lazily so the other backends run without Motor installed
+        from utils.storage.mongo import MongoStorage
+
+        return MongoStorage(uri, db_name)
+    if scheme == "sqlite":
+        from utils.storage.sqlite import SQLiteStorage
+
+        return SQLiteStorage(uri[len("sqlite:///"):] or ":memory:")
+    if scheme == "memory":
+        from utils.storage.memory import MemoryStorage
+
+        return MemoryStorage()
+    raise ValueError(f"Unsupported storage URI {uri!r}; expected one of {', '.join(SCHEMES)}")
+
+
+__all__ = ["Storage", "ChangesLost", "CHAT_REGISTRIES", "SCHEMES", "flipped", "open_storage"]
@@ -0,0 +1,168 @@
+"""Storage interface implemented by every backend behind ``utils.db``."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator
+
+# Sets of chat ids the bot keeps, each stored separately by every backend.
+CHAT_REGISTRIES = ("users", "groups", "broadcast_users", "broadcast_groups")
+
+# Stored values a toggle treats as "off"; anything else counts as on.
+TOGGLE_OFF_VALUES = ("", "0", "false", "off", "no")
+
+
+def flipped(value: str | None, on_value: str) -> str:
+    """The value a toggle stores next: ``on_value`` when currently off, else ``"0"``."""
+    return on_value if value is None or str(value).lower() in TOGGLE_OFF_VALUES else "0"
+
+
+class ChangesLost(Exception):
+    """``watch_changes`` cannot resume where it stopped; changes in between went unseen."""
+
+
+class Storage(ABC):
+    """
+    Persistence operations the bot needs, phrased in domain terms so that
+    backends can implement them natively instead of emulating MongoDB queries.
+    Caching and invalidation stay in ``utils.db``; backends only store.
+    """
+
+    scheme: str = ""
+    # Whether other processes can write to the same data
+    shared: bool = True
+    # Errors meaning "try again later" rather than a bad request
+    transient_errors: tuple[type[BaseException], ...] = ()
+
+    def is_transient(self, exc: BaseException) -> bool:
+        """Whether ``exc`` means storage is unreachable or busy, not that the request was wrong."""
+        return isinstance(exc, self.transient_errors)
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """Open connections and create tables or indexes; raise if unreachable."""
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+    # -- settings (one document per chat) --
+    @abstractmethod
+    async def load_settings(self, chat_id: int) -> dict[str, str]: ...
+
+    @abstractmethod
+    async def set_setting(self, chat_id: int, key: str, value: str, origin: str) -> None:
+        """Store one key and bump the chat's version in the same write."""
+
+    @abstractmethod
+    async def toggle_setting(self, chat_id: int, key: str, on_value: str, origin: str) -> dict[str, str]:
+        """
+        Atomically replace ``key`` with ``flipped(value, on_value)``, bump the
+        chat's version and return every setting of the chat after the change.
+        """
+
+    # -- approvals --
+    @abstractmethod
+    async def load_approved(self, chat_id: int) -> list[int]: ...
+
+    @abstractmethod
+    async def approve(self, chat_id: int, user_id: int) -> None: ...
+
+    @abstractmethod
+    async def unapprove(self, chat_id: int, user_id: int) -> None: ...
+
+    @abstractmethod
+    async def approve_many(self, chat_id: int, user_ids: list[int]) -> int:
+        """Approve every id in one batch; returns how many were not approved yet."""
+
+    @abstractmethod
+    async def unapprove_many(self, chat_id: int, user_ids: list[int]) -> int:
+        """Unapprove every id in one batch; returns how many were approved."""
+
+    @abstractmethod
+    async def approved_page(self, chat_id: int, bound: int, limit: int, descending: bool = False) -> list[int]:
+        """
+        Up to ``limit`` approved ids above ``bound`` in ascending order, or
+        below it in descending order, read as a range over (chat_id, user_id).
+        """
+
+    @abstractmethod
+    async def count_approved(self, chat_id: int) -> int: ...
+
+    # -- banned words --
+    @abstractmethod
+    async def banned_words(self, chat_id: int) -> list[str]:
+        """Return the chat's terms sorted alphabetically."""
+
+    @abstractmethod
+    async def add_banned_words(self, chat_id: int, terms: set[str]) -> int:
+        """Insert normalised terms; returns how many were new."""
+
+    @abstractmethod
+    async def remove_banned_words(self, chat_id: int, terms: list[str]) -> int: ...
+
+    @abstractmethod
+    async def count_banned_words(self, chat_id: int) -> int: ...
+
+    # -- warnings --
+    @abstractmethod
+    async def increment_warning(self, chat_id: int, user_id: int, limit: int, decay: int) -> int:
+        """
+        Atomically add a warning and return the count it reached.
+        Reaching ``limit`` resets the stored count; an untouched count
+        expires ``decay`` seconds after its last warning.
+        """
+
+    @abstractmethod
+    async def reset_warning(self, chat_id: int, user_id: int) -> None: ...
+
+    # -- scheduled deletions --
+    @abstractmethod
+    async def add_scheduled_deletes(self, entries: list[tuple[int, int, float]]) -> None: ...
+
+    @abstractmethod
+    async def remove_scheduled_deletes(self, chat_id: int, message_ids: list[int]) -> None: ...
+
+    @abstractmethod
+    async def scheduled_deletes(self) -> list[tuple[int, int, float]]: ...
+
+    # -- chat registries (see CHAT_REGISTRIES) --
+    @abstractmethod
+    async def add_chat(self, registry: str, chat_id: int) -> None: ...
+
+    @abstractmethod
+    async def remove_chats(self, registry: str, chat_ids: list[int]) -> int:
+        """Remove ids from a registry; returns how many were present."""
+
+    @abstractmethod
+    async def list_chats(self, registry: str) -> list[int]: ...
+
+    @abstractmethod
+    def iter_chats(self, registry: str, negative: bool, batch_size: int) -> AsyncIterator[int]:
+        """Yield ids of one sign (negative = groups) without loading them all."""
+
+    @abstractmethod
+    async def count_chats(self, registry: str) -> int:
+        """Cheap, possibly approximate, number of ids in a registry."""
+
+    # -- cross-process invalidation --
+    @abstractmethod
+    async def bump_version(self, chat_id: int, origin: str) -> None:
+        """Increment the chat's version and record which process changed it."""
+
+    @abstractmethod
+    async def changed_chats(self, since: float) -> list[tuple[int, int, str, float]]:
+        """Return ``(chat_id, version, origin, updated_at)`` for chats bumped after ``since``."""
+
+    async def watch_changes(self, resume_after: Any = None) -> AsyncIterator[tuple[int | None, str, Any]]:
+        """
+        Yield ``(chat_id, origin, token)`` for every version bump as it happens,
+        preceded by ``(None, "", token)`` once the stream is open. Passing the
+        last ``token`` as ``resume_after`` first replays the changes made since;
+        ChangesLost is raised when that history is gone.
+        Raises NotImplementedError when the backend cannot push changes.
+        """
+        raise NotImplementedError
+        yield  # makes this an async generator
+
+
+__all__ = ["Storage", "ChangesLost", "CHAT_REGISTRIES", "TOGGLE_OFF_VALUES", "flipped"]
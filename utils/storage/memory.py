@@ -0,0 +1,151 @@
+"""Process-local backend holding everything in dictionaries.
+
+Nothing survives a restart. Meant for load tests, benchmarks and trying
+the bot without a database server.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import AsyncIterator
+
+from utils.storage.base import CHAT_REGISTRIES, Storage, flipped
+
+
+class MemoryStorage(Storage):
+    scheme = "memory"
+    shared = False
+
+    def __init__(self) -> None:
+        self._settings: dict[int, dict[str, str]] = {}
+        self._approved: dict[int, set[int]] = {}
+        self._banned: dict[int, set[str]] = {}
+        self._warnings: dict[tuple[int, int], tuple[int, float]] = {}  # -> (count, expires_at)
+        self._scheduled: dict[tuple[int, int], float] = {}
+        self._chats: dict[str, set[int]] = {name: set() for name in CHAT_REGISTRIES}
+        self._versions: dict[int, tuple[int, str, float]] = {}  # -> (version, origin, updated_at)
+
+    async def connect(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    # -- settings --
+    async def load_settings(self, chat_id: int) -> dict[str, str]:
+        return dict(self._settings.get(chat_id, {}))
+
+    async def set_setting(self, chat_id: int, key: str, value: str, origin: str) -> None:
+        self._settings.setdefault(chat_id, {})[key] = value
+
+    async def toggle_setting(self, chat_id: int, key: str, on_value: str, origin: str) -> dict[str, str]:
+        values = self._settings.setdefault(chat_id, {})
+        values[key] = flipped(values.get(key), on_value)
+        return dict(values)
+
+    # -- approvals --
+    async def load_approved(self, chat_id: int) -> list[int]:
+        return list(self._approved.get(chat_id, ()))
+
+    async def approve(self, chat_id: int, user_id: int) -> None:
+        self._approved.setdefault(chat_id, set()).add(user_id)
+
+    async def unapprove(self, chat_id: int, user_id: int) -> None:
+        self._approved.get(chat_id, set()).discard(user_id)
+
+    async def approve_many(self, chat_id: int, user_ids: list[int]) -> int:
+        approved = self._approved.setdefault(chat_id, set())
+        before = len(approved)
+        approved.update(user_ids)
+        return len(approved) - before
+
+    async def unapprove_many(self, chat_id: int, user_ids: list[int]) -> int:
+        approved = self._approved.get(chat_id, set())
+        removed = approved.intersection(user_ids)
+        approved.difference_update(removed)
+        return len(removed)
+
+    async def approved_page(self, chat_id: int, bound: int, limit: int, descending: bool = False) -> list[int]:
+        ids = sorted(self._approved.get(chat_id, ()), reverse=descending)
+        return [uid for uid in ids if (uid < bound if descending else uid > bound)][:limit]
+
+    async def count_approved(self, chat_id: int) -> int:
+        return len(self._approved.get(chat_id, ()))
+
+    # -- banned words --
+    async def banned_words(self, chat_id: int) -> list[str]:
+        return sorted(self._banned.get(chat_id, ()))
+
+    async def add_banned_words(self, chat_id: int, terms: set[str]) -> int:
+        words = self._banned.setdefault(chat_id, set())
+        before = len(words)
+        words.update(terms)
+        return len(words) - before
+
+    async def remove_banned_words(self, chat_id: int, terms: list[str]) -> int:
+        words = self._banned.get(chat_id, set())
+        removed = words.intersection(terms)
+        words.difference_update(removed)
+        return len(removed)
+
+    async def count_banned_words(self, chat_id: int) -> int:
+        return len(self._banned.get(chat_id, ()))
+
+    # -- warnings --
+    async def increment_warning(self, chat_id: int, user_id: int, limit: int, decay: int) -> int:
+        now = time.time()
+        count, expires_at = self._warnings.get((chat_id, user_id), (0, 0.0))
+        reached = (count if expires_at > now else 0) + 1
+        self._warnings[(chat_id, user_id)] = (0 if reached >= limit else reached, now + decay)
+        return reached
+
+    async def reset_warning(self, chat_id: int, user_id: int) -> None:
+        self._warnings.pop((chat_id, user_id), None)
+
+    # -- scheduled deletions --
+    async def add_scheduled_deletes(self, entries: list[tuple[int, int, float]]) -> None:
+        for chat_id, message_id, due_at in entries:
+            self._scheduled[(chat_id, message_id)] = due_at
+
+    async def remove_scheduled_deletes(self, chat_id: int, message_ids: list[int]) -> None:
+        for message_id in message_ids:
+            self._scheduled.pop((chat_id, message_id), None)
+
+    async def scheduled_deletes(self) -> list[tuple[int, int, float]]:
+        return [(chat_id, message_id, due_at) for (chat_id, message_id), due_at in self._scheduled.items()]
+
+    # -- chat registries --
+    async def add_chat(self, registry: str, chat_id: int) -> None:
+        self._chats[registry].add(chat_id)
+
+    async def remove_chats(self, registry: str, chat_ids: list[int]) -> int:
+        ids = self._chats[registry]
+        removed = ids.intersection(chat_ids)
+        ids.difference_update(removed)
+        return len(removed)
+
+    async def list_chats(self, registry: str) -> list[int]:
+        return list(self._chats[registry])
+
+    async def iter_chats(self, registry: str, negative: bool, batch_size: int) -> AsyncIterator[int]:
+        for chat_id in list(self._chats[registry]):
+            if (chat_id < 0) == negative and chat_id != 0:
+                yield chat_id
+
+    async def count_chats(self, registry: str) -> int:
+        return len(self._chats[registry])
+
+    # -- cross-process invalidation --
+    async def bump_version(self, chat_id: int, origin: str) -> None:
+        version = self._versions.get(chat_id, (0, "", 0.0))[0]
+        self._versions[chat_id] = (version + 1, origin, time.time())
+
+    async def changed_chats(self, since: float) -> list[tuple[int, int, str, float]]:
+        return [
+            (chat_id, version, origin, updated_at)
+            for chat_id, (version, origin, updated_at) in self._versions.items()
+            if updated_at > since
+        ]
+
+
+__all__ = ["MemoryStorage"]
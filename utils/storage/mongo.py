@@ -0,0 +1,331 @@
+"""MongoDB backend built on Motor."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import ConnectionFailure, OperationFailure
+
+from utils.storage.base import TOGGLE_OFF_VALUES, ChangesLost, Storage
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT_MS = 5000  # fail startup fast when the server is unreachable
+# Server error codes meaning change streams are not offered (standalone server, some hosted APIs)
+CHANGE_STREAM_UNSUPPORTED = {40573, 115}
+# ChangeStreamHistoryLost / ChangeStreamFatalError: the resume token fell off the oplog
+CHANGE_STREAM_HISTORY_LOST = {286, 280}
+# Key/value settings collection of earlier versions, renamed once migrated
+LEGACY_SETTINGS = "kv_settings"
+MIGRATED_SETTINGS = "kv_settings_migrated"
+
+# collection -> (keys, options) for every index the queries rely on
+INDEXES = {
+    "chat_settings": [([("updated_at", 1)], {})],
+    "approved_users": [([("chat_id", 1), ("user_id", 1)], {"unique": True})],
+    "warnings": [
+        ([("chat_id", 1), ("user_id", 1)], {"unique": True}),
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+    ],
+    "banned_words": [([("chat_id", 1), ("word", 1)], {"unique": True})],
+    "scheduled_deletes": [([("chat_id", 1), ("message_id", 1)], {"unique": True})],
+}
+
+
+class MongoStorage(Storage):
+    scheme = "mongodb"
+    transient_errors = (ConnectionFailure,)
+
+    def __init__(self, uri: str, db_name: str) -> None:
+        self.uri = uri
+        self.db_name = db_name
+        self.client: AsyncIOMotorClient | None = None
+        self.db: AsyncIOMotorDatabase | None = None
+        self._index_task: asyncio.Task | None = None
+
+    async def connect(self) -> None:
+        self.client = AsyncIOMotorClient(self.uri, serverSelectionTimeoutMS=CONNECT_TIMEOUT_MS)
+        self.db = self.client[self.db_name]
+
+        # Force a connection attempt to provide immediate feedback
+        try:
+            await self.client.admin.command("ping")
+        except Exception as exc:  # noqa: BLE001
+            raise RuntimeError(f"Could not connect to MongoDB: {exc}") from exc
+
+        await self._migrate_settings()
+        # Indexes normally exist already; checking them must not delay startup
+        self._index_task = asyncio.create_task(self._ensure_indexes())
+
+    async def _migrate_settings(self) -> None:
+        """Fold ``kv_settings`` (one document per key) into one ``chat_settings`` document per chat."""
+        if not await self.db.list_collection_names(filter={"name": LEGACY_SETTINGS}):
+            return
+        started = time.perf_counter()
+        # Idempotent, so processes starting together may all run it
+        await self.db[LEGACY_SETTINGS].aggregate([
+            {"$group": {"_id": "$chat_id", "pairs": {"$push": {"k": "$key", "v": "$value"}}}},
+            {"$project": {"values": {"$arrayToObject": "$pairs"}, "version": {"$literal": 0}}},
+            {"$merge": {"into": "chat_settings", "whenMatched": "keepExisting", "whenNotMatched": "insert"}},
+        ]).to_list(None)
+        try:
+            await self.db[LEGACY_SETTINGS].rename(MIGRATED_SETTINGS)
+        except OperationFailure as exc:
+            # Another process renamed it first
+            logger.info("Settings migration: %s", exc)
+            return
+        logger.info(
+            "🗂️ Migrated %s to chat_settings in %.0f ms", LEGACY_SETTINGS, (time.perf_counter() - started) * 1000
+        )
+
+    async def _ensure_collection_indexes(self, name: str) -> int:
+        collection = self.db[name]
+        existing = {tuple(info["key"]) for info in (await collection.index_information()).values()}
+        missing = [(keys, options) for keys, options in INDEXES[name] if tuple(keys) not in existing]
+        for keys, options in missing:
+            await collection.create_index(keys, **options)
+        return len(missing)
+
+    async def _ensure_indexes(self) -> None:
+        started = time.perf_counter()
+        try:
+            created = await asyncio.gather(*(self._ensure_collection_indexes(name) for name in INDEXES))
+        except Exception as exc:  # noqa: BLE001
+            logger.error("❌ Could not verify MongoDB indexes: %s", exc)
+            return
+        logger.info(
+            "🗂️ MongoDB indexes checked in %.0f ms (%d created)", (time.perf_counter() - started) * 1000, sum(created)
+        )
+
+    async def close(self) -> None:
+        if self._index_task is not None:
+            self._index_task.cancel()
+        if self.client:
+            self.client.close()
+
+    # -- settings --
+    # chat_settings: {_id: chat_id, values: {key: value}, version, origin, updated_at}
+    async def load_settings(self, chat_id: int) -> dict[str, str]:
+        doc = await self.db.chat_settings.find_one({"_id": chat_id}, {"values": 1})
+        return dict(doc.get("values") or {}) if doc else {}
+
+    async def set_setting(self, chat_id: int, key: str, value: str, origin: str) -> None:
+        await self.db.chat_settings.update_one(
+            {"_id": chat_id},
+            {
+                "$set": {f"values.{key}": value, "origin": origin},
+                "$inc": {"version": 1},
+                "$currentDate": {"updated_at": True},
+            },
+            upsert=True,
+        )
+
+    async def toggle_setting(self, chat_id: int, key: str, on_value: str, origin: str) -> dict[str, str]:
+        current = {"$toLower": {"$ifNull": [f"$values.{key}", "0"]}}
+        doc = await self.db.chat_settings.find_one_and_update(
+            {"_id": chat_id},
+            [{"$set": {
+                f"values.{key}": {"$cond": [{"$in": [current, list(TOGGLE_OFF_VALUES)]}, {"$literal": on_value}, "0"]},
+                "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+                "origin": {"$literal": origin},
+                "updated_at": "$$NOW",
+            }}],
+            projection={"values": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return dict(doc["values"])
+
+    # -- approvals --
+    async def load_approved(self, chat_id: int) -> list[int]:
+        cursor = self.db.approved_users.find({"chat_id": chat_id}, {"_id": 0, "user_id": 1})
+        return [doc["user_id"] async for doc in cursor]
+
+    async def approve(self, chat_id: int, user_id: int) -> None:
+        await self.db.approved_users.update_one(
+            {"chat_id": chat_id, "user_id": user_id},
+            {"$set": {"approved": True}},
+            upsert=True,
+        )
+
+    async def unapprove(self, chat_id: int, user_id: int) -> None:
+        await self.db.approved_users.delete_one({"chat_id": chat_id, "user_id": user_id})
+
+    async def approve_many(self, chat_id: int, user_ids: list[int]) -> int:
+        result = await self.db.approved_users.bulk_write(
+            [
+                UpdateOne({"chat_id": chat_id, "user_id": uid}, {"$set": {"approved": True}}, upsert=True)
+                for uid in user_ids
+            ],
+            ordered=False,
+        )
+        return result.upserted_count
+
+    async def unapprove_many(self, chat_id: int, user_ids: list[int]) -> int:
+        result = await self.db.approved_users.bulk_write(
+            [DeleteOne({"chat_id": chat_id, "user_id": uid}) for uid in user_ids],
+            ordered=False,
+        )
+        return result.deleted_count
+
+    async def approved_page(self, chat_id: int, bound: int, limit: int, descending: bool = False) -> list[int]:
+        cursor = (
+            self.db.approved_users.find(
+                {"chat_id": chat_id, "user_id": {"$lt" if descending else "$gt": bound}},
+                {"_id": 0, "user_id": 1},
+            )
+            .sort("user_id", -1 if descending else 1)
+            .limit(limit)
+        )
+        return [doc["user_id"] async for doc in cursor]
+
+    async def count_approved(self, chat_id: int) -> int:
+        return await self.db.approved_users.count_documents({"chat_id": chat_id})
+
+    # -- banned words --
+    async def banned_words(self, chat_id: int) -> list[str]:
+        cursor = self.db.banned_words.find({"chat_id": chat_id}, {"_id": 0, "word": 1}).sort("word", 1)
+        return [doc["word"] async for doc in cursor]
+
+    async def add_banned_words(self, chat_id: int, terms: set[str]) -> int:
+        now = datetime.now(timezone.utc)
+        result = await self.db.banned_words.bulk_write(
+            [
+                UpdateOne({"chat_id": chat_id, "word": term}, {"$setOnInsert": {"added_at": now}}, upsert=True)
+                for term in terms
+            ],
+            ordered=False,
+        )
+        return result.upserted_count
+
+    async def remove_banned_words(self, chat_id: int, terms: list[str]) -> int:
+        result = await self.db.banned_words.delete_many({"chat_id": chat_id, "word": {"$in": terms}})
+        return result.deleted_count
+
+    async def count_banned_words(self, chat_id: int) -> int:
+        return await self.db.banned_words.count_documents({"chat_id": chat_id})
+
+    # -- warnings --
+    async def increment_warning(self, chat_id: int, user_id: int, limit: int, decay: int) -> int:
+        doc = await self.db.warnings.find_one_and_update(
+            {"chat_id": chat_id, "user_id": user_id},
+            [
+                # Expired counts start over even before the TTL monitor removes them
+                {"$set": {"reached": {"$add": [
+                    {"$cond": [{"$gt": ["$expires_at", "$$NOW"]}, {"$ifNull": ["$count", 0]}, 0]},
+                    1,
+                ]}}},
+                {"$set": {
+                    "count": {"$cond": [{"$gte": ["$reached", limit]}, 0, "$reached"]},
+                    "expires_at": {"$add": ["$$NOW", decay * 1000]},
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["reached"]
+
+    async def reset_warning(self, chat_id: int, user_id: int) -> None:
+        await self.db.warnings.delete_one({"chat_id": chat_id, "user_id": user_id})
+
+    # -- scheduled deletions --
+    async def add_scheduled_deletes(self, entries: list[tuple[int, int, float]]) -> None:
+        await self.db.scheduled_deletes.bulk_write(
+            [
+                UpdateOne(
+                    {"chat_id": chat_id, "message_id": message_id},
+                    {"$set": {"due_at": due_at}},
+                    upsert=True,
+                )
+                for chat_id, message_id, due_at in entries
+            ],
+            ordered=False,
+        )
+
+    async def remove_scheduled_deletes(self, chat_id: int, message_ids: list[int]) -> None:
+        await self.db.scheduled_deletes.delete_many({"chat_id": chat_id, "message_id": {"$in": message_ids}})
+
+    async def scheduled_deletes(self) -> list[tuple[int, int, float]]:
+        cursor = self.db.scheduled_deletes.find({}, {"_id": 0, "chat_id": 1, "message_id": 1, "due_at": 1})
+        return [(doc["chat_id"], doc["message_id"], doc["due_at"]) async for doc in cursor]
+
+    # -- chat registries --
+    async def add_chat(self, registry: str, chat_id: int) -> None:
+        await self.db[registry].update_one({"_id": chat_id}, {"$set": {}}, upsert=True)
+
+    async def remove_chats(self, registry: str, chat_ids: list[int]) -> int:
+        if not chat_ids:
+            return 0
+        result = await self.db[registry].bulk_write([DeleteOne({"_id": cid}) for cid in chat_ids], ordered=False)
+        return result.deleted_count
+
+    async def list_chats(self, registry: str) -> list[int]:
+        return [doc["_id"] async for doc in self.db[registry].find({}, {"_id": 1})]
+
+    async def iter_chats(self, registry: str, negative: bool, batch_size: int) -> AsyncIterator[int]:
+        query = {"_id": {"$lt": 0}} if negative else {"_id": {"$gt": 0}}
+        async for doc in self.db[registry].find(query, {"_id": 1}, batch_size=batch_size):
+            yield doc["_id"]
+
+    async def count_chats(self, registry: str) -> int:
+        # Collection metadata, no scan
+        return await self.db[registry].estimated_document_count()
+
+    # -- cross-process invalidation --
+    # Versions live on the chat's settings document, so settings writes bump them for free
+    async def bump_version(self, chat_id: int, origin: str) -> None:
+        await self.db.chat_settings.update_one(
+            {"_id": chat_id},
+            {"$inc": {"version": 1}, "$set": {"origin": origin}, "$currentDate": {"updated_at": True}},
+            upsert=True,
+        )
+
+    async def changed_chats(self, since: float) -> list[tuple[int, int, str, float]]:
+        cursor = self.db.chat_settings.find(
+            {"updated_at": {"$gt": datetime.fromtimestamp(since, timezone.utc)}},
+            {"_id": 1, "version": 1, "origin": 1, "updated_at": 1},
+        )
+        # Motor hands back naive UTC datetimes
+        return [
+            (
+                doc["_id"],
+                doc["version"],
+                doc.get("origin", ""),
+                doc["updated_at"].replace(tzinfo=timezone.utc).timestamp(),
+            )
+            async for doc in cursor
+        ]
+
+    async def watch_changes(self, resume_after: Any = None) -> AsyncIterator[tuple[int | None, str, Any]]:
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        try:
+            async with self.db.chat_settings.watch(pipeline, resume_after=resume_after) as stream:
+                yield None, "", stream.resume_token
+                async for change in stream:
+                    yield change["documentKey"]["_id"], self._change_origin(change), change["_id"]
+        except OperationFailure as exc:
+            if exc.code in CHANGE_STREAM_UNSUPPORTED:
+                raise NotImplementedError(f"change streams unavailable: {exc}") from exc
+            if resume_after is not None and exc.code in CHANGE_STREAM_HISTORY_LOST:
+                raise ChangesLost(str(exc)) from exc
+            raise
+
+
+    @staticmethod
+    def _change_origin(change: dict) -> str:
+        """The process that made this change, as written by the change itself."""
+        if change["operationType"] == "update":
+            # Not fullDocument: a lookup returns the current document, which a
+            # later write may already have re-stamped. A write that leaves the
+            # origin unchanged omits it, so it reads as foreign and costs a reload
+            return change.get("updateDescription", {}).get("updatedFields", {}).get("origin", "")
+        return (change.get("fullDocument") or {}).get("origin", "")
+
+
+__all__ = ["MongoStorage"]
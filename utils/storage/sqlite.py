@@ -0,0 +1,319 @@
+"""SQLite backend in WAL mode for single-node deployments.
+
+All statements run on one dedicated thread, which keeps the connection
+single-threaded and makes each helper atomic with respect to the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable
+
+from utils.storage.base import CHAT_REGISTRIES, Storage, flipped
+
+BUSY_TIMEOUT_MS = 5000  # wait this long for another process holding the write lock
+# OperationalError also covers bad SQL and missing tables; only lock contention passes
+BUSY_MESSAGES = ("database is locked", "database is busy", "database table is locked")
+
+SCHEMA = [
+    # Settings as one JSON object per chat, next to the chat's version
+    """CREATE TABLE IF NOT EXISTS chat_settings (
+        chat_id INTEGER PRIMARY KEY, data TEXT NOT NULL DEFAULT '{}',
+        version INTEGER NOT NULL DEFAULT 0, origin TEXT NOT NULL DEFAULT '',
+        updated_at REAL NOT NULL DEFAULT 0)""",
+    "CREATE INDEX IF NOT EXISTS chat_settings_updated_at ON chat_settings (updated_at)",
+    """CREATE TABLE IF NOT EXISTS approved_users (
+        chat_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+        PRIMARY KEY (chat_id, user_id)) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS banned_words (
+        chat_id INTEGER NOT NULL, word TEXT NOT NULL, added_at REAL NOT NULL,
+        PRIMARY KEY (chat_id, word)) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS warnings (
+        chat_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+        count INTEGER NOT NULL, expires_at REAL NOT NULL,
+        PRIMARY KEY (chat_id, user_id)) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS scheduled_deletes (
+        chat_id INTEGER NOT NULL, message_id INTEGER NOT NULL, due_at REAL NOT NULL,
+        PRIMARY KEY (chat_id, message_id)) WITHOUT ROWID""",
+    *(f"CREATE TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY)" for name in CHAT_REGISTRIES),
+]
+
+# Key/value settings table of earlier versions; folded into chat_settings on open
+MIGRATION = [
+    "INSERT OR IGNORE INTO chat_settings (chat_id, data) "
+    "SELECT chat_id, json_group_object(key, value) FROM kv_settings GROUP BY chat_id",
+    "ALTER TABLE kv_settings RENAME TO kv_settings_migrated",
+]
+
+
+def _registry(name: str) -> str:
+    # Table names cannot be bound as parameters
+    if name not in CHAT_REGISTRIES:
+        raise ValueError(f"Unknown chat registry: {name}")
+    return name
+
+
+class SQLiteStorage(Storage):
+    scheme = "sqlite"
+    transient_errors = (sqlite3.OperationalError,)
+
+    def is_transient(self, exc: BaseException) -> bool:
+        return isinstance(exc, sqlite3.OperationalError) and str(exc).startswith(BUSY_MESSAGES)
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        with _Transaction(conn):
+            legacy = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'kv_settings'")
+            if legacy.fetchone():
+                for statement in MIGRATION:
+                    conn.execute(statement)
+        conn.execute("DELETE FROM warnings WHERE expires_at <= ?", (time.time(),))
+        self._conn = conn
+
+    def _write(self, sql: str, params: Iterable[Any] = ()) -> int:
+        with self._transaction():
+            return self._conn.execute(sql, tuple(params)).rowcount
+
+    def _write_many(self, sql: str, rows: list[tuple]) -> int:
+        with self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(sql, rows)
+            return self._conn.total_changes - before
+
+    def _fetch(self, sql: str, params: Iterable[Any] = ()) -> list[tuple]:
+        return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._conn)
+
+    async def connect(self) -> None:
+        try:
+            await self._call(self._open)
+        except sqlite3.Error as exc:
+            raise RuntimeError(f"Could not open SQLite database {self.path!r}: {exc}") from exc
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._call(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    # -- settings --
+    async def load_settings(self, chat_id: int) -> dict[str, str]:
+        rows = await self._call(self._fetch, "SELECT data FROM chat_settings WHERE chat_id = ?", (chat_id,))
+        return json.loads(rows[0][0]) if rows else {}
+
+    def _update_settings(self, chat_id: int, key: str, change: Callable[[str | None], str], origin: str) -> dict[str, str]:
+        with self._transaction():
+            row = self._conn.execute("SELECT data FROM chat_settings WHERE chat_id = ?", (chat_id,)).fetchone()
+            values = json.loads(row[0]) if row else {}
+            values[key] = change(values.get(key))
+            self._conn.execute(
+                "INSERT INTO chat_settings (chat_id, data, version, origin, updated_at) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT (chat_id) DO UPDATE SET data = excluded.data, version = version + 1, "
+                "origin = excluded.origin, updated_at = excluded.updated_at",
+                (chat_id, json.dumps(values), origin, time.time()),
+            )
+        return values
+
+    async def set_setting(self, chat_id: int, key: str, value: str, origin: str) -> None:
+        await self._call(self._update_settings, chat_id, key, lambda _: value, origin)
+
+    async def toggle_setting(self, chat_id: int, key: str, on_value: str, origin: str) -> dict[str, str]:
+        return await self._call(
+            self._update_settings, chat_id, key, lambda current: flipped(current, on_value), origin
+        )
+
+    # -- approvals --
+    async def load_approved(self, chat_id: int) -> list[int]:
+        rows = await self._call(self._fetch, "SELECT user_id FROM approved_users WHERE chat_id = ?", (chat_id,))
+        return [user_id for (user_id,) in rows]
+
+    async def approve(self, chat_id: int, user_id: int) -> None:
+        await self._call(
+            self._write, "INSERT OR IGNORE INTO approved_users (chat_id, user_id) VALUES (?, ?)", (chat_id, user_id)
+        )
+
+    async def unapprove(self, chat_id: int, user_id: int) -> None:
+        await self._call(
+            self._write, "DELETE FROM approved_users WHERE chat_id = ? AND user_id = ?", (chat_id, user_id)
+        )
+
+    async def approve_many(self, chat_id: int, user_ids: list[int]) -> int:
+        return await self._call(
+            self._write_many,
+            "INSERT OR IGNORE INTO approved_users (chat_id, user_id) VALUES (?, ?)",
+            [(chat_id, uid) for uid in user_ids],
+        )
+
+    async def unapprove_many(self, chat_id: int, user_ids: list[int]) -> int:
+        return await self._call(
+            self._write_many,
+            "DELETE FROM approved_users WHERE chat_id = ? AND user_id = ?",
+            [(chat_id, uid) for uid in user_ids],
+        )
+
+    async def approved_page(self, chat_id: int, bound: int, limit: int, descending: bool = False) -> list[int]:
+        op, order = ("<", "DESC") if descending else (">", "ASC")
+        rows = await self._call(
+            self._fetch,
+            f"SELECT user_id FROM approved_users WHERE chat_id = ? AND user_id {op} ? ORDER BY user_id {order} LIMIT ?",
+            (chat_id, bound, limit),
+        )
+        return [user_id for (user_id,) in rows]
+
+    async def count_approved(self, chat_id: int) -> int:
+        rows = await self._call(self._fetch, "SELECT COUNT(*) FROM approved_users WHERE chat_id = ?", (chat_id,))
+        return rows[0][0]
+
+    # -- banned words --
+    async def banned_words(self, chat_id: int) -> list[str]:
+        rows = await self._call(
+            self._fetch, "SELECT word FROM banned_words WHERE chat_id = ? ORDER BY word", (chat_id,)
+        )
+        return [word for (word,) in rows]
+
+    async def add_banned_words(self, chat_id: int, terms: set[str]) -> int:
+        now = time.time()
+        return await self._call(
+            self._write_many,
+            "INSERT OR IGNORE INTO banned_words (chat_id, word, added_at) VALUES (?, ?, ?)",
+            [(chat_id, term, now) for term in terms],
+        )
+
+    async def remove_banned_words(self, chat_id: int, terms: list[str]) -> int:
+        return await self._call(
+            self._write_many,
+            "DELETE FROM banned_words WHERE chat_id = ? AND word = ?",
+            [(chat_id, term) for term in terms],
+        )
+
+    async def count_banned_words(self, chat_id: int) -> int:
+        rows = await self._call(self._fetch, "SELECT COUNT(*) FROM banned_words WHERE chat_id = ?", (chat_id,))
+        return rows[0][0]
+
+    # -- warnings --
+    def _increment_warning(self, chat_id: int, user_id: int, limit: int, decay: int) -> int:
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT count, expires_at FROM warnings WHERE chat_id = ? AND user_id = ?", (chat_id, user_id)
+            ).fetchone()
+            reached = (row[0] if row and row[1] > now else 0) + 1
+            self._conn.execute(
+                "INSERT INTO warnings (chat_id, user_id, count, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (chat_id, user_id) DO UPDATE SET count = excluded.count, expires_at = excluded.expires_at",
+                (chat_id, user_id, 0 if reached >= limit else reached, now + decay),
+            )
+        return reached
+
+    async def increment_warning(self, chat_id: int, user_id: int, limit: int, decay: int) -> int:
+        return await self._call(self._increment_warning, chat_id, user_id, limit, decay)
+
+    async def reset_warning(self, chat_id: int, user_id: int) -> None:
+        await self._call(self._write, "DELETE FROM warnings WHERE chat_id = ? AND user_id = ?", (chat_id, user_id))
+
+    # -- scheduled deletions --
+    async def add_scheduled_deletes(self, entries: list[tuple[int, int, float]]) -> None:
+        await self._call(
+            self._write_many,
+            "INSERT INTO scheduled_deletes (chat_id, message_id, due_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (chat_id, message_id) DO UPDATE SET due_at = excluded.due_at",
+            entries,
+        )
+
+    async def remove_scheduled_deletes(self, chat_id: int, message_ids: list[int]) -> None:
+        await self._call(
+            self._write_many,
+            "DELETE FROM scheduled_deletes WHERE chat_id = ? AND message_id = ?",
+            [(chat_id, message_id) for message_id in message_ids],
+        )
+
+    async def scheduled_deletes(self) -> list[tuple[int, int, float]]:
+        return await self._call(self._fetch, "SELECT chat_id, message_id, due_at FROM scheduled_deletes")
+
+    # -- chat registries --
+    async def add_chat(self, registry: str, chat_id: int) -> None:
+        await self._call(self._write, f"INSERT OR IGNORE INTO {_registry(registry)} (id) VALUES (?)", (chat_id,))
+
+    async def remove_chats(self, registry: str, chat_ids: list[int]) -> int:
+        return await self._call(
+            self._write_many, f"DELETE FROM {_registry(registry)} WHERE id = ?", [(cid,) for cid in chat_ids]
+        )
+
+    async def list_chats(self, registry: str) -> list[int]:
+        rows = await self._call(self._fetch, f"SELECT id FROM {_registry(registry)}")
+        return [chat_id for (chat_id,) in rows]
+
+    async def iter_chats(self, registry: str, negative: bool, batch_size: int) -> AsyncIterator[int]:
+        # Keyset pagination over the primary key, one batch per executor hop
+        table = _registry(registry)
+        last, stop = (-(2 ** 63), 0) if negative else (0, 2 ** 63 - 1)
+        while True:
+            rows = await self._call(
+                self._fetch,
+                f"SELECT id FROM {table} WHERE id > ? AND id < ? ORDER BY id LIMIT ?",
+                (last, stop, batch_size),
+            )
+            for (chat_id,) in rows:
+                yield chat_id
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    async def count_chats(self, registry: str) -> int:
+        rows = await self._call(self._fetch, f"SELECT COUNT(*) FROM {_registry(registry)}")
+        return rows[0][0]
+
+    # -- cross-process invalidation --
+    async def bump_version(self, chat_id: int, origin: str) -> None:
+        await self._call(
+            self._write,
+            "INSERT INTO chat_settings (chat_id, version, origin, updated_at) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT (chat_id) DO UPDATE SET version = version + 1, "
+            "origin = excluded.origin, updated_at = excluded.updated_at",
+            (chat_id, origin, time.time()),
+        )
+
+    async def changed_chats(self, since: float) -> list[tuple[int, int, str, float]]:
+        return await self._call(
+            self._fetch,
+            "SELECT chat_id, version, origin, updated_at FROM chat_settings WHERE updated_at > ?",
+            (since,),
+        )
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` … ``COMMIT``/``ROLLBACK`` on an autocommit connection."""
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+__all__ = ["SQLiteStorage"]
@@ -3,16 +3,31 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+from typing import Iterable
 from urllib import request, parse, error
 
 logger = logging.getLogger(__name__)
 
 
-async def set_webhook(bot_token: str, url: str) -> None:
+async def set_webhook(
+    bot_token: str,
+    url: str,
+    secret_token: str | None = None,
+    allowed_updates: Iterable[str] | None = None,
+    max_connections: int | None = None,
+) -> None:
     """Set the Telegram bot webhook via the HTTP Bot API."""
     api_url = f"https://api.telegram.org/bot{bot_token}/setWebhook"
-    data = parse.urlencode({"url": url}).encode("utf-8")
+    fields = {"url": url}
+    if secret_token:
+        fields["secret_token"] = secret_token
+    if allowed_updates is not None:
+        fields["allowed_updates"] = json.dumps(list(allowed_updates))
+    if max_connections:
+        fields["max_connections"] = str(max_connections)
+    data = parse.urlencode(fields).encode("utf-8")
     req = request.Request(api_url, data=data)
 
     loop = asyncio.get_running_loop()
@@ -0,0 +1,83 @@
+"""Aho-Corasick automaton used for per-chat banned-word lists."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+
+def normalize_term(term: str) -> str:
+    return " ".join(term.casefold().split())
+
+
+class WordAutomaton:
+    """
+    Matches every term of a list in a single pass over the text.
+    Scanning cost depends on the text length, not on the number of terms.
+    Terms only match on word boundaries and ignore case.
+    """
+
+    __slots__ = ("_goto", "_fail", "_term", "_next_match", "terms")
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms = sorted({t for t in map(normalize_term, terms) if t})
+        self._goto: list[dict[str, int]] = [{}]
+        self._term: list[str | None] = [None]
+
+        for term in self.terms:
+            node = 0
+            for ch in term:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._term.append(None)
+                node = nxt
+            self._term[node] = term
+
+        # Failure links plus a shortcut to the nearest terminal node on the
+        # failure chain, filled breadth-first so parents are done first.
+        self._fail = [0] * len(self._goto)
+        self._next_match = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                fallback = self._fail[child]
+                self._next_match[child] = fallback if self._term[fallback] else self._next_match[fallback]
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def search(self, text: str | None) -> str | None:
+        """Return the first banned term found in ``text``, if any."""
+        if not text:
+            return None
+        text = normalize_term(text)
+        goto, fail, terms, next_match = self._goto, self._fail, self._term, self._next_match
+        node = 0
+        for end, ch in enumerate(text, 1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            match = node if terms[node] else next_match[node]
+            while match:
+                term = terms[match]
+                start = end - len(term)
+                # Only edges that are word characters need a boundary
+                if (start == 0 or not term[0].isalnum() or not text[start - 1].isalnum()) and (
+                    end == len(text) or not term[-1].isalnum() or not text[end].isalnum()
+                ):
+                    return term
+                match = next_match[match]
+        return None
+
+
+__all__ = ["WordAutomaton", "normalize_term"]
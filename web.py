@@ -1,20 +1,112 @@
+"""Web service entry point.
+
+With ``WEBHOOK_URL`` set this is the webhook front end: it registers the
+webhook and routes updates to ``WEBHOOK_WORKERS`` bot workers, each started
+as ``python web.py --worker N``. Without it, only ``/health`` is served for
+hosts that expect a web process next to the polling worker (``run.py``).
+"""
+
+import argparse
+import asyncio
 import logging
-import os
-from flask import Flask
+import signal
+import sys
+from urllib.parse import urlsplit
+
+from config import (
+    BOT_TOKEN,
+    LOG_LEVEL,
+    METRICS_HOST,
+    METRICS_PORT,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+    WEBHOOK_WORKERS,
+)
+from utils.botapi import ALLOWED_UPDATES
+from utils.http import HTTPServer, Request, Response
+from utils.ingest import WebhookFrontend, consume_updates, shard_for, stdin_reader
+from utils.lifecycle import create_client, running
+from utils.metrics import serve_metrics
+from utils.webhook import set_webhook
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
+    level=getattr(logging, LOG_LEVEL, logging.INFO),
 )
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
 
-@app.route("/health")
-def health() -> str:
-    return "OK"
+def worker_command(index: int) -> list[str]:
+    return [sys.executable, "-u", __file__, "--worker", str(index)]
+
+
+async def _wait_for_signal() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+
+async def serve() -> None:
+    metrics_server = None
+    if METRICS_PORT:
+        try:
+            metrics_server = await serve_metrics(METRICS_HOST, METRICS_PORT)
+        except OSError as exc:
+            logger.warning("⚠️ Metrics disabled, could not listen on %s:%d: %s", METRICS_HOST, METRICS_PORT, exc)
+
+    if not WEBHOOK_URL:
+        server = HTTPServer(WEBHOOK_HOST, WEBHOOK_PORT)
+
+        @server.route("/health")
+        async def health(_: Request) -> Response:
+            return Response(200, "OK")
+
+        await server.start()
+        await _wait_for_signal()
+        await server.stop()
+    else:
+        frontend = WebhookFrontend(
+            WEBHOOK_HOST,
+            WEBHOOK_PORT,
+            urlsplit(WEBHOOK_URL).path or "/",
+            WEBHOOK_SECRET,
+            WEBHOOK_WORKERS,
+            worker_command,
+        )
+        await frontend.start()
+        await set_webhook(BOT_TOKEN, WEBHOOK_URL, secret_token=WEBHOOK_SECRET, allowed_updates=ALLOWED_UPDATES)
+        await _wait_for_signal()
+        logger.info("🛑 Stopping webhook front end…")
+        await frontend.stop()
+
+    if metrics_server is not None:
+        await metrics_server.stop()
+
+
+async def work(index: int) -> None:
+    """One shard: a bot client that only sends, fed updates by the front end."""
+    # Imported here so the front end does not load every handler module
+    from handlers import filters as group_filters
+
+    client = create_client(f"oxygen_bot_worker{index}", no_updates=True)
+    reader = await stdin_reader()
+    # Each worker exposes its own registry next to the front end's
+    metrics_port = METRICS_PORT + 1 + index if METRICS_PORT else 0
+
+    # Restore only the pending auto-deletes of chats routed to this worker
+    group_filters.delete_owner = lambda chat_id: shard_for(chat_id, WEBHOOK_WORKERS) == index
+    async with running(client, polling=False, metrics_port=metrics_port):
+        logger.info("🧩 Worker %d ready.", index)
+        await consume_updates(client, reader)
+    logger.info("🛑 Worker %d stopped.", index)
+
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 10000))
-    logger.info("Starting Flask health server on port %s", port)
-    app.run(host="0.0.0.0", port=port)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--worker", type=int, metavar="N", help="run as webhook worker N")
+    args = parser.parse_args()
+    asyncio.run(work(args.worker) if args.worker is not None else serve())